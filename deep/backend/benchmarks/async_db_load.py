@@ -0,0 +1,113 @@
+"""Load test: event-loop latency with blocking vs async DrugDatabase access.
+
+Builds a synthetic database, then fires concurrent lookups from coroutines
+while a heartbeat task measures how late the event loop wakes it up.
+Calling DrugDatabase directly from a coroutine blocks the loop for the full
+query; AsyncDrugDatabase keeps the heartbeat lag bounded.
+
+    python benchmarks/async_db_load.py --drugs 50000 --concurrency 64 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.database import DrugDatabase  # noqa: E402
+from services.async_database import AsyncDrugDatabase, DB_WORKERS  # noqa: E402
+
+HEARTBEAT_INTERVAL = 0.001
+
+def build_database(path: str, drugs: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    names = [''.join(rng.choice(string.ascii_lowercase) for _ in range(8)) + str(i) for i in range(drugs)]
+    doc = {
+        "drugs": [{"name": n, "generic_name": f"generic {n[:4]}",
+                   "age_dosage": [{"age_range": "19-65", "dosage": "10mg", "frequency": "daily"}],
+                   "alternatives": [{"name": rng.choice(names), "reason": "same class"}]} for n in names],
+        "interactions": [{"drug1": rng.choice(names), "drug2": rng.choice(names), "severity": "moderate",
+                          "effect": "mock", "recommendation": "monitor"} for _ in range(drugs * 2)],
+    }
+    json_path = path + ".json"
+    with open(json_path, "w") as f:
+        json.dump(doc, f)
+    db = DrugDatabase(path)
+    db.import_from_json(json_path)
+    return names
+
+def workload(rng: random.Random, names: list):
+    """One request's worth of lookups: (method name, args)."""
+    kind = rng.random()
+    if kind < 0.4:
+        return "search_drugs", (rng.choice(names)[:rng.randint(1, 5)],)
+    if kind < 0.7:
+        return "get_interactions_for_set", (rng.sample(names, 15),)
+    if kind < 0.9:
+        return "get_drug", (rng.choice(names),)
+    return "get_dosages", (rng.choice(names),)
+
+async def heartbeat(lags: list, stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + HEARTBEAT_INTERVAL
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append(max(0.0, loop.time() - expected))
+
+async def run(target, use_async: bool, names: list, concurrency: int, requests: int) -> dict:
+    rng = random.Random(1)
+    jobs = [workload(rng, names) for _ in range(requests)]
+    queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+
+    async def worker():
+        while not queue.empty():
+            method, args = queue.get_nowait()
+            if use_async:
+                await getattr(target, method)(*args)
+            else:
+                getattr(target, method)(*args)  # what a plain `async def` handler does today
+                await asyncio.sleep(0)
+
+    lags, stop = [], asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    lags.sort()
+
+    def pct(p):
+        return round(lags[min(len(lags) - 1, int(p * len(lags)))] * 1000, 2) if lags else None
+
+    return {
+        "mode": "async facade" if use_async else "blocking",
+        "requests_per_s": round(requests / elapsed, 1),
+        "loop_lag_ms": {"p50": pct(0.5), "p99": pct(0.99), "max": pct(1.0)},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drugs", type=int, default=50000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=DB_WORKERS, help="AsyncDrugDatabase threads")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "load.db")
+    names = build_database(path, args.drugs)
+    db = DrugDatabase(path)
+    facade = AsyncDrugDatabase(db, max_workers=args.workers)
+    for use_async, target in ((False, db), (True, facade)):
+        print(json.dumps(asyncio.run(run(target, use_async, names, args.concurrency, args.requests))))
+    facade.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark: check_interactions latency vs drug count, per-pair vs batched scoring.
+
+Uses made-up drug names so no pair is in DRUG_DB and every pair goes to
+the interaction model. Caching is disabled, so each call pays the full cost.
+"per_pair" runs one forward pass per pair, as check_interactions used to;
+"batched" sends all of a script's unknown pairs through one pipeline call.
+
+models.interactions reads ../../data/drug_db.json relative to the working
+directory, so run it from a directory where that path resolves:
+
+    cd models && python ../benchmarks/interaction_scoring.py --sizes 2,5,10,15,20,30 --batch-size 32
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.interactions import DrugInteractionAnalyzer, interaction_model  # noqa: E402
+from services.lookup_cache import LookupCache  # noqa: E402
+
+def per_pair(analyzer: DrugInteractionAnalyzer, drugs: list):
+    for i in range(len(drugs)):
+        for j in range(i + 1, len(drugs)):
+            analyzer.predict_interaction(drugs[i], drugs[j])
+
+def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {"median_ms": round(statistics.median(samples) * 1000, 1), "min_ms": round(min(samples) * 1000, 1)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="2,5,10,15,20,30")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if interaction_model.get() is None:
+        sys.exit(f"Interaction model unavailable: {interaction_model.error}")
+    analyzer = DrugInteractionAnalyzer(batch_size=args.batch_size, cache=LookupCache(maxsize=0))
+    analyzer.predict_interaction("warmup-a", "warmup-b")
+    for size in (int(s) for s in args.sizes.split(",")):
+        drugs = [f"testdrug{i}" for i in range(size)]
+        print(json.dumps({
+            "drugs": size,
+            "pairs": size * (size - 1) // 2,
+            "batch_size": args.batch_size,
+            "per_pair": timed(lambda: per_pair(analyzer, drugs), args.repeat),
+            "batched": timed(lambda: analyzer.check_interactions(drugs), args.repeat),
+        }))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Accuracy parity and speed: PyTorch vs ONNX Runtime NER backends.
+
+Loads the NER model once per backend, runs the same synthetic
+prescriptions through each and compares them against the PyTorch
+reference:
+  - drug_agreement: fraction of texts where extract_drugs' drug set matches
+  - label_agreement: fraction of reference entities found with the same
+    label at the same character span
+  - max_score_delta: largest score difference on matching entities
+Then times each backend at batch size 1 and at --batch-size.
+Exits non-zero if any backend's drug agreement is below --min-agreement.
+
+    python benchmarks/ner_backends.py --backends pytorch,onnx,onnx-int8 --texts 256
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ner_batching import make_prescriptions  # noqa: E402
+from models.batching import inference_cores  # noqa: E402
+from models.drug_ner import _entities_to_drugs  # noqa: E402
+from models.loading import load_pipeline  # noqa: E402
+
+def run_backend(pipe, texts: list, batch_size: int) -> list:
+    return pipe(texts, batch_size=batch_size)
+
+def parity(reference: list, candidate: list) -> dict:
+    drug_matches = 0
+    labels_total = labels_matched = 0
+    max_delta = 0.0
+    for ref, cand in zip(reference, candidate):
+        drug_matches += set(_entities_to_drugs(ref)) == set(_entities_to_drugs(cand))
+        spans = {(e["start"], e["end"]): e for e in cand}
+        for e in ref:
+            labels_total += 1
+            other = spans.get((e["start"], e["end"]))
+            if other is not None and other["entity"] == e["entity"]:
+                labels_matched += 1
+                max_delta = max(max_delta, abs(float(e["score"]) - float(other["score"])))
+    return {
+        "drug_agreement": round(drug_matches / len(reference), 4),
+        "label_agreement": round(labels_matched / labels_total, 4) if labels_total else 1.0,
+        "max_score_delta": round(max_delta, 4),
+    }
+
+def timing(pipe, texts: list, batch_size: int) -> dict:
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        pipe(texts[i:i + batch_size], batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    throughput = len(texts) / elapsed
+    return {
+        "batch_size": batch_size,
+        "ms_per_text": round(elapsed / len(texts) * 1000, 2),
+        "texts_per_s": round(throughput, 1),
+        "texts_per_s_per_core": round(throughput / inference_cores(), 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="d4data/biomedical-ner-all")
+    parser.add_argument("--backends", default="pytorch,onnx-int8", help="first one is the reference")
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--min-agreement", type=float, default=0.99)
+    args = parser.parse_args()
+
+    texts = make_prescriptions(args.texts, seed=7)
+    backends = args.backends.split(",")
+    reference = None
+    failed = []
+    for backend in backends:
+        start = time.perf_counter()
+        pipe = load_pipeline("ner", args.model, backend)
+        load_seconds = round(time.perf_counter() - start, 2)
+        entities = run_backend(pipe, texts, args.batch_size)  # also warms up
+        result = {"backend": backend, "load_seconds": load_seconds}
+        if reference is None:
+            reference = entities
+        else:
+            result["parity"] = parity(reference, entities)
+            if result["parity"]["drug_agreement"] < args.min_agreement:
+                failed.append(backend)
+        result["timing"] = [timing(pipe, texts, 1), timing(pipe, texts, args.batch_size)]
+        print(json.dumps(result))
+    if failed:
+        print(f"Parity below {args.min_agreement}: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
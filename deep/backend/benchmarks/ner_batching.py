@@ -0,0 +1,80 @@
+"""Benchmark: drug NER throughput at batch size 1 vs micro-batched.
+
+Fires synthetic prescriptions at extract_drugs from many concurrent
+coroutines and reports requests/s, requests/s per core and latency for
+each batcher setting. Batch size 1 with no wait is the old behaviour of
+one forward pass per request.
+
+    python benchmarks/ner_batching.py --requests 512 --concurrency 32 --batch-sizes 1,8,16,32 --wait-ms 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import drug_ner  # noqa: E402
+from models.batching import MicroBatcher, inference_cores  # noqa: E402
+
+DRUGS = ["aspirin", "warfarin", "ibuprofen", "metformin", "lisinopril", "atorvastatin",
+         "amoxicillin", "omeprazole", "paracetamol", "clopidogrel", "simvastatin", "sertraline"]
+
+def make_prescriptions(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        ". ".join(f"Take {d} {rng.choice([5, 10, 20, 500])} mg {rng.choice(['daily', 'twice daily', 'at night'])}"
+                  for d in rng.sample(DRUGS, rng.randint(1, 5)))
+        for _ in range(count)
+    ]
+
+async def run(batcher: MicroBatcher, texts: list, concurrency: int) -> dict:
+    queue = asyncio.Queue()
+    for text in texts:
+        queue.put_nowait(text)
+    latencies = []
+
+    async def worker():
+        while not queue.empty():
+            text = queue.get_nowait()
+            start = time.perf_counter()
+            await batcher.call_async(text)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    throughput = len(texts) / elapsed
+    stats = batcher.stats()
+    return {
+        "max_batch_size": batcher.max_batch_size,
+        "max_wait_ms": batcher.max_wait_ms,
+        "requests_per_s": round(throughput, 1),
+        "requests_per_s_per_core": round(throughput / inference_cores(), 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000, 1),
+        "mean_batch_size": stats["mean_batch_size"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-sizes", default="1,8,16,32")
+    parser.add_argument("--wait-ms", type=float, default=drug_ner.NER_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    texts = make_prescriptions(args.requests)
+    drug_ner._extract_batch(texts[:4])  # warm-up
+    print(json.dumps({"cores": inference_cores()}))
+    for size in (int(s) for s in args.batch_sizes.split(",")):
+        batcher = MicroBatcher(drug_ner._extract_batch, max_batch_size=size,
+                               max_wait_ms=0 if size == 1 else args.wait_ms, name=f"bench-{size}")
+        print(json.dumps(asyncio.run(run(batcher, texts, args.concurrency))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Load test: AsyncNLUClient against the local mock NLU server.
+
+Starts services/mock_nlu.py in-process with the given latency and failure
+rates, then fires --requests analyze calls from --concurrency coroutines.
+Reports throughput, latency percentiles, retries, failures and circuit
+breaker trips, so pooling and resilience settings can be tuned offline.
+
+    python benchmarks/nlu_load.py --requests 2000 --concurrency 64 --error-rate 0.05 --latency-ms 150
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+
+import uvicorn
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.mock_nlu import MockSettings, create_app  # noqa: E402
+from services.watson_transport import AsyncNLUClient, CircuitBreaker, CircuitOpenError  # noqa: E402
+
+FEATURES = {"entities": {"model": "clinical-model"}, "keywords": {}}
+TEXT = "Take aspirin 100 mg daily with warfarin 5 mg and metformin 500 mg twice daily"
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def run(args) -> dict:
+    port = free_port()
+    settings = MockSettings(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate)
+    server = uvicorn.Server(uvicorn.Config(create_app(settings), host="127.0.0.1", port=port, log_level="warning"))
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    client = AsyncNLUClient(
+        f"http://127.0.0.1:{port}", max_concurrency=args.max_concurrency, retries=args.retries,
+        breaker=CircuitBreaker(args.breaker_threshold, args.breaker_reset),
+    )
+    queue = asyncio.Queue()
+    for _ in range(args.requests):
+        queue.put_nowait(TEXT)
+    latencies, outcomes = [], {"ok": 0, "failed": 0, "rejected": 0}
+
+    async def worker():
+        while not queue.empty():
+            text = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                await client.analyze(text, FEATURES)
+                outcomes["ok"] += 1
+                latencies.append(time.perf_counter() - start)
+            except CircuitOpenError:
+                outcomes["rejected"] += 1
+            except Exception:
+                outcomes["failed"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    server.should_exit = True
+    await serve
+
+    latencies.sort()
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1) if latencies else None
+
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seconds": round(elapsed, 2),
+        "ok_per_s": round(outcomes["ok"] / elapsed, 1),
+        "latency_ms": {"p50": pct(0.5), "p99": pct(0.99), "max": pct(1.0)},
+        "outcomes": outcomes,
+        "transport": client.stats(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64, help="calling coroutines")
+    parser.add_argument("--max-concurrency", type=int, default=16, help="client in-flight limit")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--breaker-threshold", type=int, default=5)
+    parser.add_argument("--breaker-reset", type=float, default=30)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+if __name__ == "__main__":
+    main()
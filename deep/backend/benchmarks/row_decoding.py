@@ -0,0 +1,120 @@
+"""Benchmark: eager per-row dict + json.loads vs lazy Record rows.
+
+Builds a synthetic database with realistic JSON columns, then times
+get_dosages and search_drugs result handling two ways: the old
+dict(row) + json.loads-every-field conversion and the Record wrapper the
+database now returns. Each is measured for a caller that only reads names
+and for one that touches every field, with tracemalloc peak bytes per call.
+
+    python benchmarks/row_decoding.py --drugs 20000 --calls 2000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.database import DrugDatabase, JSON_FIELDS, Record  # noqa: E402
+
+def build_database(path: str, drugs: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    names = [''.join(rng.choice(string.ascii_lowercase) for _ in range(8)) + str(i) for i in range(drugs)]
+
+    def words(k):
+        return [''.join(rng.choice(string.ascii_lowercase) for _ in range(10)) for _ in range(k)]
+
+    doc = {"drugs": [{
+        "name": n, "generic_name": f"generic {n[:4]}", "description": " ".join(words(12)),
+        "contraindications": words(6), "side_effects": words(8),
+        "age_dosage": [{"age_range": r, "dosage": "10mg", "frequency": "daily", "notes": " ".join(words(4))}
+                       for r in ("0-12", "13-18", "19-65", "65+")],
+    } for n in names]}
+    json_path = path + ".json"
+    with open(json_path, "w") as f:
+        json.dump(doc, f)
+    DrugDatabase(path).import_from_json(json_path)
+    return names
+
+def eager(row):
+    """What _row_to_dict used to do for every row."""
+    result = dict(row)
+    for field in JSON_FIELDS:
+        if field in result and result[field]:
+            try:
+                result[field] = json.loads(result[field])
+            except json.JSONDecodeError:
+                result[field] = None
+    return result
+
+def names_only(records):
+    return [r.get("name") or r.get("age_range") for r in records]
+
+def all_fields(records):
+    return [{k: r[k] for k in r} for r in records]
+
+def measure(fetch, wrap, consume, args_list):
+    """Time row conversion + consumption only; the SQL fetch is identical for both modes."""
+    samples = []
+    for args in args_list:
+        rows = fetch(*args)
+        start = time.perf_counter()
+        consume([wrap(row) for row in rows])
+        samples.append(time.perf_counter() - start)
+    tracemalloc.start()
+    allocated = 0
+    for args in args_list[:100]:
+        rows = fetch(*args)
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        consume([wrap(row) for row in rows])
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - base
+    tracemalloc.stop()
+    samples.sort()
+    return {
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 1),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 1),
+        "alloc_bytes_per_call": allocated // min(100, len(args_list)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drugs", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "rows.db")
+    names = build_database(path, args.drugs)
+    db = DrugDatabase(path)
+    rng = random.Random(1)
+
+    def raw(sql):
+        def fetch(*params):
+            with db._get_connection() as conn:
+                return conn.execute(sql, params).fetchall()
+        return fetch
+
+    cases = {
+        "get_dosages": (raw("""
+            SELECT d.* FROM dosages d JOIN drugs dr ON d.drug_id = dr.id
+            WHERE dr.name = ?"""),
+            [(rng.choice(names),) for _ in range(args.calls)]),
+        "search_drugs": (raw("SELECT * FROM drugs WHERE name >= ? ORDER BY name LIMIT 50"),
+                         [(rng.choice(names)[:2],) for _ in range(args.calls)]),
+    }
+    for case, (fetch, params) in cases.items():
+        for access, consume in (("names", names_only), ("all_fields", all_fields)):
+            for mode, wrap in (("eager_dict", eager), ("lazy_record", Record)):
+                print(json.dumps({"case": case, "access": access, "mode": mode,
+                                  **measure(fetch, wrap, consume, params)}))
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,16 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from models.drug_ner import extract_drugs
-from models.interactions import check_interactions
+from fastapi.responses import JSONResponse
+from models.drug_ner import extract_drugs_async, ner_batcher, ner_model, warm_up as warm_up_ner
+from models.interactions import check_interactions, interaction_analyzer, interaction_model, warm_up as warm_up_interactions
 from backend.services import ibm_services
-from backend.services import analyze_with_watson
 from backend.services import item_services 
+from services.async_database import async_drug_db
+from services.ibm_services import analyze_with_watson_async, ibm_services as watson_services
+from services.stage_graph import Stage, StageFailed, run_stage_graph
+import asyncio
 import json
+import os
 from typing import List, Dict
 app = FastAPI(title="Medical Prescription Verifier API")
 # CORS configuration
@@ -16,45 +21,80 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 ) 
+# Load models in the background at startup instead of on the first request
+WARM_UP_MODELS = os.getenv("WARM_UP_MODELS", "1") == "1"
+
+# Per-stage timeouts (seconds) for /analyze-prescription
+STAGE_TIMEOUTS = {
+    'ner': float(os.getenv("STAGE_TIMEOUT_NER", "10")),
+    'interactions': float(os.getenv("STAGE_TIMEOUT_INTERACTIONS", "10")),
+    'watson': float(os.getenv("STAGE_TIMEOUT_WATSON", "5")),
+    'recommendations': float(os.getenv("STAGE_TIMEOUT_RECOMMENDATIONS", "2")),
+}
+
 # Load mock drug database
 with open('../data/drug_db.json') as f:
     DRUG_DB = json.load(f)
+def age_recommendations(drugs: List[str], age: int = None) -> List[Dict]:
+    recommendations = []
+    if age:
+        for drug in drugs:
+            drug_info = DRUG_DB.get(drug.lower(), {})
+            if 'age_dosage' in drug_info:
+                recommendations.append({
+                    'drug': drug,
+                    'recommended_dosage': drug_info['age_dosage'].get(str(age), "Standard dosage")
+                })
+    return recommendations
+
 @app.post("/analyze-prescription")
 async def analyze_prescription(prescription: str, age: int = None):
+    # Only drug extraction gates the rest: interactions, Watson and dosage
+    # lookups run concurrently once it is done, each with its own timeout.
+    # A failed or late optional stage yields its fallback and is listed in "partial".
+    # Watson waits for NER too, so a prescription without drugs neither pays
+    # for an NLU call nor waits for one before its "No drugs identified" reply.
+    async def ner():
+        return await extract_drugs_async(prescription)
+
+    def interactions(ner):
+        return check_interactions(ner) if ner else None
+
+    async def watson(ner):
+        if not ner:
+            return None
+        # The NLU client gives up within the stage budget instead of retrying past it
+        return await analyze_with_watson_async(prescription, deadline=STAGE_TIMEOUTS['watson'])
+
+    def recommendations(ner):
+        return age_recommendations(ner, age)
+
+    stages = [
+        Stage('ner', ner, timeout=STAGE_TIMEOUTS['ner'], required=True),
+        Stage('interactions', interactions, deps=['ner'], timeout=STAGE_TIMEOUTS['interactions']),
+        Stage('watson', watson, deps=['ner'], timeout=STAGE_TIMEOUTS['watson']),
+        Stage('recommendations', recommendations, deps=['ner'],
+              timeout=STAGE_TIMEOUTS['recommendations'], fallback=[]),
+    ]
     try:
-        # Step 1: Extract drug entities
-        drugs = extract_drugs(prescription)
-        
-        if not drugs:
-            return {"error": "No drugs identified in prescription"}
-        
-        # Step 2: Check interactions
-        interaction_results = check_interactions(drugs)
-        
-        # Step 3: Get IBM Watson insights
-        watson_analysis = analyze_with_watson(prescription)
-        
-        # Step 4: Age-specific recommendations
-        recommendations = []
-        if age:
-            for drug in drugs:
-                drug_info = DRUG_DB.get(drug.lower(), {})
-                if 'age_dosage' in drug_info:
-                    recommendations.append({
-                        'drug': drug,
-                        'recommended_dosage': drug_info['age_dosage'].get(str(age), "Standard dosage")
-                    })
-        
-        return {
-            "drugs": drugs,
-            "interactions": interaction_results,
-            "watson_analysis": watson_analysis,
-            "recommendations": recommendations
-        }
-    
+        run = await run_stage_graph(stages)
+    except StageFailed as e:
+        raise HTTPException(status_code=504 if e.status == "timeout" else 500, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    results = run["results"]
+    if not results['ner']:
+        return {"error": "No drugs identified in prescription", "timings": run["timings"]}
+    return {
+        "drugs": results['ner'],
+        "interactions": results['interactions'],
+        "watson_analysis": results['watson'],
+        "recommendations": results['recommendations'],
+        "partial": run["partial"],
+        "timings": run["timings"],
+    }
+
 @app.get("/drug-alternatives/{drug_name}")
 async def get_alternatives(drug_name: str, age: int = None):
     try:
@@ -71,6 +111,60 @@ async def get_alternatives(drug_name: str, age: int = None):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/drugs/search")
+async def search_drugs(q: str, limit: int = 10):
+    try:
+        return {"results": await async_drug_db.search_drugs(q, limit)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/drugs/{drug_name}")
+async def get_drug(drug_name: str, age: int = None):
+    # Drug row, dosages and alternatives are fetched concurrently off the event loop
+    drug, dosages, alternatives = await asyncio.gather(
+        async_drug_db.get_drug(drug_name),
+        async_drug_db.get_dosages(drug_name),
+        async_drug_db.get_alternatives(drug_name, age),
+    )
+    if drug is None:
+        raise HTTPException(status_code=404, detail=f"Drug '{drug_name}' not found")
+    return {**drug, "dosages": dosages, "alternatives": alternatives}
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "drug_cache": async_drug_db.db.cache.stats(),
+        "interaction_cache": interaction_analyzer.interaction_cache.stats(),
+        "ner_batching": ner_batcher.stats(),
+        "watson_nlu": watson_services.nlu_async.stats(),
+        "watson_nlu_cache": watson_services.nlu_cache.stats(),
+    }
+
+@app.get("/ready")
+async def ready():
+    # The interaction model is optional: predictions degrade to 'unknown' without it
+    ner_ready = ner_model.ready or (not WARM_UP_MODELS and ner_model.state == "not_loaded")
+    body = {
+        "ready": ner_ready and interaction_model.state != "loading",
+        "models": {"drug_ner": ner_model.status(), "interactions": interaction_model.status()},
+    }
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+@app.on_event("startup")
+async def warm_up_models():
+    if WARM_UP_MODELS:
+        loop = asyncio.get_running_loop()
+        loop.run_in_executor(None, warm_up_ner)
+        loop.run_in_executor(None, warm_up_interactions)
+
+@app.on_event("shutdown")
+def close_database():
+    async_drug_db.close()
+
+@app.on_event("shutdown")
+async def close_watson():
+    await watson_services.nlu_async.aclose()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
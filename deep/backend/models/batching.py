@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+def inference_cores() -> int:
+    """CPU cores a forward pass can use (torch intra-op threads when torch is present)"""
+    try:
+        import torch
+        return torch.get_num_threads()
+    except ImportError:
+        return os.cpu_count() or 1
+
+class MicroBatcher:
+    """Coalesces concurrent single-item calls into batched calls.
+
+    Callers submit one item at a time from any thread or coroutine. A worker
+    thread waits up to max_wait_ms after the first queued item for more to
+    arrive, then runs batch_fn once on up to max_batch_size items and fans
+    the results back out to each caller's future.
+    batch_fn takes a list of inputs and returns a list of outputs in order.
+    Items whose future was cancelled before their batch ran are dropped.
+    If the worker thread dies, its batch fails and the next submit() starts
+    a new one.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 16,
+                 max_wait_ms: float = 5.0, name: str = "batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.restarts = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    if self._thread is not None:
+                        self.restarts += 1
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def submit(self, item) -> Future:
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def __call__(self, item):
+        """Blocking single-item call"""
+        return self.submit(item).result()
+
+    async def call_async(self, item):
+        """Awaitable single-item call; does not block the event loop"""
+        return await asyncio.wrap_future(self.submit(item))
+
+    def _collect(self) -> List:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def _resolve(future: Future, result=None, error: BaseException = None):
+        """Complete a caller's future; one that is already done or cancelled is left alone"""
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def _run(self):
+        batch = []
+        try:
+            while True:
+                batch = self._collect()
+                self._run_batch(batch)
+                batch = []
+        except BaseException as e:
+            # Not an ordinary batch_fn error (those fail one batch in _run_batch)
+            logger.exception(f"{self.name}: worker thread died; restarting on next submit")
+            error = RuntimeError(f"{self.name} worker thread died: {e!r}")
+            for _, future, _ in batch:
+                self._resolve(future, error=error)
+
+    def _run_batch(self, batch: List):
+        # Callers that gave up (e.g. a timed-out request) are not run at all
+        live = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+        self.cancelled += len(batch) - len(live)
+        if not live:
+            return
+        items = [item for item, _, _ in live]
+        start = time.perf_counter()
+        try:
+            results = self.batch_fn(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name}: batch_fn returned {len(results)} results for {len(items)} inputs")
+        except Exception as e:
+            self.errors += 1
+            for _, future, _ in live:
+                self._resolve(future, error=e)
+            return
+        finally:
+            self.busy_seconds += time.perf_counter() - start
+            self.batches += 1
+            self.requests += len(live)
+            self.wait_seconds += sum(start - queued for _, _, queued in live)
+        for (_, future, _), result in zip(live, results):
+            self._resolve(future, result)
+
+    def stats(self) -> Dict:
+        throughput = self.requests / self.busy_seconds if self.busy_seconds else None
+        cores = inference_cores()
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "requests": self.requests,
+            "batches": self.batches,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "restarts": self.restarts,
+            "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else None,
+            "mean_queue_wait_ms": round(self.wait_seconds / self.requests * 1000, 3) if self.requests else None,
+            "cores": cores,
+            "throughput_per_s": round(throughput, 1) if throughput else None,
+            "throughput_per_core_per_s": round(throughput / cores, 1) if throughput else None,
+        }
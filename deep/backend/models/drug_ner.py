@@ -1,16 +1,24 @@
-from transformers import pipeline
+import os
 from typing import List
 
-# Initialize Hugging Face NER pipeline
-try:
-    drug_ner = pipeline("ner", model="d4data/biomedical-ner-all", device="cpu")
-except:
+from models.batching import MicroBatcher
+from models.loading import MODEL_FORMAT, LazyModel, load_pipeline
+
+# Micro-batching: concurrent requests wait up to NER_MAX_WAIT_MS to share one padded forward pass
+NER_MAX_BATCH = int(os.getenv("NER_MAX_BATCH", "16"))
+NER_MAX_WAIT_MS = float(os.getenv("NER_MAX_WAIT_MS", "5"))
+# Inference backend for NER only (pytorch | quantized | onnx | onnx-int8); defaults to MODEL_FORMAT
+NER_MODEL_FORMAT = os.getenv("NER_MODEL_FORMAT", MODEL_FORMAT)
+
+# Hugging Face NER pipeline, loaded on first use (or by warm_up at startup)
+ner_model = LazyModel("drug_ner", [
+    ("d4data/biomedical-ner-all", lambda: load_pipeline("ner", "d4data/biomedical-ner-all", NER_MODEL_FORMAT)),
     # Fallback to simpler model if the primary one fails to load
-    drug_ner = pipeline("ner", model="dslim/bert-base-NER", device="cpu")
+    ("dslim/bert-base-NER", lambda: load_pipeline("ner", "dslim/bert-base-NER", NER_MODEL_FORMAT)),
+], model_format=NER_MODEL_FORMAT)
 
-def extract_drugs(text: str) -> List[str]:
-    """Extract drug names from prescription text"""
-    entities = drug_ner(text)
+def _entities_to_drugs(entities: List[dict]) -> List[str]:
+    """Merge B-/I-DRUG word pieces into drug names"""
     drugs = set()
     
     current_drug = ""
@@ -38,4 +46,27 @@ def extract_drugs(text: str) -> List[str]:
             drug = drug[:-2]
         processed_drugs.append(drug)
     
-    return list(set(processed_drugs))
\ No newline at end of file
+    return list(set(processed_drugs))
+
+def _extract_batch(texts: List[str]) -> List[List[str]]:
+    # A list input makes the pipeline pad the texts into batches of batch_size
+    drug_ner = ner_model.get()
+    if drug_ner is None:
+        raise RuntimeError(f"NER model unavailable: {ner_model.error}")
+    entities = drug_ner(texts, batch_size=len(texts))
+    return [_entities_to_drugs(e) for e in entities]
+
+ner_batcher = MicroBatcher(_extract_batch, max_batch_size=NER_MAX_BATCH, max_wait_ms=NER_MAX_WAIT_MS, name="drug-ner")
+
+def extract_drugs(text: str) -> List[str]:
+    """Extract drug names from prescription text"""
+    return ner_batcher(text)
+
+async def extract_drugs_async(text: str) -> List[str]:
+    """extract_drugs for coroutines; concurrent callers share a batch"""
+    return await ner_batcher.call_async(text)
+
+def warm_up():
+    """Load the NER model and push one batch through it"""
+    if ner_model.get() is not None:
+        _extract_batch(["Take aspirin 100 mg daily"])
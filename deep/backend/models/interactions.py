@@ -1,25 +1,41 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import json
-from transformers import pipeline
+import os
 import requests
 
+from models.loading import LazyModel, load_pipeline
+from services.lookup_cache import LookupCache, shared_backend_from_url
+
+# Bounded LRU for model predictions. INTERACTION_CACHE_SHARED (sqlite:///path or
+# redis://host) adds a tier shared by every uvicorn worker. DRUG_DB pairs are
+# plain dict lookups and are never cached.
+INTERACTION_CACHE_SIZE = int(os.getenv("INTERACTION_CACHE_SIZE", "50000"))
+INTERACTION_CACHE_TTLS = {
+    'interaction_model': float(os.getenv("INTERACTION_CACHE_TTL_MODEL", "604800")),
+}
+INTERACTION_CACHE_SHARED = os.getenv("INTERACTION_CACHE_SHARED", "")
+# Prompts per forward pass when scoring the pairs DRUG_DB does not cover
+INTERACTION_BATCH_SIZE = int(os.getenv("INTERACTION_BATCH_SIZE", "32"))
+
+_UNSCORED = object()
+
 # Load drug interaction database
 with open('../../data/drug_db.json') as f:
     DRUG_DB = json.load(f)
 
-try:
-    interaction_model = pipeline(
-        "text-classification",
-        model="bert-base-uncased",
-        framework="pt"
-    )
-except Exception as e:
-    print(f"Failed to load interaction model: {e}")
-    interaction_model = None
+# Loaded on first use (or by warm_up at startup); get() is None if loading failed
+interaction_model = LazyModel("interactions", [
+    ("bert-base-uncased", lambda: load_pipeline("text-classification", "bert-base-uncased")),
+])
 
 class DrugInteractionAnalyzer:
-    def __init__(self):
-        self.interaction_cache = {}
+    def __init__(self, batch_size: int = INTERACTION_BATCH_SIZE, cache: LookupCache = None):
+        self.batch_size = batch_size
+        self.interaction_cache = cache or LookupCache(
+            maxsize=INTERACTION_CACHE_SIZE,
+            ttls=INTERACTION_CACHE_TTLS,
+            shared=shared_backend_from_url(INTERACTION_CACHE_SHARED),
+        )
         self.severity_levels = {
             'high': {'color': 'red', 'weight': 3},
             'moderate': {'color': 'orange', 'weight': 2},
@@ -29,30 +45,59 @@ class DrugInteractionAnalyzer:
 
     def predict_interaction(self, drug1: str, drug2: str) -> Dict[str, str]:
         """Predict interaction between two drugs using ML model"""
-        if interaction_model is None:
-            return {
+        return self.predict_interactions([(drug1, drug2)])[(drug1, drug2)]
+
+    def predict_interactions(self, pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict[str, str]]:
+        """Predict many pairs at once.
+
+        Duplicate and already-cached pairs are skipped; the rest go through
+        the pipeline as one list, batch_size prompts per forward pass.
+        """
+        model = interaction_model.get()
+        if model is None:
+            return {pair: {
                 'severity': 'unknown',
                 'effect': 'Model not available',
                 'recommendation': 'Consult drug database'
-            }
+            } for pair in pairs}
+
+        # Keyed by model version so swapping weights never serves stale predictions
+        version = interaction_model.version
+        results = {}
+        unscored = []
+        for pair in dict.fromkeys(pairs):
+            cached = self.interaction_cache.get('interaction_model', f"{version}|{pair[0]}|{pair[1]}", _UNSCORED)
+            if cached is _UNSCORED:
+                unscored.append(pair)
+            else:
+                results[pair] = cached
+        if not unscored:
+            return results
 
         # Create a prompt for the model
-        prompt = f"What happens when you take {drug1} and {drug2} together?"
-        
+        prompts = [f"What happens when you take {drug1} and {drug2} together?" for drug1, drug2 in unscored]
         try:
-            result = interaction_model(prompt)[0]
-            return {
+            outputs = model(prompts, batch_size=self.batch_size)
+        except Exception as e:
+            print(f"Interaction prediction failed: {e}")
+            for pair in unscored:
+                results[pair] = {
+                    'severity': 'unknown',
+                    'effect': 'Prediction error',
+                    'recommendation': 'Consult a pharmacist'
+                }
+            return results
+        for (drug1, drug2), result in zip(unscored, outputs):
+            if isinstance(result, list):
+                result = result[0]
+            prediction = {
                 'severity': self._map_severity(result['label']),
                 'effect': result.get('effect', 'Possible interaction'),
                 'recommendation': self._generate_recommendation(drug1, drug2, result['label'])
             }
-        except Exception as e:
-            print(f"Interaction prediction failed: {e}")
-            return {
-                'severity': 'unknown',
-                'effect': 'Prediction error',
-                'recommendation': 'Consult a pharmacist'
-            }
+            self.interaction_cache.put('interaction_model', f"{version}|{drug1}|{drug2}", prediction)
+            results[(drug1, drug2)] = prediction
+        return results
 
     def _map_severity(self, label: str) -> str:
         """Map model output to severity levels"""
@@ -85,21 +130,14 @@ class DrugInteractionAnalyzer:
         drug1 = drug1.lower()
         drug2 = drug2.lower()
         
-        # Check cache first
-        cache_key = f"{drug1}_{drug2}" if drug1 < drug2 else f"{drug2}_{drug1}"
-        if cache_key in self.interaction_cache:
-            return self.interaction_cache[cache_key]
-        
         # Check database
         interactions = DRUG_DB.get(drug1, {}).get('interactions', {})
         if drug2 in interactions:
-            self.interaction_cache[cache_key] = interactions[drug2]
             return interactions[drug2]
         
         # Check reverse
         interactions = DRUG_DB.get(drug2, {}).get('interactions', {})
         if drug1 in interactions:
-            self.interaction_cache[cache_key] = interactions[drug1]
             return interactions[drug1]
         
         return None
@@ -112,8 +150,11 @@ class DrugInteractionAnalyzer:
         for i in range(len(drugs)):
             for j in range(i+1, len(drugs)):
                 drug_pairs.append((drugs[i], drugs[j]))
+        db_interactions = {pair: self.check_database_interaction(*pair) for pair in drug_pairs}
+        # Every pair the database misses is scored in one batched model call
+        predictions = self.predict_interactions([pair for pair, hit in db_interactions.items() if not hit])
         for drug1, drug2 in drug_pairs:
-            db_interaction = self.check_database_interaction(drug1, drug2) 
+            db_interaction = db_interactions[(drug1, drug2)]
             if db_interaction:
                 interactions.append({
                     'drug1': drug1,
@@ -126,7 +167,7 @@ class DrugInteractionAnalyzer:
                 if db_interaction.get('severity', 'moderate') != 'none':
                     has_interactions = True
             else:
-                pred_interaction = self.predict_interaction(drug1, drug2)
+                pred_interaction = predictions[(drug1, drug2)]
                 interactions.append({
                     'drug1': drug1,
                     'drug2': drug2,
@@ -148,4 +189,9 @@ interaction_analyzer = DrugInteractionAnalyzer()
 
 def check_interactions(drugs: List[str]) -> Dict:
     """Public interface for interaction checking"""
-    return interaction_analyzer.check_interactions(drugs)
\ No newline at end of file
+    return interaction_analyzer.check_interactions(drugs)
+
+def warm_up():
+    """Load the interaction model and run one prediction"""
+    if interaction_model.get() is not None:
+        interaction_analyzer.predict_interaction("aspirin", "warfarin")
@@ -0,0 +1,146 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Weight format for every pipeline loaded through load_pipeline:
+#   pytorch   - full-precision PyTorch (default)
+#   quantized - PyTorch with Linear layers dynamically quantized to int8
+#   onnx      - ONNX Runtime via optimum, fp32 graph
+#   onnx-int8 - ONNX Runtime via optimum, graph with dynamic int8 quantization
+# ONNX graphs are read from MODEL_ONNX_DIR; missing ones are exported there on first load.
+MODEL_FORMAT = os.getenv("MODEL_FORMAT", "pytorch")
+MODEL_ONNX_DIR = os.getenv("MODEL_ONNX_DIR", str(Path(__file__).parent.parent.parent / 'data' / 'onnx'))
+ONNX_INT8_FILE = "model_quantized.onnx"
+
+_ORT_CLASSES = {
+    "ner": "ORTModelForTokenClassification",
+    "token-classification": "ORTModelForTokenClassification",
+    "text-classification": "ORTModelForSequenceClassification",
+}
+
+def onnx_dir(model: str, int8: bool = False) -> str:
+    """Where the exported graph for a hub model lives"""
+    return os.path.join(MODEL_ONNX_DIR, model.replace("/", "__") + ("-int8" if int8 else ""))
+
+def export_onnx(task: str, model: str, int8: bool = False) -> str:
+    """Export a hub model to ONNX (optionally int8-quantized) under MODEL_ONNX_DIR"""
+    import optimum.onnxruntime
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    ort_class = getattr(optimum.onnxruntime, _ORT_CLASSES[task])
+    fp32_dir = onnx_dir(model)
+    if not os.path.isdir(fp32_dir):
+        ort_class.from_pretrained(model, export=True).save_pretrained(fp32_dir)
+        AutoTokenizer.from_pretrained(model).save_pretrained(fp32_dir)
+    if not int8:
+        return fp32_dir
+    int8_dir = onnx_dir(model, int8=True)
+    if not os.path.isdir(int8_dir):
+        # Dynamic quantization: int8 weights, activations quantized per batch at run time
+        quantizer = ORTQuantizer.from_pretrained(fp32_dir)
+        config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=int8_dir, quantization_config=config)
+        AutoTokenizer.from_pretrained(fp32_dir).save_pretrained(int8_dir)
+    return int8_dir
+
+def load_pipeline(task: str, model: str, model_format: str = None, **kwargs):
+    """Build a Hugging Face pipeline in the configured weight format"""
+    from transformers import pipeline
+    model_format = model_format or MODEL_FORMAT
+    if model_format == "pytorch":
+        return pipeline(task, model=model, device="cpu", **kwargs)
+    if model_format == "quantized":
+        import torch
+        pipe = pipeline(task, model=model, device="cpu", **kwargs)
+        pipe.model = torch.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipe
+    if model_format in ("onnx", "onnx-int8"):
+        try:
+            import optimum.onnxruntime
+        except ImportError as e:
+            raise ImportError(
+                f"MODEL_FORMAT={model_format} needs the optional ONNX dependencies "
+                "(pip install -r requirements-onnx.txt)"
+            ) from e
+        from transformers import AutoTokenizer
+        int8 = model_format == "onnx-int8"
+        path = export_onnx(task, model, int8=int8)
+        ort_class = getattr(optimum.onnxruntime, _ORT_CLASSES[task])
+        ort_model = ort_class.from_pretrained(path, file_name=ONNX_INT8_FILE if int8 else "model.onnx")
+        return pipeline(task, model=ort_model, tokenizer=AutoTokenizer.from_pretrained(path), **kwargs)
+    raise ValueError(f"Unknown MODEL_FORMAT: {model_format}")
+
+class LazyModel:
+    """A model loaded on first use instead of at import.
+
+    candidates are (label, loader) pairs tried in order; the first that
+    loads wins, so a fallback model is only loaded when the primary fails.
+    get() returns None when every candidate failed.
+    """
+
+    def __init__(self, name: str, candidates: List[Tuple[str, Callable]], model_format: str = None):
+        self.name = name
+        self.candidates = candidates
+        self.model_format = model_format or MODEL_FORMAT
+        self._model = None
+        self._lock = threading.Lock()
+        self.state = "not_loaded"  # not_loaded | loading | ready | failed
+        self.source = None
+        self.error = None
+        self.load_seconds = None
+
+    def get(self):
+        if self.state in ("ready", "failed"):
+            return self._model
+        with self._lock:
+            if self.state in ("ready", "failed"):
+                return self._model
+            self.state = "loading"
+            start = time.perf_counter()
+            for label, loader in self.candidates:
+                try:
+                    self._model = loader()
+                    self.source = label
+                    break
+                except Exception as e:
+                    logger.warning(f"Failed to load {self.name} model {label}: {e}")
+                    self.error = str(e)
+            self.load_seconds = round(time.perf_counter() - start, 3)
+            self.state = "ready" if self._model is not None else "failed"
+            if self._model is not None:
+                self.error = None
+                logger.info(f"Loaded {self.name} model {self.source} ({self.model_format}) in {self.load_seconds}s")
+            return self._model
+
+    @property
+    def version(self) -> str:
+        """Identifies the loaded weights, for keying cached predictions"""
+        return f"{self.source}:{self.model_format}" if self.ready else None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def status(self) -> Dict:
+        return {
+            "state": self.state,
+            "model": self.source,
+            "format": self.model_format,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+        }
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Export a hub model to ONNX under MODEL_ONNX_DIR")
+    parser.add_argument("model", help="hub model id, e.g. d4data/biomedical-ner-all")
+    parser.add_argument("--task", default="ner", choices=sorted(_ORT_CLASSES))
+    parser.add_argument("--int8", action="store_true", help="also write a dynamically int8-quantized graph")
+    args = parser.parse_args()
+    print(export_onnx(args.task, args.model, int8=args.int8))
@@ -0,0 +1,68 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from services.database import DrugDatabase, Drug, DrugInteraction, AgeDosage, AlternativeDrug, drug_db
+
+# Threads serving database calls; each one holds its own pooled SQLite connection.
+# Row decoding holds the GIL, so more threads than ~2 per core only adds loop lag.
+DB_WORKERS = int(os.getenv("DRUG_DB_WORKERS", str(min(8, (os.cpu_count() or 1) * 2))))
+
+class AsyncDrugDatabase:
+    """Awaitable facade over DrugDatabase.
+
+    Every call runs on a dedicated thread pool so blocking SQLite work never
+    stalls the event loop. Each worker thread gets its own WAL connection
+    from the DrugDatabase pool, so in-flight reads proceed concurrently.
+    Return values are the same ones DrugDatabase produces.
+    """
+
+    def __init__(self, db: DrugDatabase = None, max_workers: int = DB_WORKERS):
+        self.db = db or drug_db
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="drugdb")
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def get_drug(self, drug_name: str) -> Optional[Dict]:
+        return await self._run(self.db.get_drug, drug_name)
+
+    async def get_interaction(self, drug1: str, drug2: str) -> Optional[Dict]:
+        return await self._run(self.db.get_interaction, drug1, drug2)
+
+    async def get_interactions_for_set(self, drugs: List[str]) -> List[Dict]:
+        return await self._run(self.db.get_interactions_for_set, drugs)
+
+    async def get_dosages(self, drug_name: str) -> List[Dict]:
+        return await self._run(self.db.get_dosages, drug_name)
+
+    async def get_alternatives(self, original_drug_name: str, age: int = None) -> List[Dict]:
+        return await self._run(self.db.get_alternatives, original_drug_name, age)
+
+    async def search_drugs(self, query: str, limit: int = 10) -> List[Dict]:
+        return await self._run(self.db.search_drugs, query, limit)
+
+    async def add_drug(self, drug: Drug) -> int:
+        return await self._run(self.db.add_drug, drug)
+
+    async def add_interaction(self, interaction: DrugInteraction) -> int:
+        return await self._run(self.db.add_interaction, interaction)
+
+    async def add_dosage(self, drug_name: str, dosage: AgeDosage) -> int:
+        return await self._run(self.db.add_dosage, drug_name, dosage)
+
+    async def add_alternative(self, original_drug_name: str, alternative: AlternativeDrug) -> int:
+        return await self._run(self.db.add_alternative, original_drug_name, alternative)
+
+    async def import_from_json(self, json_file: str) -> Dict:
+        return await self._run(self.db.import_from_json, json_file)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.db.close()
+
+# Initialize global async facade
+async_drug_db = AsyncDrugDatabase()
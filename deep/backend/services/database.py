@@ -1,6 +1,10 @@
 import json
 import os
-from typing import Dict, List, Optional
+import tempfile
+import threading
+import time
+from collections.abc import Mapping
+from typing import Dict, Generator, List, Optional
 from pathlib import Path
 from pydantic import BaseModel, validator
 import sqlite3
@@ -8,6 +12,8 @@ from sqlite3 import Connection
 from contextlib import contextmanager
 import logging
 
+from services.lookup_cache import DRUG_CACHE_SHARED, LookupCache, shared_backend_from_url
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -47,30 +53,279 @@ class AlternativeDrug(BaseModel):
     min_age: Optional[int] = None
     max_age: Optional[int] = None
 
+# Connection tuning applied to every pooled connection
+SQLITE_PRAGMAS = {
+    'synchronous': 'NORMAL',   # safe with WAL, avoids an fsync per commit
+    'cache_size': -64000,      # 64 MB page cache per connection
+    'mmap_size': 268435456,    # 256 MB memory-mapped reads
+    'temp_store': 'MEMORY',
+}
+STATEMENT_CACHE_SIZE = 256  # prepared statements kept per connection
+
+# Secondary indexes dropped during bulk loads and rebuilt once at the end
+SECONDARY_INDEXES = {
+    'idx_alternatives_original': "CREATE INDEX IF NOT EXISTS idx_alternatives_original ON alternatives(original_drug_id)",
+    # Covers every column an interaction lookup returns, so pair queries never touch the table
+    'idx_interactions_covering': """
+        CREATE INDEX IF NOT EXISTS idx_interactions_covering ON interactions(
+            drug1_id, drug2_id, severity, effect, recommendation, mechanism, "references"
+        )
+    """,
+}
+
+# Full-text index over drug names for search_drugs, kept in sync by triggers.
+# Trigram tokenization gives infix matching; older SQLite builds fall back to
+# word-prefix matching, and builds without FTS5 to LIKE scans.
+SEARCH_TOKENIZERS = [('trigram', "tokenize='trigram'"), ('prefix', "prefix='2 3 4'")]
+SEARCH_TRIGGERS = {
+    'drugs_fts_ai': """
+        CREATE TRIGGER IF NOT EXISTS drugs_fts_ai AFTER INSERT ON drugs BEGIN
+            INSERT INTO drugs_fts (rowid, name, generic_name) VALUES (new.id, new.name, new.generic_name);
+        END
+    """,
+    'drugs_fts_ad': """
+        CREATE TRIGGER IF NOT EXISTS drugs_fts_ad AFTER DELETE ON drugs BEGIN
+            INSERT INTO drugs_fts (drugs_fts, rowid, name, generic_name)
+            VALUES ('delete', old.id, old.name, old.generic_name);
+        END
+    """,
+    'drugs_fts_au': """
+        CREATE TRIGGER IF NOT EXISTS drugs_fts_au AFTER UPDATE ON drugs BEGIN
+            INSERT INTO drugs_fts (drugs_fts, rowid, name, generic_name)
+            VALUES ('delete', old.id, old.name, old.generic_name);
+            INSERT INTO drugs_fts (rowid, name, generic_name) VALUES (new.id, new.name, new.generic_name);
+        END
+    """,
+}
+
+# Name-only rows are created when an interaction names a drug that was never added;
+# add_drug and bulk imports fill such a placeholder instead of failing on the unique name
+PLACEHOLDER_DRUG = """
+    drugs.generic_name IS NULL AND drugs.drug_class IS NULL AND drugs.description IS NULL
+    AND drugs.contraindications IS NULL AND drugs.side_effects IS NULL
+"""
+UPSERT_DRUG = f"""
+    INSERT INTO drugs (id, name, generic_name, drug_class, description, contraindications, side_effects)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(name) DO UPDATE SET
+        generic_name = excluded.generic_name, drug_class = excluded.drug_class,
+        description = excluded.description, contraindications = excluded.contraindications,
+        side_effects = excluded.side_effects
+    WHERE {PLACEHOLDER_DRUG}
+"""
+
+# Interactions are stored once per pair with drug1_id < drug2_id; names come from drugs
+INTERACTION_COLUMNS = """
+    i.id, a.name AS drug1, b.name AS drug2, i.severity, i.effect,
+    i.mechanism, i.recommendation, i."references"
+"""
+
+def iter_json_arrays(fp, chunk_size: int = 1 << 16):
+    """Incrementally parse a top-level JSON object, yielding (key, item) for every
+    element of its array values without loading the whole document.
+    Non-array values are parsed and skipped."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf, pos = buf[pos:] + chunk, 0
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    def peek() -> str:
+        skip_ws()
+        if pos >= len(buf):
+            raise ValueError("Unexpected end of JSON input")
+        return buf[pos]
+
+    def expect(ch: str):
+        nonlocal pos
+        if peek() != ch:
+            raise ValueError(f"Expected {ch!r} at offset {pos}, found {buf[pos]!r}")
+        pos += 1
+
+    def decode():
+        nonlocal pos
+        skip_ws()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                # A value ending exactly at the buffer edge may be truncated (e.g. a number)
+                if end < len(buf) or eof:
+                    pos = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+
+    fill()
+    expect('{')
+    while peek() != '}':
+        key = decode()
+        expect(':')
+        if peek() == '[':
+            expect('[')
+            while peek() != ']':
+                yield key, decode()
+                if peek() == ',':
+                    expect(',')
+            expect(']')
+        else:
+            decode()
+        if peek() == ',':
+            expect(',')
+
+# Columns stored as JSON text; decoded once per row by Record
+JSON_FIELDS = frozenset(['contraindications', 'side_effects', 'references'])
+
+class Record(Mapping):
+    """Read-only view of a result row.
+
+    Wraps the sqlite3.Row directly and parses JSON columns on first access,
+    then caches them. DrugDatabase's public reads hand out plain dicts
+    (to_dict(), or the lookup cache's copy), so every method returns the
+    same type and results can be serialized or modified by the caller.
+    """
+    __slots__ = ('_row', '_decoded')
+
+    def __init__(self, row: sqlite3.Row):
+        self._row = row
+        self._decoded = None
+
+    def __getitem__(self, key: str):
+        try:
+            value = self._row[key]
+        except IndexError:
+            raise KeyError(key) from None
+        if key not in JSON_FIELDS or not value:
+            return value
+        if self._decoded is None:
+            self._decoded = {}
+        elif key in self._decoded:
+            return self._decoded[key]
+        try:
+            decoded = json.loads(value)
+        except json.JSONDecodeError:
+            decoded = None
+        self._decoded[key] = decoded
+        return decoded
+
+    def __iter__(self):
+        return iter(self._row.keys())
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def to_dict(self) -> Dict:
+        return {key: self[key] for key in self}
+
+    def __repr__(self) -> str:
+        return f"Record({self.to_dict()!r})"
+
+class ConnectionPool:
+    """One long-lived SQLite connection per thread, opened on first use.
+
+    File databases run in WAL mode so readers on different threads/workers
+    never block each other. ':memory:' databases are backed by a private
+    temporary file, removed by close_all(): SQLite's shared-cache memory
+    mode locks whole tables and fails concurrent readers with SQLITE_LOCKED.
+    Connections of threads that have exited are closed when a new thread
+    connects.
+    """
+
+    def __init__(self, db_path: str, pragmas: Dict = None):
+        self.db_path = db_path
+        self.pragmas = dict(SQLITE_PRAGMAS, **(pragmas or {}))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[threading.Thread, Connection] = {}
+        self._temp_path = None
+        if db_path == ':memory:':
+            fd, self._temp_path = tempfile.mkstemp(prefix='drugdb-', suffix='.db')
+            os.close(fd)
+            db_path = self._temp_path
+        self._uri = Path(db_path).absolute().as_uri()
+        self.connection().execute("PRAGMA journal_mode=WAL")
+
+    def _connect(self) -> Connection:
+        conn = sqlite3.connect(
+            self._uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def connection(self) -> Connection:
+        """The calling thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            with self._lock:
+                for thread in [t for t in self._connections if not t.is_alive()]:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = conn
+        return conn
+
+    @property
+    def size(self) -> int:
+        """Open connections"""
+        return len(self._connections)
+
+    def close_all(self):
+        with self._lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+        if self._temp_path:
+            for suffix in ('', '-wal', '-shm'):
+                try:
+                    os.remove(self._temp_path + suffix)
+                except FileNotFoundError:
+                    pass
+            self._temp_path = None
+
 class DrugDatabase:
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, cache: LookupCache = None):
         self.db_path = db_path or self._get_default_db_path()
+        self.pool = ConnectionPool(self.db_path)
+        # Read-through cache for get_drug / get_dosages / get_alternatives, which return plain dicts
+        self.cache = cache or LookupCache(shared=shared_backend_from_url(DRUG_CACHE_SHARED))
         self._initialize_database()
 
     def _get_default_db_path(self) -> str:
         """Get the default path for the drug database"""
         return str(Path(__file__).parent.parent.parent / 'data' / 'drugs.db')
 
-    # In database.py
-from typing import Generator
-import sqlite3
-from contextlib import contextmanager
-
-@contextmanager
-def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
-    """Properly typed database connection generator"""
-    conn = sqlite3.connect(self.db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
+    @contextmanager
+    def _get_connection(self) -> Generator[sqlite3.Connection, None, None]:
+        """Borrow this thread's pooled connection; rolls back on error"""
+        conn = self.pool.connection()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
 
+    def close(self):
+        """Close every pooled connection"""
+        self.pool.close_all()
 
     def _initialize_database(self):
         """Initialize the database with required tables"""
@@ -85,25 +340,50 @@ def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
                     generic_name TEXT,
                     drug_class TEXT,
                     description TEXT,
-                    contraindications TEXT,  # JSON array
-                    side_effects TEXT       # JSON array
+                    contraindications TEXT,  -- JSON array
+                    side_effects TEXT       -- JSON array
                 )
             """)
             
-            # Create interactions table
+            # Databases created before pairs were stored by drug ID
+            legacy = 'drug1' in [r[1] for r in cursor.execute("PRAGMA table_info(interactions)")]
+            if legacy:
+                cursor.execute("ALTER TABLE interactions RENAME TO interactions_legacy")
+
+            # Create interactions table (one row per unordered pair, drug1_id < drug2_id)
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS interactions (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    drug1 TEXT NOT NULL,
-                    drug2 TEXT NOT NULL,
+                    drug1_id INTEGER NOT NULL,
+                    drug2_id INTEGER NOT NULL,
                     severity TEXT NOT NULL,
                     effect TEXT NOT NULL,
                     mechanism TEXT,
                     recommendation TEXT NOT NULL,
-                    references TEXT,       # JSON array
-                    UNIQUE(drug1, drug2)
+                    "references" TEXT,     -- JSON array
+                    FOREIGN KEY(drug1_id) REFERENCES drugs(id),
+                    FOREIGN KEY(drug2_id) REFERENCES drugs(id),
+                    CHECK(drug1_id < drug2_id),
+                    UNIQUE(drug1_id, drug2_id)
                 )
             """)
+
+            if legacy:
+                cursor.execute("""
+                    INSERT OR IGNORE INTO drugs (name)
+                    SELECT drug1 FROM interactions_legacy UNION SELECT drug2 FROM interactions_legacy
+                """)
+                cursor.execute("""
+                    INSERT OR IGNORE INTO interactions
+                        (drug1_id, drug2_id, severity, effect, mechanism, recommendation, "references")
+                    SELECT MIN(a.id, b.id), MAX(a.id, b.id), l.severity, l.effect, l.mechanism,
+                           l.recommendation, l."references"
+                    FROM interactions_legacy l
+                    JOIN drugs a ON a.name = l.drug1
+                    JOIN drugs b ON b.name = l.drug2
+                    WHERE a.id != b.id
+                """)
+                cursor.execute("DROP TABLE interactions_legacy")
             
             # Create dosage table
             cursor.execute("""
@@ -132,17 +412,48 @@ def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
                     FOREIGN KEY(original_drug_id) REFERENCES drugs(id)
                 )
             """)
+
+            for ddl in SECONDARY_INDEXES.values():
+                cursor.execute(ddl)
+
+            self.search_mode = self._create_search_index(cursor)
             
             conn.commit()
 
+    def _create_search_index(self, cursor, rebuild: bool = False) -> str:
+        """Create the drugs_fts table and its sync triggers; returns the search mode"""
+        exists = cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'drugs_fts'"
+        ).fetchone()
+        if exists:
+            mode = 'trigram' if 'trigram' in exists[0] else 'prefix'
+        else:
+            for mode, options in SEARCH_TOKENIZERS:
+                try:
+                    cursor.execute(f"""
+                        CREATE VIRTUAL TABLE drugs_fts USING fts5(
+                            name, generic_name, content='drugs', content_rowid='id', {options}
+                        )
+                    """)
+                    break
+                except sqlite3.OperationalError:
+                    continue
+            else:
+                logger.warning("SQLite FTS5 unavailable; search_drugs will scan with LIKE")
+                return 'like'
+            rebuild = True
+        for ddl in SEARCH_TRIGGERS.values():
+            cursor.execute(ddl)
+        if rebuild:
+            cursor.execute("INSERT INTO drugs_fts (drugs_fts) VALUES ('rebuild')")
+        return mode
+
     def add_drug(self, drug: Drug) -> int:
-        """Add a new drug to the database"""
+        """Add a new drug to the database, filling in its placeholder row if one exists"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO drugs (name, generic_name, drug_class, description, contraindications, side_effects)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
+            cursor.execute(UPSERT_DRUG, (
+                None,
                 drug.name,
                 drug.generic_name,
                 drug.drug_class,
@@ -150,19 +461,34 @@ def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
                 json.dumps(drug.contraindications) if drug.contraindications else None,
                 json.dumps(drug.side_effects) if drug.side_effects else None
             ))
+            if cursor.rowcount == 0:
+                raise sqlite3.IntegrityError("UNIQUE constraint failed: drugs.name")
+            drug_id = cursor.execute("SELECT id FROM drugs WHERE name = ?", (drug.name,)).fetchone()[0]
             conn.commit()
-            return cursor.lastrowid
+        self.cache.invalidate('drugs')
+        return drug_id
+
+    def _ensure_drug_ids(self, cursor, names: List[str]) -> Dict[str, int]:
+        """Map drug names to IDs, adding name-only drug rows for unknown names"""
+        cursor.executemany("INSERT OR IGNORE INTO drugs (name) VALUES (?)", [(n,) for n in names])
+        cursor.execute(
+            "SELECT name, id FROM drugs WHERE name IN (SELECT value FROM json_each(?))",
+            (json.dumps(names),)
+        )
+        return dict(cursor.fetchall())
 
     def add_interaction(self, interaction: DrugInteraction) -> int:
         """Add a new drug interaction to the database"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            ids = self._ensure_drug_ids(cursor, [interaction.drug1.lower(), interaction.drug2.lower()])
+            drug1_id, drug2_id = sorted((ids[interaction.drug1.lower()], ids[interaction.drug2.lower()]))
             cursor.execute("""
-                INSERT INTO interactions (drug1, drug2, severity, effect, mechanism, recommendation, references)
+                INSERT INTO interactions (drug1_id, drug2_id, severity, effect, mechanism, recommendation, "references")
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (
-                interaction.drug1.lower(),
-                interaction.drug2.lower(),
+                drug1_id,
+                drug2_id,
                 interaction.severity,
                 interaction.effect,
                 interaction.mechanism,
@@ -170,7 +496,8 @@ def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
                 json.dumps(interaction.references) if interaction.references else None
             ))
             conn.commit()
-            return cursor.lastrowid
+        self.cache.invalidate('drugs')
+        return cursor.lastrowid
 
     def add_dosage(self, drug_name: str, dosage: AgeDosage) -> int:
         """Add age-specific dosage information for a drug"""
@@ -190,7 +517,8 @@ def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
                 dosage.notes
             ))
             conn.commit()
-            return cursor.lastrowid
+        self.cache.invalidate('dosages')
+        return cursor.lastrowid
 
     def add_alternative(self, original_drug_name: str, alternative: AlternativeDrug) -> int:
         """Add an alternative drug to the database"""
@@ -211,10 +539,15 @@ def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
                 alternative.max_age
             ))
             conn.commit()
-            return cursor.lastrowid
+        self.cache.invalidate('alternatives')
+        return cursor.lastrowid
 
     def get_drug(self, drug_name: str) -> Optional[Dict]:
         """Retrieve a drug by name"""
+        name = drug_name.lower()
+        return self.cache.read_through('drugs', name, lambda: self._load_drug(name))
+
+    def _load_drug(self, drug_name: str) -> Optional[Record]:
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
@@ -223,29 +556,50 @@ def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
             row = cursor.fetchone()
             
             if row:
-                return self._row_to_dict(row)
+                return self._row_to_record(row)
             return None
 
     def get_interaction(self, drug1: str, drug2: str) -> Optional[Dict]:
         """Retrieve interaction between two drugs"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            # Check both directions (A+B and B+A)
-            cursor.execute("""
-                SELECT * FROM interactions 
-                WHERE (drug1 = ? AND drug2 = ?) OR (drug1 = ? AND drug2 = ?)
+            # Pairs are stored once in ID order, so either argument order hits the same index entry
+            cursor.execute(f"""
+                SELECT {INTERACTION_COLUMNS}
+                FROM drugs a, drugs b
+                JOIN interactions i ON i.drug1_id = a.id AND i.drug2_id = b.id
+                WHERE a.name IN (?, ?) AND b.name IN (?, ?) AND a.id < b.id
             """, (
                 drug1.lower(), drug2.lower(),
-                drug2.lower(), drug1.lower()
+                drug1.lower(), drug2.lower()
             ))
-            row = cursor.fetchone()
-            
-            if row:
-                return self._row_to_dict(row)
-            return None
+            return self._row_to_dict(cursor.fetchone())
+
+    def get_interactions_for_set(self, drugs: List[str]) -> List[Dict]:
+        """Retrieve every known interaction among a list of drugs in one indexed query"""
+        names = sorted({d.lower() for d in drugs if d})
+        if len(names) < 2:
+            return []
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                WITH ids AS (
+                    SELECT id FROM drugs WHERE name IN (SELECT value FROM json_each(?))
+                )
+                SELECT {INTERACTION_COLUMNS}
+                FROM interactions i
+                JOIN drugs a ON a.id = i.drug1_id
+                JOIN drugs b ON b.id = i.drug2_id
+                WHERE i.drug1_id IN ids AND i.drug2_id IN ids
+            """, (json.dumps(names),))
+            return [self._row_to_dict(row) for row in cursor.fetchall()]
 
     def get_dosages(self, drug_name: str) -> List[Dict]:
         """Retrieve all dosage information for a drug"""
+        name = drug_name.lower()
+        return self.cache.read_through('dosages', name, lambda: self._load_dosages(name))
+
+    def _load_dosages(self, drug_name: str) -> List[Record]:
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
@@ -254,10 +608,14 @@ def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
                 WHERE dr.name = ?
             """, (drug_name.lower(),))
             
-            return [self._row_to_dict(row) for row in cursor.fetchall()]
+            return [self._row_to_record(row) for row in cursor.fetchall()]
 
     def get_alternatives(self, original_drug_name: str, age: int = None) -> List[Dict]:
         """Retrieve alternative drugs with optional age filtering"""
+        name = original_drug_name.lower()
+        return self.cache.read_through('alternatives', f"{name}|{age}", lambda: self._load_alternatives(name, age))
+
+    def _load_alternatives(self, original_drug_name: str, age: int = None) -> List[Record]:
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
@@ -273,77 +631,196 @@ def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
                 params.extend([age, age])
             
             cursor.execute(query, params)
-            return [self._row_to_dict(row) for row in cursor.fetchall()]
+            return [self._row_to_record(row) for row in cursor.fetchall()]
 
     def search_drugs(self, query: str, limit: int = 10) -> List[Dict]:
-        """Search for drugs by name or generic name"""
+        """Search for drugs by name or generic name.
+
+        Exact and prefix name matches rank first, then FTS relevance (bm25).
+        """
+        query = query.lower().strip()
+        if not query:
+            return []
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM drugs 
-                WHERE name LIKE ? OR generic_name LIKE ?
-                LIMIT ?
-            """, (
-                f"%{query.lower()}%",
-                f"%{query.lower()}%",
-                limit
-            ))
+            if self.search_mode == 'like' or (self.search_mode == 'trigram' and len(query) < 3):
+                # Queries shorter than a trigram cannot use the FTS index; scan names and generic names
+                cursor.execute("""
+                    SELECT * FROM drugs 
+                    WHERE name LIKE ? OR generic_name LIKE ?
+                    ORDER BY name = ? DESC, substr(name, 1, ?) = ? DESC, name
+                    LIMIT ?
+                """, (
+                    f"%{query}%",
+                    f"%{query}%",
+                    query, len(query), query,
+                    limit
+                ))
+            else:
+                phrase = '"' + query.replace('"', '""') + '"'
+                if self.search_mode == 'prefix':
+                    phrase += '*'
+                cursor.execute("""
+                    SELECT d.* FROM drugs_fts f
+                    JOIN drugs d ON d.id = f.rowid
+                    WHERE drugs_fts MATCH ?
+                    ORDER BY d.name = ? DESC, substr(d.name, 1, ?) = ? DESC, f.rank
+                    LIMIT ?
+                """, (phrase, query, len(query), query, limit))
             return [self._row_to_dict(row) for row in cursor.fetchall()]
 
-    def _row_to_dict(self, row) -> Dict:
-        """Convert SQLite row to dictionary with proper JSON parsing"""
+    def _row_to_record(self, row) -> Optional[Record]:
+        """Wrap a SQLite row; JSON fields are parsed lazily on access"""
         if row is None:
             return None
-            
-        result = dict(row)
-        
-        # Parse JSON fields
-        json_fields = ['contraindications', 'side_effects', 'references']
-        for field in json_fields:
-            if field in result and result[field]:
-                try:
-                    result[field] = json.loads(result[field])
-                except json.JSONDecodeError:
-                    result[field] = None
-        
-        return result
+        return Record(row)
 
-    def import_from_json(self, json_file: str):
+    def _row_to_dict(self, row) -> Optional[Dict]:
+        """A SQLite row as the plain dict every public read returns"""
+        if row is None:
+            return None
+        return Record(row).to_dict()
+
+    def import_from_json(self, json_file: str) -> Dict:
         """Import drug data from a JSON file"""
-        with open(json_file) as f:
-            data = json.load(f)
-            
+        return self.bulk_import_json(json_file)
+
+    def bulk_import_json(self, json_file: str, batch_size: int = 5000) -> Dict:
+        """Stream a formulary JSON file into the database in a single transaction.
+
+        Rows are validated one by one, buffered and written with executemany;
+        drug IDs are assigned in memory so dosages, alternatives and
+        interaction pairs never re-select them. Secondary indexes and the
+        search index are rebuilt once at the end.
+        Returns row counts and throughput.
+        """
+        start = time.perf_counter()
+        counts = {'drugs': 0, 'dosages': 0, 'alternatives': 0, 'interactions': 0, 'skipped': 0}
+        buffers = {'drugs': [], 'dosages': [], 'alternatives': [], 'interactions': []}
+        statements = {
+            'drugs': UPSERT_DRUG,
+            'dosages': """
+                INSERT OR IGNORE INTO dosages (drug_id, age_range, dosage, frequency, notes)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+            'alternatives': """
+                INSERT INTO alternatives (original_drug_id, alternative_name, reason, equivalence_ratio, min_age, max_age)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            'interactions': """
+                INSERT OR IGNORE INTO interactions (drug1_id, drug2_id, severity, effect, mechanism, recommendation, "references")
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+        }
+
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            
-            # Import drugs
-            for drug_data in data.get('drugs', []):
-                try:
-                    drug = Drug(**drug_data)
-                    self.add_drug(drug)
-                    
-                    # Import dosages
-                    for dosage_data in drug_data.get('age_dosage', []):
-                        dosage = AgeDosage(**dosage_data)
-                        self.add_dosage(drug.name, dosage)
-                    
-                    # Import alternatives
-                    for alt_data in drug_data.get('alternatives', []):
-                        alternative = AlternativeDrug(**alt_data)
-                        self.add_alternative(drug.name, alternative)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to import drug {drug_data.get('name')}: {e}")
-            
-            # Import interactions
-            for interaction_data in data.get('interactions', []):
-                try:
-                    interaction = DrugInteraction(**interaction_data)
-                    self.add_interaction(interaction)
-                except Exception as e:
-                    logger.error(f"Failed to import interaction between {interaction_data.get('drug1')} and {interaction_data.get('drug2')}: {e}")
-            
+
+            def flush(table: str):
+                rows = buffers[table]
+                if rows:
+                    before = conn.total_changes
+                    cursor.executemany(statements[table], rows)
+                    written = conn.total_changes - before
+                    counts[table] += written
+                    counts['skipped'] += len(rows) - written
+                    rows.clear()
+
+            # sqlite3 autocommits DDL outside a transaction; open one first so a failed
+            # import rolls the dropped indexes and search triggers back along with the rows
+            if not conn.in_transaction:
+                cursor.execute("BEGIN")
+            for name in SECONDARY_INDEXES:
+                cursor.execute(f"DROP INDEX IF EXISTS {name}")
+            if self.search_mode != 'like':
+                for name in SEARCH_TRIGGERS:
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            drug_ids, placeholders = {}, set()
+            for name, drug_id, placeholder in cursor.execute(f"SELECT name, id, {PLACEHOLDER_DRUG} FROM drugs"):
+                drug_ids[name] = drug_id
+                if placeholder:
+                    placeholders.add(name)
+            next_id = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM drugs").fetchone()[0] + 1
+
+            with open(json_file) as f:
+                for section, record in iter_json_arrays(f):
+                    if section == 'drugs':
+                        try:
+                            drug = Drug(**record)
+                            if drug.name in drug_ids and drug.name not in placeholders:
+                                raise ValueError("drug already exists")
+                            dosages = [AgeDosage(**d) for d in record.get('age_dosage', [])]
+                            alternatives = [AlternativeDrug(**a) for a in record.get('alternatives', [])]
+                        except Exception as e:
+                            counts['skipped'] += 1
+                            logger.error(f"Failed to import drug {record.get('name')}: {e}")
+                            continue
+                        if drug.name in placeholders:
+                            # Fills the earlier name-only row; the upsert keeps its ID
+                            placeholders.discard(drug.name)
+                            drug_id, new_id = drug_ids[drug.name], None
+                        else:
+                            drug_id = new_id = drug_ids[drug.name] = next_id
+                            next_id += 1
+                        buffers['drugs'].append((
+                            new_id, drug.name, drug.generic_name, drug.drug_class, drug.description,
+                            json.dumps(drug.contraindications) if drug.contraindications else None,
+                            json.dumps(drug.side_effects) if drug.side_effects else None
+                        ))
+                        seen_ranges = set()
+                        for dosage in dosages:
+                            if dosage.age_range in seen_ranges:
+                                counts['skipped'] += 1
+                                continue
+                            seen_ranges.add(dosage.age_range)
+                            buffers['dosages'].append((
+                                drug_id, dosage.age_range, dosage.dosage, dosage.frequency, dosage.notes
+                            ))
+                        for alt in alternatives:
+                            buffers['alternatives'].append((
+                                drug_id, alt.name, alt.reason, alt.equivalence_ratio, alt.min_age, alt.max_age
+                            ))
+                    elif section == 'interactions':
+                        try:
+                            interaction = DrugInteraction(**record)
+                        except Exception as e:
+                            counts['skipped'] += 1
+                            logger.error(f"Failed to import interaction between {record.get('drug1')} and {record.get('drug2')}: {e}")
+                            continue
+                        pair = []
+                        for name in (interaction.drug1.lower(), interaction.drug2.lower()):
+                            if name not in drug_ids:
+                                # Unknown drug: add a name-only row so the pair can reference it
+                                drug_ids[name] = next_id
+                                next_id += 1
+                                placeholders.add(name)
+                                buffers['drugs'].append((drug_ids[name], name, None, None, None, None, None))
+                            pair.append(drug_ids[name])
+                        drug1_id, drug2_id = sorted(pair)
+                        buffers['interactions'].append((
+                            drug1_id, drug2_id, interaction.severity,
+                            interaction.effect, interaction.mechanism, interaction.recommendation,
+                            json.dumps(interaction.references) if interaction.references else None
+                        ))
+                    for table, rows in buffers.items():
+                        if len(rows) >= batch_size:
+                            flush(table)
+
+            for table in buffers:
+                flush(table)
+            for ddl in SECONDARY_INDEXES.values():
+                cursor.execute(ddl)
+            if self.search_mode != 'like':
+                self._create_search_index(cursor, rebuild=True)
             conn.commit()
+        self.cache.invalidate('drugs', 'dosages', 'alternatives')
+
+        elapsed = time.perf_counter() - start
+        rows = counts['drugs'] + counts['dosages'] + counts['alternatives'] + counts['interactions']
+        counts['seconds'] = round(elapsed, 3)
+        counts['rows_per_second'] = round(rows / elapsed, 1) if elapsed else None
+        logger.info(f"Imported {rows} rows from {json_file} in {elapsed:.2f}s ({counts['rows_per_second']} rows/s)")
+        return counts
 
 # Initialize global database instance
 drug_db = DrugDatabase()
@@ -396,5 +873,3 @@ if __name__ == "__main__":
     print("Aspirin-Ibuprofen interaction:", db.get_interaction("aspirin", "ibuprofen"))
     print("Aspirin dosages:", db.get_dosages("aspirin"))
     print("Aspirin alternatives:", db.get_alternatives("aspirin"))
-
-    # Update the connection generator function in database.py
@@ -1,18 +1,31 @@
 from ibm_watson import SpeechToTextV1, TextToSpeechV1, NaturalLanguageUnderstandingV1
 from ibm_watson.natural_language_understanding_v1 import Features, EntitiesOptions, KeywordsOptions
 from ibm_cloud_sdk_core.authenticators import IAMAuthenticator
+import asyncio
 import os
 from typing import Dict, Any
 
+from services.nlu_cache import NLUResultCache
+from services.watson_transport import AsyncNLUClient
+
 # Configure with your IBM Cloud credentials
 IBM_API_KEY = os.getenv("IBM_API_KEY", "your-ibm-api-key")
 IBM_SERVICE_URL = os.getenv("IBM_SERVICE_URL", "your-ibm-service-url")
+# NLU endpoint for the async transport; point at services/mock_nlu.py for offline testing
+IBM_NLU_URL = os.getenv("IBM_NLU_URL", IBM_SERVICE_URL)
+NLU_VERSION = '2022-04-07'
+NLU_FEATURES = {"entities": {"model": "clinical-model"}, "keywords": {}}
 
 class IBMServices:
     def __init__(self):
         self.stt = self._setup_speech_to_text()
         self.tts = self._setup_text_to_speech()
         self.nlu = self._setup_natural_language_understanding()
+        # Pooled keep-alive client with retries and a circuit breaker, for async callers
+        self.nlu_async = AsyncNLUClient(IBM_NLU_URL, IBM_API_KEY, version=NLU_VERSION)
+        # Results for texts seen before, tagged with the API version and feature set
+        self.nlu_cache = NLUResultCache(NLU_VERSION, NLU_FEATURES)
+        self._nlu_inflight: Dict[str, asyncio.Task] = {}
 
     def _setup_speech_to_text(self):
         authenticator = IAMAuthenticator(IBM_API_KEY)
@@ -29,7 +42,7 @@ class IBMServices:
     def _setup_natural_language_understanding(self):
         authenticator = IAMAuthenticator(IBM_API_KEY)
         nlu = NaturalLanguageUnderstandingV1(
-            version='2022-04-07',
+            version=NLU_VERSION,
             authenticator=authenticator
         )
         nlu.set_service_url(IBM_SERVICE_URL)
@@ -56,12 +69,34 @@ class IBMServices:
         return output_file
 
     def analyze_text(self, text: str) -> Dict[str, Any]:
+        cached = self.nlu_cache.get(text)
+        if cached is not None:
+            return cached
         response = self.nlu.analyze(
             text=text,
             features=Features(
                 entities=EntitiesOptions(model='clinical-model'),
                 keywords=KeywordsOptions()
             )).get_result()
+        self.nlu_cache.put(text, response)
+        return response
+
+    async def analyze_text_async(self, text: str, deadline: float = None) -> Dict[str, Any]:
+        cached = await asyncio.to_thread(self.nlu_cache.get, text)
+        if cached is not None:
+            return cached
+        # Identical texts arriving together share one remote call. It runs as its own
+        # task, so a caller that gives up (stage timeout) does not cancel it for the others.
+        key = self.nlu_cache.key(text)
+        task = self._nlu_inflight.get(key)
+        if task is None:
+            task = self._nlu_inflight[key] = asyncio.ensure_future(self._fetch_analysis(text, deadline))
+            task.add_done_callback(lambda _: self._nlu_inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_analysis(self, text: str, deadline: float = None) -> Dict[str, Any]:
+        response = await self.nlu_async.analyze(text, NLU_FEATURES, deadline)
+        await asyncio.to_thread(self.nlu_cache.put, text, response)
         return response
 
 ibm_services = IBMServices()
@@ -69,6 +104,9 @@ ibm_services = IBMServices()
 def analyze_with_watson(text: str) -> Dict[str, Any]:
     return ibm_services.analyze_text(text)
 
+async def analyze_with_watson_async(text: str, deadline: float = None) -> Dict[str, Any]:
+    return await ibm_services.analyze_text_async(text, deadline)
+
 def speech_to_text(audio_file: str) -> str:
     return ibm_services.speech_to_text(audio_file)
 
@@ -0,0 +1,353 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cache sizing and freshness; drug metadata changes roughly weekly
+DRUG_CACHE_SIZE = int(os.getenv("DRUG_CACHE_SIZE", "20000"))  # 0 disables caching
+DRUG_CACHE_TTLS = {
+    'drugs': float(os.getenv("DRUG_CACHE_TTL_DRUGS", "86400")),
+    'dosages': float(os.getenv("DRUG_CACHE_TTL_DOSAGES", "86400")),
+    'alternatives': float(os.getenv("DRUG_CACHE_TTL_ALTERNATIVES", "86400")),
+}
+# Shared tier, e.g. "sqlite:////var/cache/drugdb.sqlite" or "redis://localhost:6379/0"
+DRUG_CACHE_SHARED = os.getenv("DRUG_CACHE_SHARED", "")
+# How often a worker re-reads table generations from the shared tier
+GENERATION_POLL = float(os.getenv("DRUG_CACHE_GENERATION_POLL", "1.0"))
+
+_MISS = object()
+
+class SharedCacheBackend(ABC):
+    """Cache storage visible to every uvicorn worker.
+
+    Values are JSON strings. Generations are integer counters, one per
+    table, bumped on every write so other workers drop their stale entries.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Stored value, or None if missing or expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float):
+        """Store value for ttl seconds"""
+
+    @abstractmethod
+    def generation(self, table: str) -> int:
+        """Current generation of table; 0 if never bumped"""
+
+    @abstractmethod
+    def bump(self, table: str) -> int:
+        """Increment the generation of table and return the new value"""
+
+class SQLiteCacheBackend(SharedCacheBackend):
+    """Shared tier in a local SQLite file, for workers on a single host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS generations (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)", (key, value, time.time() + ttl))
+
+    def generation(self, table: str) -> int:
+        row = self._conn().execute("SELECT value FROM generations WHERE name = ?", (table,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, table: str) -> int:
+        with self._conn() as conn:
+            conn.execute("""
+                INSERT INTO generations VALUES (?, 1)
+                ON CONFLICT(name) DO UPDATE SET value = value + 1
+            """, (table,))
+            # Entries from older generations can no longer be read; drop the expired ones
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        return self.generation(table)
+
+class RedisCacheBackend(SharedCacheBackend):
+    """Shared tier in Redis, for workers spread over several hosts (needs redis-py)"""
+
+    def __init__(self, url: str, prefix: str = "drugdb"):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(f"{self.prefix}:{key}")
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, value: str, ttl: float):
+        self.client.set(f"{self.prefix}:{key}", value, ex=max(1, int(ttl)))
+
+    def generation(self, table: str) -> int:
+        return int(self.client.get(f"{self.prefix}:gen:{table}") or 0)
+
+    def bump(self, table: str) -> int:
+        return self.client.incr(f"{self.prefix}:gen:{table}")
+
+def shared_backend_from_url(url: str) -> Optional[SharedCacheBackend]:
+    """Build a shared tier from a DRUG_CACHE_SHARED URL; '' means none"""
+    if not url:
+        return None
+    if url.startswith("sqlite:///"):
+        return SQLiteCacheBackend(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://")):
+        return RedisCacheBackend(url)
+    raise ValueError(f"Unsupported DRUG_CACHE_SHARED backend: {url}")
+
+def _plain(value):
+    """Rows (e.g. Records) as dicts, so both tiers hand out the same types"""
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, list):
+        return [dict(v) if isinstance(v, Mapping) else v for v in value]
+    return value
+
+class LookupCache:
+    """Read-through cache for lookups grouped into tables.
+
+    Used in front of DrugDatabase and the interaction analyzer. A bounded
+    in-process LRU sits in front of an optional shared tier. Entries expire
+    after their table's TTL and are tagged with the table's generation;
+    invalidate() (called on writes through DrugDatabase) bumps the
+    generation, which makes every older entry for that table unreadable. With a shared tier
+    the bump is seen by other workers within GENERATION_POLL seconds.
+
+    Rows are stored as plain dicts, so a value reads the same whether it
+    came from the loader, the local LRU or the shared tier. Cached values
+    are shared between callers and must be treated as read-only. The lock
+    only guards local state; shared-tier I/O runs outside it.
+    """
+
+    def __init__(self, maxsize: int = DRUG_CACHE_SIZE, ttls: Dict[str, float] = None,
+                 shared: SharedCacheBackend = None, generation_poll: float = GENERATION_POLL):
+        self.maxsize = maxsize
+        self.ttls = dict(ttls or DRUG_CACHE_TTLS)
+        self.shared = shared
+        self.generation_poll = generation_poll
+        self._data = OrderedDict()  # (table, key) -> (expires_at, generation, value)
+        self._generations = {table: 0 for table in self.ttls}
+        # Tables whose last invalidation never reached the shared tier; it is bypassed for them
+        self._unsynced = set()
+        self._polled_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = {table: 0 for table in self.ttls}
+        self.shared_hits = {table: 0 for table in self.ttls}
+        self.misses = {table: 0 for table in self.ttls}
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def _poll_generations(self):
+        """Re-read table generations from the shared tier if GENERATION_POLL has passed.
+
+        Also retries the bumps of invalidations the shared tier missed.
+        """
+        if self.shared is None or time.monotonic() - self._polled_at < self.generation_poll:
+            return
+        self._polled_at = time.monotonic()
+        with self._lock:
+            unsynced = list(self._unsynced)
+            invalidations = self.invalidations
+        bumped = self._bump_shared(unsynced)
+        try:
+            polled = {name: self.shared.generation(name) for name in self._generations}
+        except Exception as e:
+            logger.warning(f"Shared cache unavailable, using local generations: {e}")
+            polled = {}
+        with self._lock:
+            # Generations only move forward: a poll that raced a local invalidate(),
+            # or a shared tier that missed a bump, must not revive older entries
+            for name, generation in polled.items():
+                self._generations[name] = max(self._generations[name], generation)
+            # A write during the poll may postdate the retried bump; leave it for the next poll
+            if self.invalidations == invalidations:
+                self._resync(bumped)
+
+    def _resync(self, bumped: Dict[str, int]):
+        """Adopt the shared generation of tables whose missed bump went through (lock held).
+
+        The local generation may be ahead of it, so the table's local entries,
+        all loaded after the write, are dropped rather than kept under a
+        generation other workers have yet to reach.
+        """
+        for table, generation in bumped.items():
+            self._drop_local(table)
+            self._generations[table] = generation
+            self._unsynced.discard(table)
+
+    def _drop_local(self, table: str):
+        for entry in [k for k in self._data if k[0] == table]:
+            del self._data[entry]
+
+    def _bump_shared(self, tables) -> Dict[str, int]:
+        """Bump tables in the shared tier; returns the new generations of those that succeeded"""
+        bumped = {}
+        for table in tables:
+            try:
+                bumped[table] = self.shared.bump(table)
+            except Exception as e:
+                logger.warning(f"Shared cache invalidation failed: {e}")
+        return bumped
+
+    def _uses_shared(self, table: str) -> bool:
+        if self.shared is None:
+            return False
+        with self._lock:
+            return table not in self._unsynced
+
+    def _shared_get(self, table: str, key: str, generation: int):
+        try:
+            value = self.shared.get(f"{table}:{generation}:{key}")
+        except Exception as e:
+            logger.warning(f"Shared cache read failed: {e}")
+            return _MISS
+        return _MISS if value is None else json.loads(value)
+
+    def _shared_set(self, table: str, key: str, generation: int, value):
+        try:
+            self.shared.set(f"{table}:{generation}:{key}", json.dumps(value), self.ttls[table])
+        except Exception as e:
+            logger.warning(f"Shared cache write failed: {e}")
+
+    def _store_local(self, table: str, key: str, generation: int, value):
+        with self._lock:
+            self._data[(table, key)] = (time.monotonic() + self.ttls[table], generation, value)
+            self._data.move_to_end((table, key))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def _lookup(self, table: str, key: str):
+        """(value or _MISS, generation the lookup ran against)"""
+        self._poll_generations()
+        with self._lock:
+            generation = self._generations[table]
+            entry = self._data.get((table, key))
+            if entry is not None and entry[0] > time.monotonic() and entry[1] == generation:
+                self._data.move_to_end((table, key))
+                self.hits[table] += 1
+                return entry[2], generation
+        if self._uses_shared(table):
+            value = self._shared_get(table, key, generation)
+            if value is not _MISS:
+                with self._lock:
+                    self.shared_hits[table] += 1
+                self._store_local(table, key, generation, value)
+                return value, generation
+        with self._lock:
+            self.misses[table] += 1
+        return _MISS, generation
+
+    def get(self, table: str, key: str, default=None):
+        """Cached value for (table, key) from either tier, or default"""
+        if not self.enabled:
+            return default
+        value, _ = self._lookup(table, key)
+        return default if value is _MISS else value
+
+    def put(self, table: str, key: str, value, generation: int = None):
+        if not self.enabled:
+            return
+        value = _plain(value)
+        if generation is None:
+            self._poll_generations()
+        with self._lock:
+            current = self._generations[table]
+        if generation is None:
+            generation = current
+        elif generation != current:
+            # Loaded before the table's generation moved on; it could never be read back
+            return
+        if self._uses_shared(table):
+            self._shared_set(table, key, generation, value)
+        self._store_local(table, key, generation, value)
+
+    def read_through(self, table: str, key: str, loader: Callable):
+        """Cached result for (table, key); calls loader() and stores its result on a miss"""
+        if not self.enabled:
+            return _plain(loader())
+        value, generation = self._lookup(table, key)
+        if value is _MISS:
+            value = _plain(loader())
+            # Tag with the generation read before loading, so a concurrent write wins
+            self.put(table, key, value, generation)
+        return value
+
+    def invalidate(self, *tables: str):
+        """Drop every cached entry for the given tables, here and in other workers.
+
+        If the shared tier cannot be bumped, the table's local entries are
+        dropped and the shared tier is bypassed for it until a later poll
+        manages the bump; other workers keep their entries until then.
+        """
+        bumped = self._bump_shared(tables) if self.shared is not None else {}
+        with self._lock:
+            self._resync({t: g for t, g in bumped.items() if t in self._unsynced})
+            for table in tables:
+                if table in bumped:
+                    self._generations[table] = max(self._generations[table], bumped[table])
+                    continue
+                self._generations[table] += 1
+                if self.shared is not None:
+                    self._unsynced.add(table)
+                    self._drop_local(table)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict:
+        tables = {}
+        for table in self.ttls:
+            hits = self.hits[table] + self.shared_hits[table]
+            lookups = hits + self.misses[table]
+            tables[table] = {
+                "hits": self.hits[table],
+                "shared_hits": self.shared_hits[table],
+                "misses": self.misses[table],
+                "hit_rate": round(hits / lookups, 4) if lookups else None,
+                "ttl_seconds": self.ttls[table],
+                "generation": self._generations[table],
+            }
+        hits = sum(t["hits"] + t["shared_hits"] for t in tables.values())
+        lookups = hits + sum(self.misses.values())
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "shared_backend": type(self.shared).__name__ if self.shared is not None else None,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "tables": tables,
+        }
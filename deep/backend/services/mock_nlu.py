@@ -0,0 +1,97 @@
+"""Local stand-in for Watson NLU, for offline load and failure testing.
+
+Implements POST /v1/analyze (entities + keywords, same response shape as
+NLU) and POST /identity/token (IAM token exchange), with configurable
+latency and injected failures:
+
+    python -m services.mock_nlu --port 8090 --latency-ms 150 --jitter-ms 50 --error-rate 0.05
+
+Point the backend at it with IBM_NLU_URL=http://127.0.0.1:8090 and
+IBM_IAM_URL=http://127.0.0.1:8090/identity/token.
+"""
+import argparse
+import asyncio
+import random
+import re
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Words the mock tags as drug entities
+DRUG_WORDS = {
+    "aspirin", "warfarin", "ibuprofen", "metformin", "lisinopril", "atorvastatin", "amoxicillin",
+    "omeprazole", "paracetamol", "acetaminophen", "clopidogrel", "simvastatin", "sertraline",
+}
+STOPWORDS = {"the", "and", "take", "with", "daily", "twice", "once", "mg", "at", "for", "a", "of", "to"}
+
+class MockSettings:
+    def __init__(self, latency_ms: float = 150, jitter_ms: float = 50, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate        # fraction of calls answered 503
+        self.throttle_rate = throttle_rate  # fraction of calls answered 429 with Retry-After
+
+def analyze_response(text: str, features: dict) -> dict:
+    words = re.findall(r"[a-zA-Z]+", text)
+    result = {
+        "usage": {"text_units": 1, "text_characters": len(text), "features": len(features)},
+        "language": "en",
+    }
+    if "entities" in features:
+        counts = Counter(w.lower() for w in words if w.lower() in DRUG_WORDS)
+        result["entities"] = [
+            {"type": "Drug", "text": drug, "relevance": 0.9, "count": n, "confidence": 0.85}
+            for drug, n in counts.most_common()
+        ]
+    if "keywords" in features:
+        counts = Counter(w.lower() for w in words if w.lower() not in STOPWORDS and len(w) > 2)
+        result["keywords"] = [
+            {"text": word, "relevance": round(1 / (i + 1), 3), "count": n}
+            for i, (word, n) in enumerate(counts.most_common(10))
+        ]
+    return result
+
+def create_app(settings: MockSettings = None) -> FastAPI:
+    settings = settings or MockSettings()
+    app = FastAPI(title="Mock Watson NLU")
+    app.state.calls = 0
+
+    @app.post("/identity/token")
+    async def token():
+        return {"access_token": "mock-token", "token_type": "Bearer", "expires_in": 3600}
+
+    @app.post("/v1/analyze")
+    async def analyze(request: Request, version: str):
+        app.state.calls += 1
+        body = await request.json()
+        await asyncio.sleep(max(0.0, random.gauss(settings.latency_ms, settings.jitter_ms)) / 1000)
+        roll = random.random()
+        if roll < settings.throttle_rate:
+            return JSONResponse({"code": 429, "error": "Too many requests"}, status_code=429,
+                                headers={"Retry-After": "1"})
+        if roll < settings.throttle_rate + settings.error_rate:
+            return JSONResponse({"code": 503, "error": "Service unavailable"}, status_code=503)
+        if not body.get("text"):
+            return JSONResponse({"code": 400, "error": "text is required"}, status_code=400)
+        return analyze_response(body["text"], body.get("features", {}))
+
+    @app.get("/stats")
+    async def stats():
+        return {"calls": app.state.calls}
+
+    return app
+
+if __name__ == "__main__":
+    import uvicorn
+    parser = argparse.ArgumentParser(description="Mock Watson NLU server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    settings = MockSettings(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate)
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
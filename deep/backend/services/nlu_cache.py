@@ -0,0 +1,147 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Persistent cache of Watson NLU results; repeated prescription texts skip the paid remote call.
+# Off by default: results are stored unencrypted and quote the prescription text (entity and
+# keyword spans), so enable it (e.g. NLU_CACHE_TTL=2592000 for 30 days) only where that
+# retention is acceptable for patient data.
+NLU_CACHE_PATH = os.getenv("NLU_CACHE_PATH", str(Path(__file__).parent.parent.parent / 'data' / 'nlu_cache.db'))
+NLU_CACHE_TTL = float(os.getenv("NLU_CACHE_TTL", "0"))  # seconds; 0 disables caching
+
+class NLUResultCache:
+    """NLU results keyed by a SHA-256 of the exact text, stored in SQLite.
+
+    Every entry is tagged with a hash of the NLU API version and feature
+    set it was produced with; changing either makes old entries unreadable
+    and purge() deletes them along with expired ones.
+
+    Keys are hashes, but results are plaintext JSON containing spans of the
+    analyzed text; they stay on disk until they expire after ttl seconds.
+    Storage errors are logged and counted, never raised: if the database
+    cannot be opened the cache turns itself off and every lookup misses.
+    """
+
+    def __init__(self, version: str, features: Dict[str, Any], path: str = NLU_CACHE_PATH,
+                 ttl: float = NLU_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.tag = hashlib.sha256(
+            json.dumps({"version": version, "features": features}, sort_keys=True).encode()
+        ).hexdigest()[:16]
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+        self.available = True
+        if self.enabled:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                with self._conn() as conn:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS nlu_results (
+                            key TEXT PRIMARY KEY,
+                            tag TEXT NOT NULL,
+                            result TEXT NOT NULL,
+                            created_at REAL NOT NULL,
+                            expires_at REAL NOT NULL
+                        )
+                    """)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"NLU cache unavailable at {path}, caching disabled: {e}")
+                self.errors += 1
+                self.available = False
+            self.purge()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.available
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.tag}\0{text}".encode()).hexdigest()
+
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        try:
+            row = self._conn().execute(
+                "SELECT result FROM nlu_results WHERE key = ? AND tag = ? AND expires_at > ?",
+                (self.key(text), self.tag, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"NLU cache read failed: {e}")
+            with self._lock:
+                self.errors += 1
+            return None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, text: str, result: Dict[str, Any]):
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO nlu_results VALUES (?, ?, ?, ?, ?)",
+                    (self.key(text), self.tag, json.dumps(result), now, now + self.ttl)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"NLU cache write failed: {e}")
+            with self._lock:
+                self.errors += 1
+            return
+        with self._lock:
+            self.writes += 1
+
+    def purge(self) -> int:
+        """Delete expired entries and entries from other API versions / feature sets; returns the count"""
+        if not self.enabled:
+            return 0
+        try:
+            with self._conn() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM nlu_results WHERE expires_at <= ? OR tag != ?", (time.time(), self.tag)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"NLU cache purge failed: {e}")
+            with self._lock:
+                self.errors += 1
+            return 0
+        return cursor.rowcount
+
+    def stats(self) -> Dict:
+        """In-memory counters only; safe to call from the event loop"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl,
+            "tag": self.tag,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "writes": self.writes,
+            "errors": self.errors,
+        }
@@ -0,0 +1,81 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+class StageFailed(Exception):
+    """A required stage timed out or raised"""
+
+    def __init__(self, stage: str, status: str, error: str):
+        super().__init__(f"Stage '{stage}' {status}: {error}")
+        self.stage = stage
+        self.status = status
+
+class Stage:
+    """One step of a request pipeline.
+
+    fn receives the results of the stages named in deps as keyword
+    arguments. Coroutine functions are awaited; plain functions run on the
+    default executor so they never block the event loop. A stage that
+    times out or raises yields fallback instead, unless it is required.
+    """
+
+    def __init__(self, name: str, fn: Callable, deps: Sequence[str] = (), timeout: float = 5.0,
+                 fallback: Any = None, required: bool = False):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.timeout = timeout
+        self.fallback = fallback
+        self.required = required
+
+async def run_stage_graph(stages: List[Stage]) -> Dict:
+    """Run stages as soon as their dependencies finish; independent stages run concurrently.
+
+    Returns {"results": {name: value}, "timings": {name: {...}}, "partial": [names that fell back]}.
+    Timings are milliseconds from graph start. A timed-out plain function
+    keeps running on its executor thread; only its result is dropped.
+    """
+    loop = asyncio.get_running_loop()
+    graph_start = time.perf_counter()
+    tasks: Dict[str, asyncio.Task] = {}
+    timings: Dict[str, Dict] = {}
+    partial: List[str] = []
+
+    async def run(stage: Stage):
+        kwargs = {dep: await tasks[dep] for dep in stage.deps}
+        start = time.perf_counter()
+        status, error = "ok", None
+        try:
+            if inspect.iscoroutinefunction(stage.fn):
+                call = stage.fn(**kwargs)
+            else:
+                call = loop.run_in_executor(None, lambda: stage.fn(**kwargs))
+            result = await asyncio.wait_for(call, stage.timeout)
+        except asyncio.TimeoutError:
+            status, error = "timeout", f"exceeded {stage.timeout}s"
+        except Exception as e:
+            status, error = "error", str(e)
+        timings[stage.name] = {
+            "status": status,
+            "started_ms": round((start - graph_start) * 1000, 2),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        if error is None:
+            return result
+        timings[stage.name]["error"] = error
+        if stage.required:
+            raise StageFailed(stage.name, status, error)
+        partial.append(stage.name)
+        return stage.fallback
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.ensure_future(run(stage))
+    try:
+        results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+    except StageFailed:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    timings["total"] = {"duration_ms": round((time.perf_counter() - graph_start) * 1000, 2)}
+    return {"results": results, "timings": timings, "partial": partial}
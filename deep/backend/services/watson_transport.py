@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Connection pool and resilience settings for the async NLU client
+NLU_MAX_CONNECTIONS = int(os.getenv("NLU_MAX_CONNECTIONS", "32"))
+NLU_KEEPALIVE_SECONDS = float(os.getenv("NLU_KEEPALIVE_SECONDS", "60"))
+NLU_MAX_CONCURRENCY = int(os.getenv("NLU_MAX_CONCURRENCY", "16"))  # requests in flight
+NLU_TIMEOUT = float(os.getenv("NLU_TIMEOUT", "10"))  # per attempt
+NLU_DEADLINE = float(os.getenv("NLU_DEADLINE", "30"))  # all attempts and backoff of one analyze call
+NLU_RETRIES = int(os.getenv("NLU_RETRIES", "3"))
+NLU_BACKOFF_BASE = float(os.getenv("NLU_BACKOFF_BASE", "0.2"))
+NLU_BACKOFF_CAP = float(os.getenv("NLU_BACKOFF_CAP", "2.0"))
+NLU_BREAKER_THRESHOLD = int(os.getenv("NLU_BREAKER_THRESHOLD", "5"))  # consecutive failures
+NLU_BREAKER_RESET = float(os.getenv("NLU_BREAKER_RESET", "30"))  # seconds open before a trial call
+IAM_URL = os.getenv("IBM_IAM_URL", "https://iam.cloud.ibm.com/identity/token")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(Exception):
+    """Raised without calling NLU while the circuit breaker is open"""
+
+class NLUAuthError(Exception):
+    """The IAM token exchange failed; says nothing about NLU health, so the breaker ignores it"""
+
+class CircuitBreaker:
+    """Stops calling a failing service for a while.
+
+    closed: calls go through. After `threshold` consecutive failures the
+    breaker opens and calls fail fast for `reset_timeout` seconds; then a
+    single trial call is let through (half_open). Its success closes the
+    breaker, its failure opens it again.
+    """
+
+    def __init__(self, threshold: int = NLU_BREAKER_THRESHOLD, reset_timeout: float = NLU_BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+
+    def before_call(self):
+        if self.state == "closed":
+            return
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            # Open, or half-open with a trial call already in flight
+            raise CircuitOpenError(f"NLU circuit breaker is {self.state.replace('_', '-')}")
+        # Let one trial call through; a trial that never reports back is retried after reset_timeout
+        self.state = "half_open"
+        self.opened_at = time.monotonic()
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.threshold:
+            if self.state != "open":
+                self.trips += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+class AsyncNLUClient:
+    """Watson NLU `analyze` over one pooled, keep-alive httpx.AsyncClient.
+
+    Concurrency is capped by a semaphore. Transport errors and 429/5xx
+    responses are retried with full-jitter exponential backoff (honouring
+    Retry-After), and a circuit breaker fails fast while the service is down.
+    Every analyze call ends within its deadline: attempts are cut to the time
+    left, and a retry that could not start in time is given up instead.
+    Authenticates with an IAM token fetched from the API key and refreshed
+    before it expires; an empty api_key sends no credentials (mock server).
+    """
+
+    def __init__(self, service_url: str, api_key: str = "", version: str = "2022-04-07",
+                 iam_url: str = IAM_URL, max_connections: int = NLU_MAX_CONNECTIONS,
+                 max_concurrency: int = NLU_MAX_CONCURRENCY, timeout: float = NLU_TIMEOUT,
+                 retries: int = NLU_RETRIES, breaker: CircuitBreaker = None, deadline: float = NLU_DEADLINE):
+        self.service_url = service_url.rstrip("/")
+        self.api_key = api_key
+        self.version = version
+        self.iam_url = iam_url
+        self.retries = retries
+        self.timeout = timeout
+        self.deadline = deadline
+        self.breaker = breaker or CircuitBreaker()
+        self._max_concurrency = max_concurrency
+        self._semaphore = None
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=NLU_KEEPALIVE_SECONDS,
+            ),
+        )
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self._token_lock = None
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.auth_failures = 0
+        self.deadline_exceeded = 0
+        self.rejected = 0
+        self.in_flight = 0
+
+    async def _auth_headers(self, timeout: float) -> Dict[str, str]:
+        if not self.api_key:
+            return {}
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        async with self._token_lock:
+            if self._token is None or time.time() > self._token_expires - 60:
+                try:
+                    response = await self._client.post(self.iam_url, timeout=timeout, data={
+                        "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
+                        "apikey": self.api_key,
+                    })
+                    response.raise_for_status()
+                    body = response.json()
+                    self._token = body["access_token"]
+                except (httpx.HTTPError, ValueError, KeyError) as e:
+                    self.auth_failures += 1
+                    raise NLUAuthError(f"IAM token request failed: {e}") from e
+                self._token_expires = time.time() + body.get("expires_in", 3600)
+        return {"Authorization": f"Bearer {self._token}"}
+
+    def _backoff(self, attempt: int, response: httpx.Response = None) -> float:
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            # The server said when to come back; earlier retries would only be throttled again
+            return float(response.headers["Retry-After"])
+        return random.uniform(0, min(NLU_BACKOFF_CAP, NLU_BACKOFF_BASE * 2 ** attempt))
+
+    async def analyze(self, text: str, features: Dict[str, Any], deadline: float = None) -> Dict[str, Any]:
+        """POST /v1/analyze; returns the NLU result JSON.
+
+        deadline caps the whole call (every attempt and backoff) in seconds;
+        defaults to the client's deadline.
+        """
+        # The deadline covers the wait for a concurrency slot too
+        ends_at = time.monotonic() + (self.deadline if deadline is None else deadline)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        remaining = self._remaining(ends_at)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), remaining)
+        except asyncio.TimeoutError:
+            self.failures += 1
+            self.deadline_exceeded += 1
+            raise httpx.TimeoutException("NLU deadline exceeded while waiting for a request slot")
+        try:
+            # Checked once a slot is held, so a half-open trial call is sent at once
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self.rejected += 1
+                raise
+            self.in_flight += 1
+            try:
+                return await self._analyze_with_retries(text, features, ends_at)
+            finally:
+                self.in_flight -= 1
+        finally:
+            self._semaphore.release()
+
+    def _remaining(self, ends_at: float) -> float:
+        """Seconds left before ends_at; raises once the deadline has passed"""
+        remaining = ends_at - time.monotonic()
+        if remaining <= 0:
+            self.failures += 1
+            self.deadline_exceeded += 1
+            raise httpx.TimeoutException("NLU deadline exceeded before the request was sent")
+        return remaining
+
+    async def _analyze_with_retries(self, text: str, features: Dict[str, Any], ends_at: float) -> Dict[str, Any]:
+        url = f"{self.service_url}/v1/analyze"
+        payload = {"text": text, "features": features}
+        try:
+            headers = await self._auth_headers(min(self.timeout, self._remaining(ends_at)))
+        except NLUAuthError:
+            self.failures += 1
+            raise
+        attempts = 0
+        for attempt in range(self.retries + 1):
+            # Retries check the deadline before sleeping; this catches a slow token fetch
+            remaining = self._remaining(ends_at)
+            self.requests += 1
+            attempts += 1
+            response = None
+            try:
+                response = await self._client.post(
+                    url, params={"version": self.version}, json=payload, headers=headers,
+                    timeout=min(self.timeout, remaining),
+                )
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    self.breaker.record_success()
+                    return response.json()
+                error = httpx.HTTPStatusError(
+                    f"NLU returned {response.status_code}", request=response.request, response=response
+                )
+            except httpx.TransportError as e:
+                error = e
+            except httpx.HTTPStatusError:
+                # 4xx other than 429: the request itself is wrong, retrying will not help.
+                # The service did answer, so it counts as healthy for the breaker.
+                self.breaker.record_success()
+                self.failures += 1
+                raise
+            if attempt == self.retries:
+                break
+            delay = self._backoff(attempt, response)
+            if time.monotonic() + delay >= ends_at:
+                # The retry could not even start before the deadline
+                self.deadline_exceeded += 1
+                break
+            self.retried += 1
+            await asyncio.sleep(delay)
+        self.failures += 1
+        self.breaker.record_failure()
+        logger.warning(f"NLU analyze failed after {attempts} attempts: {error}")
+        raise error
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retried,
+            "failures": self.failures,
+            "auth_failures": self.auth_failures,
+            "deadline_exceeded": self.deadline_exceeded,
+            "rejected_by_breaker": self.rejected,
+            "in_flight": self.in_flight,
+            "max_concurrency": self._max_concurrency,
+            "breaker": {
+                "state": self.breaker.state,
+                "consecutive_failures": self.breaker.failures,
+                "trips": self.breaker.trips,
+            },
+        }
@@ -0,0 +1,44 @@
+# conftest.py
+# ------------------------------------------------------------
+# Backend modules import each other as services.* / models.*
+# (they run from deep/backend), so tests put that directory on
+# sys.path.
+# ------------------------------------------------------------
+
+import json
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# DRUG_DB used by models.interactions in tests
+SAMPLE_DRUG_DB = {
+    "aspirin": {"interactions": {"warfarin": {
+        "severity": "high", "effect": "Increased bleeding risk", "recommendation": "Avoid combination",
+    }}},
+    "warfarin": {},
+}
+
+@pytest.fixture(scope="session")
+def interactions(tmp_path_factory):
+    """models.interactions, imported against SAMPLE_DRUG_DB.
+
+    The module reads ../../data/drug_db.json relative to the working
+    directory at import, so it is imported from a scratch tree.
+    """
+    pytest.importorskip("requests")
+    root = tmp_path_factory.mktemp("deep")
+    (root / "data").mkdir()
+    (root / "data" / "drug_db.json").write_text(json.dumps(SAMPLE_DRUG_DB))
+    cwd = root / "backend" / "models"
+    cwd.mkdir(parents=True)
+    previous = os.getcwd()
+    os.chdir(cwd)
+    try:
+        import models.interactions as module
+    finally:
+        os.chdir(previous)
+    return module
@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from services.async_database import AsyncDrugDatabase
+from services.database import Drug, DrugDatabase
+
+@pytest.fixture
+def adb():
+    adb = AsyncDrugDatabase(DrugDatabase(":memory:"), max_workers=4)
+    yield adb
+    adb.close()
+
+def test_returns_the_same_records_as_the_sync_database(adb):
+    async def scenario():
+        await adb.add_drug(Drug(name="aspirin", side_effects=["heartburn"]))
+        return await adb.get_drug("aspirin"), await adb.search_drugs("asp")
+
+    drug, found = asyncio.run(scenario())
+    assert drug == adb.db.get_drug("aspirin")
+    assert drug["side_effects"] == ["heartburn"]
+    assert [r["name"] for r in found] == ["aspirin"]
+    assert all(type(r) is dict for r in found)
+
+def test_slow_queries_overlap_and_leave_the_loop_responsive(adb, monkeypatch):
+    def slow_search(query, limit=10):
+        time.sleep(0.2)
+        return []
+
+    monkeypatch.setattr(adb.db, "search_drugs", slow_search)
+
+    async def scenario():
+        lags = []
+
+        async def ticker():
+            while True:
+                start = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lags.append(time.perf_counter() - start - 0.01)
+
+        tick = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        await asyncio.gather(*(adb.search_drugs("a") for _ in range(4)))
+        elapsed = time.perf_counter() - start
+        tick.cancel()
+        return elapsed, max(lags)
+
+    elapsed, worst_lag = asyncio.run(scenario())
+    assert elapsed < 0.6
+    assert worst_lag < 0.1
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from models.batching import MicroBatcher
+
+def test_concurrent_calls_share_a_batch():
+    sizes = []
+
+    def double(items):
+        sizes.append(len(items))
+        return [i * 2 for i in items]
+
+    batcher = MicroBatcher(double, max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(5)]
+    assert [f.result(5) for f in futures] == [0, 2, 4, 6, 8]
+    assert sizes == [5]
+
+def test_cancelled_items_are_dropped_and_the_worker_survives():
+    release = threading.Event()
+    seen = []
+
+    def slow(items):
+        seen.append(list(items))
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(slow, max_batch_size=1, max_wait_ms=0)
+    first = batcher.submit("first")
+    while not seen:
+        time.sleep(0.001)
+    queued = batcher.submit("cancelled")
+    assert queued.cancel()
+    assert not first.cancel()  # already running
+    release.set()
+    assert first.result(5) == "first"
+    assert batcher("after") == "after"
+    assert seen == [["first"], ["after"]]
+    assert batcher.stats()["cancelled"] == 1
+
+def test_batch_errors_fail_that_batch_only():
+    def flaky(items):
+        if "bad" in items:
+            raise ValueError("bad input")
+        return items
+
+    batcher = MicroBatcher(flaky, max_batch_size=4, max_wait_ms=0)
+    with pytest.raises(ValueError):
+        batcher("bad")
+    assert batcher("good") == "good"
+    assert batcher.stats()["errors"] == 1
+
+def test_dead_worker_fails_its_batch_and_is_restarted():
+    calls = []
+
+    def dies_once(items):
+        calls.append(items)
+        if len(calls) == 1:
+            raise SystemExit("worker killed")
+        return items
+
+    batcher = MicroBatcher(dies_once, max_batch_size=4, max_wait_ms=0)
+    with pytest.raises(RuntimeError, match="worker thread died"):
+        batcher.submit("lost").result(5)
+    batcher._thread.join(5)
+    assert batcher.submit("next").result(5) == "next"
+    assert batcher.stats()["restarts"] == 1
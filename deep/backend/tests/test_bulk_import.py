@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from services.database import SECONDARY_INDEXES, Drug, DrugDatabase, DrugInteraction
+
+def index_names(db):
+    rows = db.pool.connection().execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    return {r[0] for r in rows}
+
+@pytest.fixture
+def db():
+    db = DrugDatabase(":memory:")
+    yield db
+    db.close()
+
+def test_import_writes_rows_and_rebuilds_indexes(db, tmp_path):
+    path = tmp_path / "drugs.json"
+    path.write_text(json.dumps({
+        "drugs": [{"name": "Aspirin", "age_dosage": [
+            {"age_range": "19-65", "dosage": "81 mg", "frequency": "daily"}
+        ]}],
+        "interactions": [{"drug1": "aspirin", "drug2": "warfarin", "severity": "high",
+                          "effect": "bleeding", "recommendation": "avoid"}],
+    }))
+    counts = db.bulk_import_json(str(path))
+    assert (counts["drugs"], counts["dosages"], counts["interactions"]) == (2, 1, 1)
+    assert set(SECONDARY_INDEXES) <= index_names(db)
+    assert db.get_interaction("warfarin", "aspirin")["severity"] == "high"
+
+def test_failed_import_keeps_indexes_and_rows(db, tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('{"drugs": [{"name": "aspirin"}, {"name": "ibuprofen"')
+    with pytest.raises(ValueError):
+        db.bulk_import_json(str(path), batch_size=1)
+    assert set(SECONDARY_INDEXES) <= index_names(db)
+    assert db.pool.connection().execute("SELECT COUNT(*) FROM drugs").fetchone()[0] == 0
+    assert not db.pool.connection().in_transaction
+
+def test_drug_listed_after_its_interactions_is_imported_in_full(db, tmp_path):
+    path = tmp_path / "drugs.json"
+    path.write_text(json.dumps({
+        "interactions": [{"drug1": "aspirin", "drug2": "warfarin", "severity": "high",
+                          "effect": "bleeding", "recommendation": "avoid"}],
+        "drugs": [{"name": "warfarin", "drug_class": "anticoagulant",
+                   "age_dosage": [{"age_range": "19-65", "dosage": "5 mg", "frequency": "daily"}],
+                   "alternatives": [{"name": "apixaban", "reason": "fewer interactions"}]}],
+    }))
+    db.bulk_import_json(str(path), batch_size=1)
+    assert db.get_drug("warfarin")["drug_class"] == "anticoagulant"
+    assert [d["dosage"] for d in db.get_dosages("warfarin")] == ["5 mg"]
+    assert [a["alternative_name"] for a in db.get_alternatives("warfarin")] == ["apixaban"]
+    assert db.get_interaction("aspirin", "warfarin")["severity"] == "high"
+    assert [r["name"] for r in db.search_drugs("warf")] == ["warfarin"]
+
+def test_import_fills_placeholders_from_earlier_writes_but_skips_real_drugs(db, tmp_path):
+    db.add_interaction(DrugInteraction(drug1="aspirin", drug2="warfarin", severity="high",
+                                       effect="bleeding", recommendation="avoid"))
+    db.add_drug(Drug(name="ibuprofen", drug_class="NSAID"))
+    path = tmp_path / "drugs.json"
+    path.write_text(json.dumps({"drugs": [
+        {"name": "warfarin", "drug_class": "anticoagulant"},
+        {"name": "ibuprofen", "drug_class": "changed"},
+    ]}))
+    counts = db.bulk_import_json(str(path))
+    assert counts["skipped"] == 1
+    assert db.get_drug("warfarin")["drug_class"] == "anticoagulant"
+    assert db.get_drug("ibuprofen")["drug_class"] == "NSAID"
+
+def test_failed_import_keeps_search_in_sync(db, tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('{"drugs": [{"name": "aspirin"}, {"name": "ibuprofen"')
+    with pytest.raises(ValueError):
+        db.bulk_import_json(str(path), batch_size=1)
+    db.add_drug(Drug(name="warfarin", generic_name="coumadin"))
+    assert [r["name"] for r in db.search_drugs("coumad")] == ["warfarin"]
+    assert [r["name"] for r in db.search_drugs("warf")] == ["warfarin"]
@@ -0,0 +1,59 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from services.database import ConnectionPool, Drug, DrugDatabase
+
+def in_thread(fn):
+    out = {}
+
+    def run():
+        try:
+            out["value"] = fn()
+        except Exception as e:
+            out["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    if "error" in out:
+        raise out["error"]
+    return out["value"]
+
+@pytest.fixture
+def db():
+    db = DrugDatabase(":memory:")
+    yield db
+    db.close()
+
+def test_memory_database_reads_during_an_open_write(db):
+    db.add_drug(Drug(name="aspirin"))
+    writer = db.pool.connection()
+    writer.execute("INSERT INTO drugs (name) VALUES ('warfarin')")  # left uncommitted
+    names = in_thread(lambda: [r["name"] for r in db.pool.connection().execute("SELECT name FROM drugs")])
+    assert names == ["aspirin"]
+    writer.commit()
+    assert in_thread(lambda: db.pool.connection().execute("SELECT COUNT(*) FROM drugs").fetchone()[0]) == 2
+
+def test_connections_of_exited_threads_are_closed(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "drugs.db"))
+    dead = in_thread(pool.connection)
+    assert pool.size == 2
+    in_thread(pool.connection)
+    assert pool.size == 2
+    with pytest.raises(sqlite3.ProgrammingError):
+        dead.execute("SELECT 1")
+    pool.close_all()
+    assert pool.size == 0
+
+def test_close_removes_the_memory_backing_file():
+    pool = ConnectionPool(":memory:")
+    path = pool._temp_path
+    pool.connection().execute("CREATE TABLE t (x)")
+    assert os.path.exists(path)
+    pool.close_all()
+    assert not any(os.path.exists(path + suffix) for suffix in ("", "-wal", "-shm"))
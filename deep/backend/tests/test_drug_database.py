@@ -0,0 +1,64 @@
+import json
+import sqlite3
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from services.database import AgeDosage, Drug, DrugDatabase, DrugInteraction
+
+@pytest.fixture
+def db():
+    db = DrugDatabase(":memory:")
+    yield db
+    db.close()
+
+def interaction(drug1, drug2):
+    return DrugInteraction(drug1=drug1, drug2=drug2, severity="high", effect="bleeding", recommendation="avoid")
+
+def test_add_drug_fills_the_placeholder_left_by_an_interaction(db):
+    db.add_interaction(interaction("aspirin", "warfarin"))
+    placeholder_id = db.get_drug("warfarin")["id"]
+    assert db.get_drug("warfarin")["drug_class"] is None
+
+    drug_id = db.add_drug(Drug(name="Warfarin", drug_class="anticoagulant", side_effects=["bleeding"]))
+    assert drug_id == placeholder_id
+    assert db.get_drug("warfarin")["drug_class"] == "anticoagulant"
+    assert db.get_drug("warfarin")["side_effects"] == ["bleeding"]
+    assert db.get_interaction("aspirin", "warfarin")["effect"] == "bleeding"
+    db.add_dosage("warfarin", AgeDosage(age_range="19-65", dosage="5 mg", frequency="daily"))
+
+def test_add_drug_still_rejects_a_real_duplicate(db):
+    db.add_drug(Drug(name="aspirin", drug_class="NSAID"))
+    with pytest.raises(sqlite3.IntegrityError):
+        db.add_drug(Drug(name="aspirin", drug_class="salicylate"))
+    assert db.get_drug("aspirin")["drug_class"] == "NSAID"
+
+@pytest.mark.parametrize("query", ["ac", "ce", "a"])
+def test_short_queries_match_generic_names_and_infixes(db, query):
+    db.add_drug(Drug(name="paracetamol", generic_name="acetaminophen"))
+    db.add_drug(Drug(name="aspirin", generic_name="acetylsalicylic acid"))
+    assert {r["name"] for r in db.search_drugs(query)} == {"paracetamol", "aspirin"}
+
+def test_search_ranks_name_prefix_first(db):
+    db.add_drug(Drug(name="paracetamol", generic_name="acetaminophen"))
+    db.add_drug(Drug(name="acarbose"))
+    assert [r["name"] for r in db.search_drugs("ac")] == ["acarbose", "paracetamol"]
+    assert [r["name"] for r in db.search_drugs("acet")] == ["paracetamol"]
+
+def test_every_read_returns_plain_dicts(db):
+    db.add_drug(Drug(name="aspirin", side_effects=["heartburn"]))
+    db.add_drug(Drug(name="warfarin"))
+    db.add_interaction(interaction("aspirin", "warfarin"))
+    db.add_dosage("aspirin", AgeDosage(age_range="19-65", dosage="81 mg", frequency="daily"))
+    results = [
+        db.get_drug("aspirin"),
+        db.get_interaction("aspirin", "warfarin"),
+        *db.get_interactions_for_set(["aspirin", "warfarin"]),
+        *db.get_dosages("aspirin"),
+        *db.search_drugs("asp"),
+    ]
+    assert all(type(r) is dict for r in results)
+    json.dumps(results)
+    results[-1]["note"] = "callers may annotate results"
+    assert results[-1]["side_effects"] == ["heartburn"]
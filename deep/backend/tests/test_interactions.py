@@ -0,0 +1,84 @@
+import pytest
+
+from models.loading import LazyModel
+from services.lookup_cache import LookupCache
+
+from test_lookup_cache import DictBackend
+
+class FakeClassifier:
+    def __init__(self, label="moderate warning"):
+        self.label = label
+        self.calls = []
+
+    def __call__(self, prompts, batch_size):
+        self.calls.append((list(prompts), batch_size))
+        return [{"label": self.label} for _ in prompts]
+
+@pytest.fixture
+def model(interactions, monkeypatch):
+    classifier = FakeClassifier()
+    monkeypatch.setattr(interactions, "interaction_model", LazyModel("interactions", [("fake", lambda: classifier)]))
+    return classifier
+
+def make_analyzer(interactions, shared=None, batch_size=32):
+    cache = LookupCache(maxsize=100, ttls=interactions.INTERACTION_CACHE_TTLS, shared=shared, generation_poll=0)
+    return interactions.DrugInteractionAnalyzer(batch_size=batch_size, cache=cache)
+
+def test_database_pairs_bypass_the_cache(interactions, model):
+    shared = DictBackend()
+    analyzer = make_analyzer(interactions, shared)
+    hit = analyzer.check_database_interaction("Warfarin", "ASPIRIN")
+    assert hit["severity"] == "high"
+    assert analyzer.check_database_interaction("aspirin", "ibuprofen") is None
+    assert shared.values == {}
+    assert analyzer.interaction_cache.stats()["size"] == 0
+    assert "interaction_db" not in interactions.INTERACTION_CACHE_TTLS
+
+def test_model_predictions_are_shared_between_workers(interactions, model):
+    shared = DictBackend()
+    worker1 = make_analyzer(interactions, shared)
+    worker2 = make_analyzer(interactions, shared)
+    first = worker1.check_interactions(["aspirin", "ibuprofen"])
+    assert first["interactions"][0]["source"] == "model"
+    assert first["interactions"][0]["severity"] == "moderate"
+    assert list(shared.values) and all(key.startswith("interaction_model:") for key in shared.values)
+    assert worker2.check_interactions(["aspirin", "ibuprofen"]) == first
+    assert len(model.calls) == 1
+
+def test_unscored_pairs_go_through_the_model_in_one_call(interactions, model):
+    analyzer = make_analyzer(interactions, batch_size=8)
+    pairs = [("aspirin", "ibuprofen"), ("ibuprofen", "naproxen"), ("aspirin", "ibuprofen")]
+    results = analyzer.predict_interactions(pairs)
+    assert set(results) == {("aspirin", "ibuprofen"), ("ibuprofen", "naproxen")}
+    prompts, batch_size = model.calls[0]
+    assert len(model.calls) == 1 and batch_size == 8
+    assert prompts == [
+        "What happens when you take aspirin and ibuprofen together?",
+        "What happens when you take ibuprofen and naproxen together?",
+    ]
+
+def test_cached_pairs_are_not_scored_again(interactions, model):
+    analyzer = make_analyzer(interactions)
+    analyzer.predict_interactions([("aspirin", "ibuprofen")])
+    results = analyzer.predict_interactions([("aspirin", "ibuprofen"), ("ibuprofen", "naproxen")])
+    assert len(results) == 2
+    assert [prompts for prompts, _ in model.calls] == [
+        ["What happens when you take aspirin and ibuprofen together?"],
+        ["What happens when you take ibuprofen and naproxen together?"],
+    ]
+
+def test_database_hits_are_not_sent_to_the_model(interactions, model):
+    result = make_analyzer(interactions).check_interactions(["aspirin", "warfarin", "ibuprofen"])
+    assert [i["source"] for i in result["interactions"]] == ["database", "model", "model"]
+    assert len(model.calls) == 1 and len(model.calls[0][0]) == 2
+
+def test_missing_model_falls_back_without_caching(interactions, monkeypatch):
+    def unavailable():
+        raise OSError("no weights")
+
+    monkeypatch.setattr(interactions, "interaction_model", LazyModel("interactions", [("broken", unavailable)]))
+    analyzer = make_analyzer(interactions)
+    result = analyzer.check_interactions(["aspirin", "ibuprofen"])
+    assert result["interactions"][0]["effect"] == "Model not available"
+    assert result["interactions"][0]["severity"] == "unknown"
+    assert analyzer.interaction_cache.stats()["size"] == 0
@@ -0,0 +1,150 @@
+import sqlite3
+import threading
+
+import pytest
+
+from services.lookup_cache import LookupCache, SharedCacheBackend, SQLiteCacheBackend
+
+class DictBackend(SharedCacheBackend):
+    """In-process shared tier; reads can be held open to simulate a slow network"""
+
+    def __init__(self):
+        self.values = {}
+        self.generations = {}
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Event()
+
+    def get(self, key):
+        self.entered.set()
+        self.gate.wait(5)
+        return self.values.get(key)
+
+    def set(self, key, value, ttl):
+        self.values[key] = value
+
+    def generation(self, table):
+        self.entered.set()
+        self.gate.wait(5)
+        return self.generations.get(table, 0)
+
+    def bump(self, table):
+        self.generations[table] = self.generations.get(table, 0) + 1
+        return self.generations[table]
+
+def make_row(**columns):
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    names = ", ".join(f'? AS "{name}"' for name in columns)
+    return conn.execute(f"SELECT {names}", tuple(columns.values())).fetchone()
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        SharedCacheBackend()
+
+    class Partial(SharedCacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+def test_every_tier_returns_plain_dicts(tmp_path):
+    from services.database import Record
+
+    shared = SQLiteCacheBackend(str(tmp_path / "shared.sqlite"))
+    worker1 = LookupCache(shared=shared, generation_poll=0)
+    worker2 = LookupCache(shared=shared, generation_poll=0)
+    loaded = worker1.read_through("drugs", "aspirin", lambda: Record(make_row(name="aspirin", side_effects='["heartburn"]')))
+    local = worker1.get("drugs", "aspirin")
+    from_shared = worker2.get("drugs", "aspirin")
+    assert type(loaded) is type(local) is type(from_shared) is dict
+    assert loaded == local == from_shared == {"name": "aspirin", "side_effects": ["heartburn"]}
+    rows = worker1.read_through("dosages", "aspirin", lambda: [Record(make_row(dosage="81 mg"))])
+    assert rows == worker2.get("dosages", "aspirin") == [{"dosage": "81 mg"}]
+
+@pytest.mark.parametrize("repoll", [False, True])
+def test_local_hits_do_not_wait_for_shared_io(repoll):
+    shared = DictBackend()
+    cache = LookupCache(shared=shared, generation_poll=60)
+    cache.put("drugs", "aspirin", {"name": "aspirin"})
+    if repoll:
+        cache._polled_at = 0.0  # the next lookup blocks in generation()
+    shared.gate.clear()
+    shared.entered.clear()
+    slow = threading.Thread(target=cache.get, args=("drugs", "warfarin"))
+    slow.start()
+    assert shared.entered.wait(5)
+    hit = []
+    fast = threading.Thread(target=lambda: hit.append(cache.get("drugs", "aspirin")))
+    fast.start()
+    fast.join(1)
+    finished_while_blocked = not fast.is_alive()
+    shared.gate.set()
+    slow.join()
+    fast.join()
+    assert finished_while_blocked
+    assert hit == [{"name": "aspirin"}]
+
+def test_invalidation_reaches_other_workers():
+    shared = DictBackend()
+    worker1 = LookupCache(shared=shared, generation_poll=0)
+    worker2 = LookupCache(shared=shared, generation_poll=0)
+    worker1.put("drugs", "aspirin", {"name": "aspirin"})
+    assert worker2.get("drugs", "aspirin") == {"name": "aspirin"}
+    worker2.invalidate("drugs")
+    assert worker1.get("drugs", "aspirin") is None
+    assert worker2.get("drugs", "aspirin") is None
+
+def test_unreachable_shared_tier_falls_back_to_local_generations():
+    class Down(DictBackend):
+        def generation(self, table):
+            raise ConnectionError("down")
+
+        def bump(self, table):
+            raise ConnectionError("down")
+
+    cache = LookupCache(shared=Down(), generation_poll=0)
+    cache.put("drugs", "aspirin", {"name": "aspirin"})
+    assert cache.get("drugs", "aspirin") == {"name": "aspirin"}
+    cache.invalidate("drugs")
+    assert cache.get("drugs", "aspirin") is None
+
+class FlakyBumps(DictBackend):
+    """Shared tier whose bumps fail while down is set; reads keep working"""
+
+    def __init__(self):
+        super().__init__()
+        self.down = False
+
+    def bump(self, table):
+        if self.down:
+            raise ConnectionError("down")
+        return super().bump(table)
+
+def test_failed_shared_bump_does_not_revive_stale_entries():
+    shared = FlakyBumps()
+    cache = LookupCache(shared=shared, generation_poll=0)
+    other = LookupCache(shared=shared, generation_poll=0)
+    assert cache.read_through("drugs", "aspirin", lambda: {"v": "old"}) == {"v": "old"}
+    shared.down = True
+    cache.invalidate("drugs")
+    # The poll sees the shared generation the bump never reached
+    assert cache.read_through("drugs", "aspirin", lambda: {"v": "new"}) == {"v": "new"}
+    assert cache.get("drugs", "aspirin") == {"v": "new"}
+    assert all("new" not in value for value in shared.values.values())
+    # Other workers missed the invalidation and are not handed this worker's entries either
+    assert other.get("drugs", "aspirin") == {"v": "old"}
+
+    shared.down = False
+    assert cache.read_through("drugs", "aspirin", lambda: {"v": "newer"}) == {"v": "newer"}
+    assert other.get("drugs", "aspirin") == {"v": "newer"}
+    assert shared.generations["drugs"] == 1
+
+def test_poll_never_lowers_a_generation():
+    shared = DictBackend()
+    cache = LookupCache(shared=shared, generation_poll=0)
+    cache._generations["drugs"] = 5
+    cache.put("drugs", "aspirin", {"name": "aspirin"})
+    assert cache.get("drugs", "aspirin") == {"name": "aspirin"}
+    assert cache.stats()["tables"]["drugs"]["generation"] == 5
@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+from models.loading import LazyModel, load_pipeline
+
+def test_nothing_loads_until_first_use():
+    calls = []
+    model = LazyModel("ner", [("primary", lambda: calls.append(1) or "pipeline")], model_format="pytorch")
+    assert (model.state, model.ready, model.version, calls) == ("not_loaded", False, None, [])
+    assert model.get() == "pipeline"
+    assert model.get() == "pipeline"
+    assert calls == [1]
+    assert model.version == "primary:pytorch"
+    assert model.status()["state"] == "ready"
+
+def test_importing_drug_ner_does_not_load_a_model():
+    from models.drug_ner import ner_model
+    assert ner_model.state in ("not_loaded", "ready", "failed")  # another test may have loaded a fake
+    assert ner_model.candidates[0][0] == "d4data/biomedical-ner-all"
+
+def test_fallback_loads_only_when_the_primary_fails():
+    loaded = []
+
+    def broken():
+        loaded.append("primary")
+        raise OSError("weights missing")
+
+    model = LazyModel("ner", [("primary", broken), ("fallback", lambda: loaded.append("fallback") or "small")])
+    assert model.get() == "small"
+    assert loaded == ["primary", "fallback"]
+    assert (model.source, model.error) == ("fallback", None)
+
+def test_every_candidate_failing_is_remembered():
+    attempts = []
+
+    def broken():
+        attempts.append(1)
+        raise OSError("no network")
+
+    model = LazyModel("interactions", [("only", broken)])
+    assert model.get() is None
+    assert model.get() is None
+    assert attempts == [1]
+    assert model.status()["state"] == "failed"
+    assert model.status()["error"] == "no network"
+
+def test_concurrent_first_use_loads_once():
+    started = threading.Event()
+    loads = []
+
+    def slow():
+        loads.append(1)
+        started.wait(5)
+        return "pipeline"
+
+    model = LazyModel("ner", [("primary", slow)])
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(model.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["pipeline"] * 8
+    assert loads == [1]
+
+def test_unknown_model_format_is_rejected():
+    pytest.importorskip("transformers")
+    with pytest.raises(ValueError):
+        load_pipeline("ner", "some/model", "fp8")
+
+def fake_ner_pipeline(calls):
+    def pipeline(texts, batch_size):
+        calls.append(list(texts))
+        return [[{"entity": "B-DRUG", "word": word} for word in text.split() if word == "aspirin"] for text in texts]
+    return pipeline
+
+def test_drug_ner_warm_up_loads_and_runs_one_batch(monkeypatch):
+    from models import drug_ner
+
+    calls = []
+    model = LazyModel("drug_ner", [("fake", lambda: fake_ner_pipeline(calls))])
+    monkeypatch.setattr(drug_ner, "ner_model", model)
+    drug_ner.warm_up()
+    assert model.ready
+    assert calls == [["Take aspirin 100 mg daily"]]
+    assert drug_ner.extract_drugs("give aspirin now") == ["aspirin"]
+
+def test_onnx_formats_explain_the_optional_requirements(monkeypatch):
+    transformers = pytest.importorskip("transformers")
+    import sys
+
+    monkeypatch.setattr(transformers, "pipeline", lambda *a, **kw: pytest.fail("pipeline should not be built"))
+    monkeypatch.setitem(sys.modules, "optimum.onnxruntime", None)
+    with pytest.raises(ImportError, match="requirements-onnx.txt"):
+        load_pipeline("ner", "some/model", "onnx-int8")
+
+@pytest.mark.parametrize("model_format, file_name", [("onnx", "model.onnx"), ("onnx-int8", "model_quantized.onnx")])
+def test_onnx_formats_load_the_exported_graph(monkeypatch, tmp_path, model_format, file_name):
+    transformers = pytest.importorskip("transformers")
+    ort = pytest.importorskip("optimum.onnxruntime")
+    from models import loading
+
+    exported = []
+    loaded = {}
+    monkeypatch.setattr(loading, "export_onnx", lambda task, model, int8: exported.append(int8) or str(tmp_path))
+    monkeypatch.setattr(ort.ORTModelForTokenClassification, "from_pretrained",
+                        lambda path, file_name: loaded.update(path=path, file_name=file_name) or "graph")
+    monkeypatch.setattr(transformers.AutoTokenizer, "from_pretrained", lambda path: "tokenizer")
+    monkeypatch.setattr(transformers, "pipeline", lambda task, model, tokenizer: (task, model, tokenizer))
+    assert load_pipeline("ner", "some/model", model_format) == ("ner", "graph", "tokenizer")
+    assert exported == [model_format == "onnx-int8"]
+    assert loaded == {"path": str(tmp_path), "file_name": file_name}
@@ -0,0 +1,57 @@
+import importlib
+import sqlite3
+
+from services import nlu_cache
+from services.nlu_cache import NLUResultCache
+
+FEATURES = {"keywords": {}}
+RESULT = {"keywords": [{"text": "aspirin"}]}
+
+def make_cache(path, **kwargs):
+    return NLUResultCache("2022-04-07", FEATURES, path=str(path), **{"ttl": 60, **kwargs})
+
+def test_disabled_unless_a_ttl_is_configured(tmp_path, monkeypatch):
+    monkeypatch.delenv("NLU_CACHE_TTL", raising=False)
+    assert importlib.reload(nlu_cache).NLU_CACHE_TTL == 0
+    cache = make_cache(tmp_path / "nlu.db", ttl=0)
+    cache.put("take aspirin", RESULT)
+    assert cache.get("take aspirin") is None
+    assert not (tmp_path / "nlu.db").exists()
+
+def test_results_are_tagged_with_version_and_features(tmp_path):
+    make_cache(tmp_path / "nlu.db").put("take aspirin", RESULT)
+    assert make_cache(tmp_path / "nlu.db").get("take aspirin") == RESULT
+    other = NLUResultCache("2023-01-01", FEATURES, path=str(tmp_path / "nlu.db"), ttl=60)
+    assert other.get("take aspirin") is None
+    assert make_cache(tmp_path / "nlu.db").get("take aspirin") is None
+
+def test_unopenable_database_disables_the_cache(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    cache = make_cache(blocker / "nlu.db")
+    assert not cache.enabled
+    cache.put("take aspirin", RESULT)
+    assert cache.get("take aspirin") is None
+    assert cache.purge() == 0
+    assert cache.stats()["enabled"] is False
+    assert cache.stats()["errors"] == 1
+
+def test_storage_errors_are_counted_not_raised(tmp_path):
+    cache = make_cache(tmp_path / "nlu.db")
+    cache._conn().execute("DROP TABLE nlu_results")
+    cache.put("take aspirin", RESULT)
+    assert cache.get("take aspirin") is None
+    assert cache.purge() == 0
+    assert cache.stats()["errors"] == 3
+
+def test_stats_do_not_query_the_database(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path / "nlu.db")
+    cache.put("take aspirin", RESULT)
+    cache.get("take aspirin")
+
+    def no_queries():
+        raise sqlite3.OperationalError("stats must not touch the database")
+
+    monkeypatch.setattr(cache, "_conn", no_queries)
+    stats = cache.stats()
+    assert (stats["hits"], stats["writes"], stats["errors"]) == (1, 1, 0)
@@ -0,0 +1,38 @@
+import json
+import sqlite3
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from services.database import Record
+
+def make_row(**columns):
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    names = ", ".join(f'? AS "{name}"' for name in columns)
+    return conn.execute(f"SELECT {names}", tuple(columns.values())).fetchone()
+
+def test_behaves_like_the_old_dict():
+    record = Record(make_row(name="aspirin", side_effects='["heartburn"]', description=None))
+    assert record["name"] == "aspirin"
+    assert record.get("missing") is None
+    assert dict(record) == {"name": "aspirin", "side_effects": ["heartburn"], "description": None}
+    assert {**record} == record.to_dict()
+    with pytest.raises(KeyError):
+        record["missing"]
+
+def test_json_columns_decode_once_and_only_on_access(monkeypatch):
+    calls = []
+    real_loads = json.loads
+    monkeypatch.setattr(json, "loads", lambda s, *a, **kw: calls.append(s) or real_loads(s, *a, **kw))
+    record = Record(make_row(name="aspirin", contraindications='["asthma"]', side_effects='["heartburn"]'))
+    assert record["name"] == "aspirin"
+    assert calls == []
+    assert record["contraindications"] == ["asthma"]
+    assert record["contraindications"] == ["asthma"]
+    assert calls == ['["asthma"]']
+
+def test_malformed_json_reads_as_none():
+    assert Record(make_row(references="not json"))["references"] is None
+    assert Record(make_row(references=""))["references"] == ""
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from models import drug_ner
+from models.loading import LazyModel
+from services.stage_graph import Stage, StageFailed, run_stage_graph
+
+class GatedNER:
+    """NER pipeline that blocks on calls listed in hold until release() is called"""
+
+    def __init__(self, hold=(0,)):
+        self.hold = set(hold)
+        self.gate = threading.Event()
+        self.calls = []
+
+    def __call__(self, texts, batch_size):
+        held = len(self.calls) in self.hold
+        self.calls.append(list(texts))
+        if held:
+            self.gate.wait(5)
+        return [[{"entity": "B-DRUG", "word": w} for w in text.split() if w == "aspirin"] for text in texts]
+
+    def release(self):
+        self.gate.set()
+
+@pytest.fixture
+def ner(monkeypatch):
+    pipeline = GatedNER()
+    monkeypatch.setattr(drug_ner, "ner_model", LazyModel("drug_ner", [("fake", lambda: pipeline)]))
+    yield pipeline
+    pipeline.release()
+
+def ner_stage(text, timeout):
+    async def ner():
+        return await drug_ner.extract_drugs_async(text)
+    return Stage('ner', ner, timeout=timeout, required=True)
+
+def test_ner_timeout_fails_the_request_but_not_the_next_one(ner):
+    async def scenario():
+        with pytest.raises(StageFailed) as failed:
+            await run_stage_graph([ner_stage("take aspirin", 0.1)])
+        ner.release()
+        return failed.value, await run_stage_graph([ner_stage("more aspirin", 2)])
+
+    failed, run = asyncio.run(scenario())
+    assert (failed.stage, failed.status) == ("ner", "timeout")
+    assert run["results"]["ner"] == ["aspirin"]
+    assert drug_ner.ner_batcher.stats()["restarts"] == 0
+
+def test_requests_that_time_out_while_queued_are_skipped(ner):
+    cancelled = drug_ner.ner_batcher.stats()["cancelled"]
+
+    async def scenario():
+        running = asyncio.ensure_future(drug_ner.extract_drugs_async("take aspirin"))
+        while not ner.calls:
+            await asyncio.sleep(0.01)
+        with pytest.raises(StageFailed):
+            await run_stage_graph([ner_stage("queued aspirin", 0.1)])
+        ner.release()
+        await running
+        return await run_stage_graph([ner_stage("later aspirin", 2)])
+
+    run = asyncio.run(scenario())
+    assert run["results"]["ner"] == ["aspirin"]
+    assert ["queued aspirin"] not in ner.calls
+    assert drug_ner.ner_batcher.stats()["cancelled"] == cancelled + 1
+
+def test_optional_stage_falls_back_and_is_reported_as_partial():
+    def slow_watson():
+        time.sleep(0.3)
+        return {"keywords": ["late"]}
+
+    async def drugs():
+        return ["aspirin"]
+
+    async def interactions(drugs):
+        return {"checked": drugs}
+
+    run = asyncio.run(run_stage_graph([
+        Stage('drugs', drugs),
+        Stage('interactions', interactions, deps=['drugs']),
+        Stage('watson', slow_watson, timeout=0.05, fallback={}),
+    ]))
+    assert run["results"] == {"drugs": ["aspirin"], "interactions": {"checked": ["aspirin"]}, "watson": {}}
+    assert run["partial"] == ["watson"]
+    assert run["timings"]["watson"]["status"] == "timeout"
+    assert run["timings"]["interactions"]["status"] == "ok"
+
+def test_required_stage_error_cancels_the_rest():
+    async def ner():
+        raise RuntimeError("NER model unavailable")
+
+    async def watson():
+        await asyncio.sleep(5)
+
+    async def scenario():
+        start = time.perf_counter()
+        with pytest.raises(StageFailed) as failed:
+            await run_stage_graph([Stage('ner', ner, required=True), Stage('watson', watson)])
+        return failed.value, time.perf_counter() - start
+
+    failed, elapsed = asyncio.run(scenario())
+    assert (failed.stage, failed.status) == ("ner", "error")
+    assert elapsed < 1
@@ -0,0 +1,165 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from services import watson_transport
+from services.watson_transport import AsyncNLUClient, CircuitBreaker, NLUAuthError
+
+FEATURES = {"keywords": {}}
+
+class Clock:
+    """Stands in for time and asyncio.sleep so backoff waits take no real time"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(watson_transport, "time", clock)
+    monkeypatch.setattr(watson_transport, "asyncio", SimpleNamespace(
+        sleep=clock.sleep, Semaphore=asyncio.Semaphore, Lock=asyncio.Lock,
+        wait_for=asyncio.wait_for, TimeoutError=asyncio.TimeoutError,
+    ))
+    return clock
+
+def make_client(handler, **kwargs):
+    client = AsyncNLUClient("http://nlu.test", **kwargs)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+def analyze(client, deadline=None):
+    async def call():
+        try:
+            return await client.analyze("take aspirin", FEATURES, deadline)
+        finally:
+            await client.aclose()
+    return asyncio.run(call())
+
+def throttled(retry_after):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": str(retry_after)})
+        return httpx.Response(200, json={"keywords": []})
+
+    return handler, calls
+
+def test_retry_after_is_honoured_beyond_the_backoff_cap(clock):
+    handler, calls = throttled(int(watson_transport.NLU_BACKOFF_CAP) + 3)
+    assert analyze(make_client(handler), deadline=30) == {"keywords": []}
+    assert clock.sleeps == [int(watson_transport.NLU_BACKOFF_CAP) + 3]
+    assert len(calls) == 2
+
+def test_retry_after_past_the_deadline_gives_up_without_waiting(clock):
+    handler, calls = throttled(60)
+    client = make_client(handler)
+    with pytest.raises(httpx.HTTPStatusError):
+        analyze(client, deadline=5)
+    assert clock.sleeps == []
+    assert len(calls) == 1
+    assert client.stats()["deadline_exceeded"] == 1
+
+def test_retries_stop_at_the_deadline(clock):
+    calls = []
+
+    def unavailable(request):
+        calls.append(1)
+        return httpx.Response(503, headers={"Retry-After": "2"})
+
+    client = make_client(unavailable, retries=10)
+    with pytest.raises(httpx.HTTPStatusError):
+        analyze(client, deadline=5)
+    assert sum(clock.sleeps) < 5
+    assert len(calls) == 3
+    assert client.breaker.failures == 1
+
+def test_attempts_are_cut_to_the_time_left(clock):
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, json={})
+
+    analyze(make_client(handler, timeout=10), deadline=4)
+    assert timeouts == [4]
+
+def test_iam_failures_do_not_count_as_nlu_health(clock):
+    nlu_calls = []
+
+    def handler(request):
+        if request.url.path == "/identity/token":
+            return httpx.Response(400, json={"errorMessage": "Provided API key could not be found"})
+        nlu_calls.append(1)
+        return httpx.Response(200, json={})
+
+    breaker = CircuitBreaker(threshold=5)
+    breaker.failures = 3
+    client = make_client(handler, api_key="bad-key", iam_url="http://iam.test/identity/token", breaker=breaker)
+    with pytest.raises(NLUAuthError):
+        analyze(client)
+    assert nlu_calls == []
+    assert breaker.failures == 3
+    assert client.stats()["auth_failures"] == 1
+
+def test_spent_deadline_sends_nothing(clock):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"access_token": "t"})
+
+    breaker = CircuitBreaker()
+    client = make_client(handler, api_key="key", iam_url="http://iam.test/identity/token", breaker=breaker)
+    with pytest.raises(httpx.TimeoutException):
+        analyze(client, deadline=0)
+    assert calls == []
+    assert breaker.failures == 0
+    assert client.stats()["deadline_exceeded"] == 1
+
+def test_waiting_for_a_slot_counts_against_the_deadline():
+    release = asyncio.Event()
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        await release.wait()
+        return httpx.Response(200, json={"keywords": []})
+
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+    client = make_client(handler, max_concurrency=1, breaker=breaker)
+
+    async def scenario():
+        first = asyncio.ensure_future(client.analyze("take aspirin", FEATURES, 5))
+        while not calls:
+            await asyncio.sleep(0.01)
+        # The breaker is due a half-open trial; a call stuck in the queue must not take it
+        breaker.record_failure()
+        with pytest.raises(httpx.TimeoutException):
+            await client.analyze("take warfarin", FEATURES, 0.1)
+        state = breaker.state
+        release.set()
+        await first
+        await client.aclose()
+        return state
+
+    assert asyncio.run(scenario()) == "open"
+    assert len(calls) == 1
+    assert client.stats()["deadline_exceeded"] == 1
+    assert client.stats()["in_flight"] == 0
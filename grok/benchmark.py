@@ -0,0 +1,205 @@
+# benchmark.py
+# ------------------------------------------------------------
+# Reproducible benchmark for the grok analysis hot path.
+#
+#   python benchmark.py                      # run, compare against bench_baseline.json
+#   python benchmark.py --save-baseline      # run and store the result as the new baseline
+#   python benchmark.py --ocr                # also time /upload-analyze on synthetic scans
+#
+# Prescriptions are generated from drug_data.DRUGS with a fixed seed at
+# 2..200 drugs per script. Each case reports p50/p99 latency, throughput and
+# peak bytes allocated per call (tracemalloc, measured in a separate pass).
+# /analyze is timed with its result cache emptied before every call;
+# /analyze-cached times repeat requests served from that cache.
+# ------------------------------------------------------------
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from drug_data import DRUGS, SYNONYMS, check_interactions, get_alternatives, get_dosage
+
+SIZES = [2, 5, 10, 20, 40, 100, 200]
+ALLOC_SAMPLES = 50  # calls per case traced with tracemalloc
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+# ------------------------------
+# Synthetic inputs
+# ------------------------------
+def make_prescriptions(size, count, seed=0):
+    """count random scripts of size drugs; drawn with replacement once size > len(DRUGS)."""
+    rng = random.Random(seed * 1000 + size)
+    names = DRUGS + list(SYNONYMS)
+    if size <= len(DRUGS):
+        return [rng.sample(DRUGS, size) for _ in range(count)]
+    return [rng.choices(names, k=size) for _ in range(count)]
+
+def make_scan(drugs, seed=0):
+    """PNG bytes of a typed prescription listing drugs, for /upload-analyze."""
+    from PIL import Image, ImageDraw
+    rng = random.Random(seed)
+    lines = ["Rx", ""] + [f"{d.capitalize()} {rng.choice([5, 10, 20, 50, 100, 500])}mg "
+                          f"{rng.choice(['daily', 'twice daily', 'at night'])}" for d in drugs]
+    image = Image.new("L", (900, 60 + 28 * len(lines)), 255)
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((40, 30 + 28 * i), line, fill=0)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+# ------------------------------
+# Measurement
+# ------------------------------
+def _pct(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+def measure(fn, inputs, repeat=3):
+    """Time fn over every input `repeat` times, then measure allocations in one extra pass."""
+    fn(inputs[0])  # warm-up (first use loads the catalog snapshot)
+    samples = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+    # Peak bytes allocated above the starting point, averaged per call
+    sampled = inputs[:ALLOC_SAMPLES]
+    allocated = 0
+    tracemalloc.start()
+    for item in sampled:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn(item)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - base
+    tracemalloc.stop()
+    return {
+        "calls": len(samples),
+        "p50_us": round(_pct(samples, 0.50) * 1e6, 2),
+        "p99_us": round(_pct(samples, 0.99) * 1e6, 2),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 2),
+        "throughput_per_s": round(len(samples) / sum(samples), 1),
+        "alloc_bytes_per_call": allocated // len(sampled),
+    }
+
+def run_async(coro_fn):
+    loop = asyncio.new_event_loop()
+
+    def call(item):
+        return loop.run_until_complete(coro_fn(item))
+    return call, loop
+
+# ------------------------------
+# Cases
+# ------------------------------
+def bench_catalog(count, repeat):
+    results = {}
+    for size in SIZES:
+        scripts = make_prescriptions(size, count)
+        results[f"check_interactions[{size}]"] = measure(check_interactions, scripts, repeat)
+        results[f"get_dosage[{size}]"] = measure(lambda s: [get_dosage(d, 30) for d in s], scripts, repeat)
+        results[f"get_alternatives[{size}]"] = measure(lambda s: [get_alternatives(d) for d in s], scripts, repeat)
+    return results
+
+def bench_routes(count, repeat, ocr):
+    try:
+        import main
+    except ImportError as e:
+        print(f"Skipping route benchmarks: {e}", file=sys.stderr)
+        return {}
+    results = {}
+    call, loop = run_async(main.analyze)
+
+    def uncached(request):
+        # Every pass after the first would otherwise be served by the result cache
+        main.analyze_cache.clear()
+        return call(request)
+    try:
+        for size in SIZES:
+            requests_ = [main.AnalyzeRequest(drugs=s, age=30) for s in make_prescriptions(size, count)]
+            results[f"/analyze[{size}]"] = measure(uncached, requests_, repeat)
+            for request in requests_:
+                call(request)  # fill the cache so every timed call is a hit
+            results[f"/analyze-cached[{size}]"] = measure(call, requests_, repeat)
+        if ocr:
+            from starlette.datastructures import UploadFile
+
+            loop.run_until_complete(main.ocr_pool.start())
+
+            async def upload(scan):
+                return await main.upload_analyze(UploadFile(io.BytesIO(scan), filename="scan.png"), age=30)
+            upload_call = lambda scan: loop.run_until_complete(upload(scan))  # noqa: E731
+            for size in [2, 5, 10, 20]:
+                scans = [make_scan(s, seed=i) for i, s in enumerate(make_prescriptions(size, max(3, count // 20)))]
+                results[f"/upload-analyze[{size}]"] = measure(upload_call, scans, repeat=1)
+            main.ocr_pool.shutdown()
+    finally:
+        loop.close()
+    return results
+
+# ------------------------------
+# Baseline comparison
+# ------------------------------
+def compare(results, baseline, threshold):
+    """Print p50/p99 ratios against the baseline; returns the names of regressed cases."""
+    regressed = []
+    print(f"\n{'case':32} {'p50 us':>10} {'base':>10} {'ratio':>7} {'p99 us':>10} {'base':>10}")
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:32} {cur['p50_us']:>10} {'-':>10} {'new':>7} {cur['p99_us']:>10} {'-':>10}")
+            continue
+        ratio = cur["p50_us"] / base["p50_us"] if base["p50_us"] else float("inf")
+        flag = " !" if ratio > 1 + threshold else ""
+        if flag:
+            regressed.append(name)
+        print(f"{name:32} {cur['p50_us']:>10} {base['p50_us']:>10} {ratio:>7.2f} "
+              f"{cur['p99_us']:>10} {base['p99_us']:>10}{flag}")
+    return regressed
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark the grok analysis hot path")
+    parser.add_argument("--count", type=int, default=200, help="prescriptions per size")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes over the inputs")
+    parser.add_argument("--ocr", action="store_true", help="include /upload-analyze on synthetic scans")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="p50 slowdown that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    results = bench_catalog(args.count, args.repeat)
+    results.update(bench_routes(args.count, args.repeat, args.ocr))
+    run = {
+        "python": sys.version.split()[0],
+        "count": args.count,
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+    for name, r in results.items():
+        print(f"{name:32} p50={r['p50_us']}us p99={r['p99_us']}us "
+              f"{r['throughput_per_s']}/s alloc={r['alloc_bytes_per_call']}B")
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressed = compare(results, json.load(f)["results"], args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} case(s) slower than baseline by >{args.threshold:.0%}")
+            if args.fail_on_regression:
+                sys.exit(1)
+
+if __name__ == "__main__":
+    main_cli()
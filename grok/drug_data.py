@@ -3,8 +3,16 @@
 # MOCK DATABASE for demos only — NOT FOR MEDICAL USE.
 # ------------------------------------------------------------
 
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
 from itertools import combinations
 
+from interaction_matrix import InteractionMatrix
+
 # ------------------------------
 # Canonical drug list (common)
 # ------------------------------
@@ -35,6 +43,38 @@ DRUGS = [
     "allopurinol", "colchicine", "levothyroxine", "bupropion"
 ]
 
+# ------------------------------
+# Synonyms: brand / alternate names -> canonical name in DRUGS
+# ------------------------------
+SYNONYMS = {
+    "tylenol": "acetaminophen", "paracetamol": "acetaminophen",
+    "advil": "ibuprofen", "motrin": "ibuprofen",
+    "aleve": "naproxen", "naprosyn": "naproxen",
+    "voltaren": "diclofenac", "toradol": "ketorolac",
+    "ultram": "tramadol", "ms contin": "morphine",
+    "coumadin": "warfarin", "jantoven": "warfarin",
+    "eliquis": "apixaban", "plavix": "clopidogrel",
+    "acetylsalicylic acid": "aspirin",
+    "zoloft": "sertraline", "prozac": "fluoxetine", "celexa": "citalopram",
+    "paxil": "paroxetine", "effexor": "venlafaxine", "wellbutrin": "bupropion",
+    "glucophage": "metformin", "lantus": "insulin", "insulin glargine": "insulin",
+    "glucotrol": "glipizide", "actos": "pioglitazone", "januvia": "sitagliptin",
+    "zestril": "lisinopril", "prinivil": "lisinopril", "vasotec": "enalapril",
+    "altace": "ramipril", "cozaar": "losartan", "norvasc": "amlodipine",
+    "lopressor": "metoprolol", "toprol xl": "metoprolol", "inderal": "propranolol",
+    "calan": "verapamil", "cardizem": "diltiazem", "lasix": "furosemide",
+    "hctz": "hydrochlorothiazide", "aldactone": "spironolactone", "lanoxin": "digoxin",
+    "lipitor": "atorvastatin", "zocor": "simvastatin", "crestor": "rosuvastatin",
+    "prilosec": "omeprazole", "protonix": "pantoprazole", "zantac": "ranitidine",
+    "amoxil": "amoxicillin", "zithromax": "azithromycin", "z-pak": "azithromycin",
+    "cipro": "ciprofloxacin", "vibramycin": "doxycycline",
+    "deltasone": "prednisone", "cortef": "hydrocortisone", "trexall": "methotrexate",
+    "imuran": "azathioprine", "neoral": "cyclosporine", "sandimmune": "cyclosporine",
+    "valium": "diazepam", "ativan": "lorazepam", "xanax": "alprazolam",
+    "zyloprim": "allopurinol", "colcrys": "colchicine",
+    "synthroid": "levothyroxine", "levoxyl": "levothyroxine",
+}
+
 # ------------------------------
 # Base (hand-written) interactions (plausible but MOCK)
 # ------------------------------
@@ -112,31 +152,32 @@ FILL_MESSAGES = [
     "May raise blood pressure", "Additive CNS depression",
 ]
 
-# Normalize base keys to lowercase + sorted
-norm_base = {
-    tuple(sorted((a.lower(), b.lower()))): msg for (a, b), msg in BASE_INTERACTIONS.items()
-}
+def _build_interactions():
+    # Normalize base keys to lowercase + sorted
+    norm_base = {
+        tuple(sorted((a.lower(), b.lower()))): msg for (a, b), msg in BASE_INTERACTIONS.items()
+    }
 
-# Fill up to at least 120 interaction pairs
-needed = 120 - len(norm_base)
-if needed > 0:
-    for a, b in combinations(sorted(DRUGS), 2):
-        key = (a.lower(), b.lower())
-        key = tuple(sorted(key))
-        if key in norm_base:
-            continue
-        # Skip obviously nonsensical pairs with same drug
-        msg = FILL_MESSAGES[len(norm_base) % len(FILL_MESSAGES)]
-        norm_base[key] = msg
-        if len(norm_base) >= 120:
-            break
+    # Fill up to at least 120 interaction pairs
+    needed = 120 - len(norm_base)
+    if needed > 0:
+        for a, b in combinations(sorted(DRUGS), 2):
+            key = (a.lower(), b.lower())
+            key = tuple(sorted(key))
+            if key in norm_base:
+                continue
+            # Skip obviously nonsensical pairs with same drug
+            msg = FILL_MESSAGES[len(norm_base) % len(FILL_MESSAGES)]
+            norm_base[key] = msg
+            if len(norm_base) >= 120:
+                break
 
-drug_interactions = norm_base  # final dict (>=120 pairs)
+    return norm_base  # final dict (>=120 pairs)
 
 # ------------------------------
 # Dosage guidelines (fixed, simple)
 # ------------------------------
-dosage_guidelines = {
+BASE_DOSAGES = {
     # analgesics / NSAIDs
     "acetaminophen": {"adult": "500mg every 6–8h (max 3g/day)", "child": "10–15mg/kg every 6h"},
     "ibuprofen": {"adult": "400mg every 6–8h", "child": "5–10mg/kg every 6–8h"},
@@ -206,11 +247,6 @@ dosage_guidelines = {
     "alprazolam": {"adult": "0.25–0.5mg two–three times daily", "child": "Not established"},
 }
 
-# Ensure every drug in DRUGS has a dosage entry
-for d in DRUGS:
-    if d not in dosage_guidelines:
-        dosage_guidelines[d] = {"adult": "See label", "child": "Consult physician"}
-
 # ------------------------------
 # Alternatives (simple class-based)
 # ------------------------------
@@ -238,11 +274,204 @@ def _alts(drug: str):
             return [x for x in members if x != drug][:2] or [m for m in DRUGS if m != drug][:2]
     return [m for m in DRUGS if m != drug][:2]
 
-alternatives = {d: _alts(d) for d in DRUGS}
+# ------------------------------
+# Catalog snapshot (compiled once, loaded lazily)
+# ------------------------------
+# The derived tables (filled interactions, back-filled dosages, alternatives and
+# the integer-coded interaction matrix) are compiled into a versioned JSON snapshot
+# next to this file. Workers load it on first use instead of recomputing; it is
+# rebuilt automatically when this file changes (by mtime and size), or with `--rebuild`.
+SNAPSHOT_FORMAT = 2
+_HERE = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_PATH = os.getenv("GROK_CATALOG_SNAPSHOT", os.path.join(_HERE, "catalog.snapshot.json"))
+INTERACTION_MATRIX_PATH = os.getenv("GROK_INTERACTION_MATRIX", os.path.join(_HERE, "interaction_matrix.bin"))
+# Running workers pick up a snapshot rebuilt on disk (e.g. `--rebuild` at deploy time);
+# the file's mtime is checked at most this often, in seconds
+CATALOG_CHECK_INTERVAL = float(os.getenv("GROK_CATALOG_CHECK_INTERVAL", "5"))
+
+class Catalog:
+    def __init__(self, snapshot, matrix):
+        self.version = f"{snapshot['format']}-{snapshot['version']}"
+        self.drug_interactions = snapshot["drug_interactions"]
+        self.dosage_guidelines = snapshot["dosage_guidelines"]
+        self.alternatives = snapshot["alternatives"]
+        self.interaction_matrix = matrix
+        self.DRUG_IDS = matrix.ids
+        self.snapshot_stamp = None  # snapshot file mtime/size this catalog came from
+
+def _source_stamp():
+    """Identifies this file's current contents without reading it."""
+    st = os.stat(os.path.abspath(__file__))
+    return [st.st_mtime_ns, st.st_size]
+
+def _compile_catalog():
+    """Run the Python-level generation of every derived table."""
+    dosage_guidelines = dict(BASE_DOSAGES)
+    # Ensure every drug in DRUGS has a dosage entry
+    for d in DRUGS:
+        if d not in dosage_guidelines:
+            dosage_guidelines[d] = {"adult": "See label", "child": "Consult physician"}
+    snapshot = {
+        "format": SNAPSHOT_FORMAT,
+        "source": _source_stamp(),
+        "drug_interactions": _build_interactions(),
+        "dosage_guidelines": dosage_guidelines,
+        "alternatives": {d: _alts(d) for d in DRUGS},
+    }
+    tables = json.dumps([sorted(snapshot["drug_interactions"].items()), dosage_guidelines,
+                         snapshot["alternatives"]], sort_keys=True)
+    snapshot["version"] = hashlib.sha256(tables.encode()).hexdigest()[:12]
+    return snapshot
+
+def _write_atomic(path, data):
+    """Write data to a unique temp file beside path, then rename it into place."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def rebuild_snapshot(snapshot_path=None, matrix_path=None):
+    """Compile the catalog and write the snapshot + matrix files; returns the Catalog."""
+    snapshot_path = snapshot_path or SNAPSHOT_PATH
+    matrix_path = matrix_path or INTERACTION_MATRIX_PATH
+    snapshot = _compile_catalog()
+    matrix = InteractionMatrix.from_pairs(snapshot["drug_interactions"])
+    snapshot["matrix_source"] = matrix.source
+    matrix.save(matrix_path)
+    # JSON object keys must be strings; interaction pairs are stored as [a, b, message]
+    stored = dict(snapshot, drug_interactions=[[a, b, msg] for (a, b), msg in snapshot["drug_interactions"].items()])
+    _write_atomic(snapshot_path, json.dumps(stored).encode())
+    return Catalog(snapshot, matrix)
+
+def _snapshot_stamp():
+    try:
+        st = os.stat(SNAPSHOT_PATH)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+def _read_snapshot():
+    """The snapshot on disk if it was built from this file, else None."""
+    with open(SNAPSHOT_PATH, "rb") as f:
+        snapshot = json.load(f)
+    if snapshot.get("format") != SNAPSHOT_FORMAT or snapshot.get("source") != _source_stamp():
+        return None
+    snapshot["drug_interactions"] = {(a, b): msg for a, b, msg in snapshot["drug_interactions"]}
+    return snapshot
+
+def _load_catalog():
+    try:
+        # Stamp taken before reading: a file replaced mid-read is simply reloaded again later
+        stamp = _snapshot_stamp()
+        snapshot = _read_snapshot()
+        if snapshot is not None:
+            matrix = InteractionMatrix.load(INTERACTION_MATRIX_PATH)
+            if matrix.source == snapshot["matrix_source"]:
+                loaded = Catalog(snapshot, matrix)
+                loaded.snapshot_stamp = stamp
+                return loaded
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    try:
+        built = rebuild_snapshot()
+        built.snapshot_stamp = _snapshot_stamp()
+        return built
+    except OSError:
+        # Read-only deploy without a snapshot: compile in memory
+        snapshot = _compile_catalog()
+        matrix = InteractionMatrix.from_pairs(snapshot["drug_interactions"])
+        snapshot["matrix_source"] = matrix.source
+        return Catalog(snapshot, matrix)
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def catalog():
+    """The loaded Catalog (snapshot is read on first use)."""
+    global _catalog
+    # Read the global once: reload_catalog() may reset it from another thread
+    current = _catalog
+    if current is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = _load_catalog()
+            current = _catalog
+    return current
+
+def reload_catalog():
+    """Drop the loaded catalog so the next use reads the current snapshot from disk."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
+
+_checked_at = 0.0
+
+def refresh_catalog():
+    """Reload the catalog if the snapshot file was replaced since it was loaded."""
+    global _checked_at
+    now = time.monotonic()
+    current = _catalog
+    if current is None or now - _checked_at < CATALOG_CHECK_INTERVAL:
+        return
+    _checked_at = now
+    if _snapshot_stamp() != current.snapshot_stamp:
+        reload_catalog()
+
+def catalog_version():
+    """Identifier that changes whenever the catalog snapshot changes."""
+    refresh_catalog()
+    return catalog().version
+
+# Derived tables stay importable as module attributes, resolved lazily
+_LAZY_ATTRS = {"drug_interactions", "dosage_guidelines", "alternatives", "interaction_matrix", "DRUG_IDS"}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        return getattr(catalog(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ------------------------------
 # Public helpers
 # ------------------------------
+def _resolve_ids(drugs, memo):
+    """Distinct known drug IDs in first-seen order; unknown names are dropped."""
+    ids = []
+    seen = set()
+    for d in drugs:
+        if not d:
+            continue
+        i = memo.get(d)
+        if i is None:
+            i = memo[d] = catalog().DRUG_IDS.get(d.strip().lower(), -1)
+        if i >= 0 and i not in seen:
+            seen.add(i)
+            ids.append(i)
+    return ids
+
+def _interaction_line(matrix, i, j, code):
+    a, b = sorted((i, j))  # IDs follow name order, so this matches the sorted pair key
+    return f"{matrix.names[a]} + {matrix.names[b]}: {matrix.messages[code]}"
+
+def _scan_ids(ids):
+    """Interaction lines for one prescription, visiting only real neighbours."""
+    interaction_matrix = catalog().interaction_matrix
+    rank = {i: r for r, i in enumerate(ids)}
+    out = []
+    for r, i in enumerate(ids):
+        if interaction_matrix.degree(i) < len(ids) - r:
+            hits = sorted((rank[j], j, code) for j, code in interaction_matrix.row(i) if rank.get(j, -1) > r)
+            out.extend(_interaction_line(interaction_matrix, i, j, code) for _, j, code in hits)
+        else:
+            for j in ids[r + 1:]:
+                code = interaction_matrix.code(i, j)
+                if code:
+                    out.append(_interaction_line(interaction_matrix, i, j, code))
+    return out if out else ["No interactions found"]
+
 def check_interactions(drugs):
     """
     Return list of interaction strings for the given drugs.
@@ -250,25 +479,40 @@ def check_interactions(drugs):
     """
     if not drugs:
         return ["No interactions found"]
-    dnorm = [d.strip().lower() for d in drugs if d and d.strip()]
-    seen = set()
-    out = []
-    for a, b in combinations(dnorm, 2):
-        key = tuple(sorted((a, b)))
-        if key in seen:
-            continue
-        seen.add(key)
-        msg = drug_interactions.get(key)
-        if msg:
-            out.append(f"{key[0]} + {key[1]}: {msg}")
-    return out if out else ["No interactions found"]
+    refresh_catalog()
+    return _scan_ids(_resolve_ids(drugs, {}))
+
+def drug_set_key(drugs):
+    """
+    Sorted distinct catalog IDs of drugs. Case, order, repeats and unknown
+    names do not change it, so it identifies the interactions a list can have.
+    """
+    refresh_catalog()
+    return tuple(sorted(_resolve_ids(drugs, {})))
+
+def check_interactions_for_set(key):
+    """check_interactions for a drug_set_key(); lines come in sorted pair order."""
+    return _scan_ids(list(key))
+
+def check_interactions_batch(prescriptions):
+    """
+    Run check_interactions over many prescriptions in one pass.
+    Name -> ID resolution is shared across the batch, so repeated drugs are
+    normalized once. Returns one result list per prescription, in order.
+    """
+    refresh_catalog()
+    memo = {}
+    return [
+        _scan_ids(_resolve_ids(drugs, memo)) if drugs else ["No interactions found"]
+        for drugs in prescriptions
+    ]
 
 def get_dosage(drug, age):
     """Get age-specific dosage text; case-insensitive."""
     if not drug:
         return "Drug not found in database"
     drug = drug.lower().strip()
-    info = dosage_guidelines.get(drug)
+    info = catalog().dosage_guidelines.get(drug)
     if not info:
         return "Drug not found in database"
     return info["child"] if age is not None and age < 18 else info["adult"]
@@ -278,13 +522,26 @@ def get_alternatives(drug):
     if not drug:
         return ["No alternatives available"]
     drug = drug.lower().strip()
-    return alternatives.get(drug, ["No alternatives available"])
+    return catalog().alternatives.get(drug, ["No alternatives available"])
 
 
 # ------------------------------
-# Quick self-test
+# Quick self-test / snapshot compile step
 # ------------------------------
 if __name__ == "__main__":
-    print(check_interactions(["warfarin", "sertraline"]))   # should show a bleeding risk
-    print(get_dosage("warfarin", 30))
-    print(get_alternatives("sertraline"))
+    import argparse
+
+    parser = argparse.ArgumentParser(description="grok drug catalog")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="recompile the catalog snapshot and interaction matrix")
+    args = parser.parse_args()
+    if args.rebuild:
+        start = time.perf_counter()
+        built = rebuild_snapshot()
+        print(f"Wrote {SNAPSHOT_PATH} and {INTERACTION_MATRIX_PATH} "
+              f"(version {built.version}, {len(built.drug_interactions)} pairs) "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+    else:
+        print(check_interactions(["warfarin", "sertraline"]))   # should show a bleeding risk
+        print(get_dosage("warfarin", 30))
+        print(get_alternatives("sertraline"))
@@ -0,0 +1,95 @@
+# drug_matcher.py
+# ------------------------------------------------------------
+# Aho-Corasick automaton over drug names + synonyms.
+# Finds every drug mention in one linear pass over OCR text or a
+# voice transcript; shared by /upload-analyze and /voice-analyze.
+# ------------------------------------------------------------
+
+import re
+from collections import deque
+
+from drug_data import DRUGS, SYNONYMS
+
+_WHITESPACE = re.compile(r"\s+")
+
+class DrugMatcher:
+    def __init__(self, names):
+        """
+        names: {pattern: canonical drug}. Patterns are matched case-insensitively,
+        on word boundaries; multi-word patterns match across any whitespace.
+        """
+        self._goto = [{}]   # node -> {char: node}
+        self._fail = [0]
+        self._out = [[]]    # node -> [(pattern length, canonical), ...]
+        for pattern, canonical in names.items():
+            self._add(_WHITESPACE.sub(" ", pattern.strip().lower()), canonical)
+        self._link()
+
+    def _add(self, pattern, canonical):
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), canonical))
+
+    def _link(self):
+        """Breadth-first pass computing failure links and merged outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                if node:
+                    f = self._fail[node]
+                    while f and ch not in self._goto[f]:
+                        f = self._fail[f]
+                    self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text):
+        """
+        Return [(start, end, canonical)] for every whole-word mention, leftmost-longest,
+        with offsets into the whitespace-normalized lowercase text.
+        """
+        text = _WHITESPACE.sub(" ", text.lower())
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = []
+        node = 0
+        for end, ch in enumerate(text, 1):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, canonical in out[node]:
+                start = end - length
+                if (start == 0 or not text[start - 1].isalnum()) and \
+                        (end == len(text) or not text[end].isalnum()):
+                    hits.append((start, end, canonical))
+        hits.sort(key=lambda h: (h[0], h[0] - h[1]))
+        matches = []
+        last_end = 0
+        for start, end, canonical in hits:
+            if start >= last_end:
+                matches.append((start, end, canonical))
+                last_end = end
+        return matches
+
+    def find_drugs(self, text):
+        """Canonical drug names mentioned in text, in order of first mention."""
+        return list(dict.fromkeys(canonical for _, _, canonical in self.find(text)))
+
+def build_drug_matcher():
+    names = {d: d for d in DRUGS}
+    names.update(SYNONYMS)
+    return DrugMatcher(names)
+
+drug_matcher = build_drug_matcher()
+
+def find_drugs(text):
+    """Canonical drug names mentioned in text (case-insensitive, whole words)."""
+    return drug_matcher.find_drugs(text or "")
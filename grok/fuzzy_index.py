@@ -0,0 +1,165 @@
+# fuzzy_index.py
+# ------------------------------------------------------------
+# OCR-tolerant drug lookup: SymSpell-style deletion dictionary over
+# drug names + synonyms. Catches near-misses like "warfar1n" or
+# "ibuprofcn" without a Levenshtein scan over the whole catalog.
+# Fuzzy hits are suggestions only; they are never treated as drugs
+# that were found in the text.
+# ------------------------------------------------------------
+
+import os
+import re
+
+from drug_data import DRUGS, SYNONYMS
+
+MAX_DISTANCE = 1.0   # OCR-weighted: one plain edit or two confusable substitutions
+DELETE_DEPTH = 2     # deletes indexed per term; reaches two substituted characters
+MIN_SCORE = 0.85     # 1 - distance / len(name)
+MIN_TOKEN_LENGTH = 5
+MAX_CONFUSIONS = 2   # confusable characters find_fuzzy_drugs will correct in one token
+
+# Words that are never read as misspelled drugs: a system word list when one is
+# installed (GROK_DICTIONARY), plus common and prescription vocabulary
+DICTIONARY_PATH = os.getenv("GROK_DICTIONARY", "/usr/share/dict/words")
+STOP_WORDS = frozenset("""
+    a about above after again all also am an and any are as at be because been before being
+    below between both but by can could did do does doing down during each few for from further
+    had has have having he her here hers him his how i if in into is it its itself just me more
+    most my no nor not now of off on once only or other our out over own same she should so some
+    such than that the their them then there these they this those through to too under until up
+    very was we were what when where which while who whom why will with would you your
+    take takes taken taking tablet tablets tab tabs capsule capsules cap caps dose doses dosage
+    daily twice once thrice times every hour hours day days week weeks month months night nightly
+    morning evening bedtime before after meal meals food water with without mouth oral orally
+    apply applied inject injection units unit drops drop spray puff puffs inhale inhaler
+    needed refill refills patient doctor clinic hospital pharmacy prescription signature date name
+    address phone age male female adult child sig disp dispense quantity qty note notes
+""".split())
+
+def _load_dictionary(path):
+    try:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            return frozenset(w.strip().lower() for w in f if w.strip().isalpha())
+    except OSError:
+        return frozenset()
+
+DICTIONARY_WORDS = _load_dictionary(DICTIONARY_PATH)
+
+# Characters tesseract commonly confuses; substituting one for the other costs half an edit
+OCR_CONFUSIONS = {
+    frozenset(p) for p in [
+        ("1", "i"), ("1", "l"), ("l", "i"), ("|", "l"), ("|", "i"), ("!", "i"),
+        ("0", "o"), ("5", "s"), ("8", "b"), ("c", "e"), ("e", "o"), ("n", "h"),
+    ]
+}
+
+_TOKEN = re.compile(r"[a-z0-9|!]+")
+
+def confusions(token, term):
+    """
+    Number of positions where token and term differ, if every difference is an
+    OCR-confusable character pair; None when they differ in length or in any other way.
+    """
+    if len(token) != len(term):
+        return None
+    count = 0
+    for a, b in zip(token, term):
+        if a != b:
+            if frozenset((a, b)) not in OCR_CONFUSIONS:
+                return None
+            count += 1
+    return count
+
+def _deletes(word, depth):
+    """All strings reachable from word by deleting up to depth characters."""
+    out = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        out |= frontier
+    return out
+
+def ocr_distance(a, b):
+    """Optimal-string-alignment distance with cheap OCR-confusable substitutions."""
+    prev2 = None
+    prev = [float(j) for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        cur = [float(i)] + [0.0] * len(b)
+        for j in range(1, len(b) + 1):
+            if a[i - 1] == b[j - 1]:
+                sub = 0.0
+            elif frozenset((a[i - 1], b[j - 1])) in OCR_CONFUSIONS:
+                sub = 0.5
+            else:
+                sub = 1.0
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + sub)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        prev2, prev = prev, cur
+    return prev[-1]
+
+class FuzzyDrugIndex:
+    def __init__(self, names, max_distance=MAX_DISTANCE, delete_depth=DELETE_DEPTH):
+        """names: {single-word term: canonical drug}."""
+        self.names = dict(names)
+        self.max_distance = max_distance
+        self.delete_depth = delete_depth
+        self._deletes = {}  # deleted form -> set of terms
+        for term in self.names:
+            for d in _deletes(term, delete_depth):
+                self._deletes.setdefault(d, set()).add(term)
+
+    def lookup(self, token, top_k=3):
+        """
+        Best catalog matches for one token, as [(canonical, term, score)],
+        highest score first. Score is 1.0 for an exact match.
+        """
+        token = token.lower()
+        candidates = set()
+        for d in _deletes(token, self.delete_depth):
+            candidates |= self._deletes.get(d, set())
+        scored = {}
+        for term in candidates:
+            dist = ocr_distance(token, term)
+            if dist > self.max_distance:
+                continue
+            score = round(1 - dist / max(len(term), len(token)), 3)
+            canonical = self.names[term]
+            if score > scored.get(canonical, (None, -1))[1]:
+                scored[canonical] = (term, score)
+        ranked = sorted(scored.items(), key=lambda kv: (-kv[1][1], kv[0]))
+        return [(canonical, term, score) for canonical, (term, score) in ranked[:top_k]]
+
+def build_fuzzy_index():
+    names = {d: d for d in DRUGS}
+    names.update({k: v for k, v in SYNONYMS.items() if " " not in k})
+    return FuzzyDrugIndex(names)
+
+fuzzy_index = build_fuzzy_index()
+
+def fuzzy_lookup(token, top_k=3):
+    """Top catalog candidates for a possibly misspelled drug token."""
+    return fuzzy_index.lookup(token, top_k)
+
+def find_fuzzy_drugs(text, min_score=MIN_SCORE):
+    """
+    "Did you mean" suggestions for text: [{"token", "drug", "score"}] for tokens that
+    look like a catalog name misread by OCR. A token qualifies only if it differs from
+    the name by at most MAX_CONFUSIONS OCR-confusable characters (1/l/i, 0/o, c/e, ...),
+    is at least MIN_TOKEN_LENGTH long and is not a stop or dictionary word. Exact names
+    are left to drug_matcher; suggestions must never be analyzed as confirmed drugs.
+    """
+    suggestions = []
+    seen = set()
+    for token in _TOKEN.findall((text or "").lower()):
+        if len(token) < MIN_TOKEN_LENGTH or token in seen or token in fuzzy_index.names or token.isdigit():
+            continue
+        seen.add(token)
+        if token in STOP_WORDS or token in DICTIONARY_WORDS:
+            continue
+        for canonical, term, score in fuzzy_index.lookup(token, top_k=3):
+            n = confusions(token, term)
+            if n and n <= MAX_CONFUSIONS and score >= min_score:
+                suggestions.append({"token": token, "drug": canonical, "score": score})
+                break
+    return suggestions
@@ -0,0 +1,158 @@
+# interaction_matrix.py
+# ------------------------------------------------------------
+# Integer-coded drug interaction table.
+#   - drug IDs are positions in the sorted name list
+#   - each interacting pair stores a small code into an interned message table
+#   - dense N x N uint8/uint16 matrix for O(1) pair lookups, plus a CSR copy
+#     (indptr / indices / codes) for walking a drug's neighbours
+# The table is written to one flat file and mmap'ed read-only, so every
+# worker process shares the same pages instead of rebuilding it.
+# ------------------------------------------------------------
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left
+
+MAGIC = b"GRKIMTX1"
+DENSE_LIMIT = 4096  # above this many drugs only the CSR arrays are stored
+
+def fingerprint(pairs):
+    """Stable hash of a {(a, b): message} table, used to detect stale files."""
+    h = hashlib.sha256()
+    for (a, b), msg in sorted(pairs.items()):
+        h.update(f"{a}\0{b}\0{msg}\n".encode())
+    return h.hexdigest()
+
+def _u32():
+    return "I" if array("I").itemsize == 4 else "L"
+
+class InteractionMatrix:
+    def __init__(self, names, messages, dense, indptr, indices, codes, source=None):
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.messages = messages  # messages[0] is None: code 0 means "no interaction"
+        self.dense = dense        # flat row-major N*N codes, or None for sparse catalogs
+        self.indptr = indptr
+        self.indices = indices
+        self.codes = codes
+        self.source = source      # fingerprint of the pair table this was built from
+        self._mmap = None
+
+    def __len__(self):
+        return len(self.names)
+
+    # ------------------------------
+    # Lookups
+    # ------------------------------
+    def code(self, i, j):
+        """Message code for drug IDs i and j (0 if they do not interact)."""
+        if self.dense is not None:
+            return self.dense[i * len(self.names) + j]
+        lo, hi = self.indptr[i], self.indptr[i + 1]
+        k = bisect_left(self.indices, j, lo, hi)
+        return self.codes[k] if k < hi and self.indices[k] == j else 0
+
+    def message(self, a, b):
+        """Interaction message for two drug names, or None."""
+        i, j = self.ids.get(a), self.ids.get(b)
+        if i is None or j is None:
+            return None
+        return self.messages[self.code(i, j)]
+
+    def degree(self, i):
+        return self.indptr[i + 1] - self.indptr[i]
+
+    def row(self, i):
+        """(neighbour ID, code) pairs for drug ID i, in ID order."""
+        lo, hi = self.indptr[i], self.indptr[i + 1]
+        return zip(self.indices[lo:hi], self.codes[lo:hi])
+
+    # ------------------------------
+    # Build / persist
+    # ------------------------------
+    @classmethod
+    def from_pairs(cls, pairs, dense_limit=DENSE_LIMIT):
+        """Build from a {(a, b): message} table (keys in either order)."""
+        names = sorted({n for pair in pairs for n in pair})
+        ids = {name: i for i, name in enumerate(names)}
+        messages = [None]
+        interned = {}
+        rows = [[] for _ in names]
+        for (a, b), msg in pairs.items():
+            code = interned.get(msg)
+            if code is None:
+                code = interned[msg] = len(messages)
+                messages.append(msg)
+            rows[ids[a]].append((ids[b], code))
+            rows[ids[b]].append((ids[a], code))
+        typecode = "B" if len(messages) <= 0xFF else "H"
+        n = len(names)
+        indptr, indices, codes = array(_u32(), [0]), array(_u32()), array(typecode)
+        dense = array(typecode, bytes(n * n * array(typecode).itemsize)) if n <= dense_limit else None
+        for i, row in enumerate(rows):
+            for j, code in sorted(row):
+                indices.append(j)
+                codes.append(code)
+                if dense is not None:
+                    dense[i * n + j] = code
+            indptr.append(len(indices))
+        return cls(names, messages, dense, indptr, indices, codes, source=fingerprint(pairs))
+
+    def save(self, path):
+        """Write the flat file atomically (unique tmp file + rename)."""
+        typecode = self.codes.typecode
+        header = json.dumps({
+            "names": self.names,
+            "messages": self.messages,
+            "typecode": typecode,
+            "dense": self.dense is not None,
+            "nnz": len(self.indices),
+            "source": self.source,
+        }).encode()
+        header += b" " * (-len(header) % 8)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+                for arr in (self.dense, self.indptr, self.indices, self.codes):
+                    if arr is not None:
+                        f.write(bytes(arr))
+                        f.write(b"\0" * (-f.tell() % 8))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """mmap a file written by save(); arrays are zero-copy views into the mapping."""
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:8] != MAGIC:
+            mm.close()
+            raise ValueError(f"{path} is not an interaction matrix file")
+        (header_len,) = struct.unpack("<Q", mm[8:16])
+        meta = json.loads(mm[16:16 + header_len])
+        view = memoryview(mm)
+        offset = 16 + header_len
+        n, nnz, typecode = len(meta["names"]), meta["nnz"], meta["typecode"]
+
+        def take(fmt, count):
+            nonlocal offset
+            size = count * array(fmt).itemsize
+            arr = view[offset:offset + size].cast(fmt)
+            offset += size + (-size % 8)
+            return arr
+
+        dense = take(typecode, n * n) if meta["dense"] else None
+        indptr = take(_u32(), n + 1)
+        indices = take(_u32(), nnz)
+        codes = take(typecode, nnz)
+        matrix = cls(meta["names"], meta["messages"], dense, indptr, indices, codes, source=meta["source"])
+        matrix._mmap = mm
+        return matrix
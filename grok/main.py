@@ -1,18 +1,30 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
-from drug_data import check_interactions, get_dosage, get_alternatives
+from drug_data import (check_interactions, check_interactions_batch, check_interactions_for_set, drug_set_key,
+                       get_dosage, get_alternatives, catalog_version)
+from drug_matcher import find_drugs
+from fuzzy_index import find_fuzzy_drugs
 from fastapi.middleware.cors import CORSMiddleware
-import pytesseract
-from PIL import Image
-import re
-import os
-
-# Set Tesseract executable path
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+from ocr_pool import OCRPool, OCRQueueFull
+from result_cache import ResultCache
+import asyncio
+import json
 
 app = FastAPI()
 
+# Warm OCR worker processes (Tesseract path comes from TESSERACT_CMD)
+ocr_pool = OCRPool()
+
+@app.on_event("startup")
+async def start_ocr_pool():
+    await ocr_pool.start()
+
+@app.on_event("shutdown")
+def stop_ocr_pool():
+    ocr_pool.shutdown()
+
 # Enable CORS to allow Streamlit frontend to connect
 app.add_middleware(
     CORSMiddleware,
@@ -31,12 +43,17 @@ class VoiceAnalyzeRequest(BaseModel):
     transcript: str
     age: int
 
-# Existing endpoint for manual drug input
-@app.post("/analyze")
-async def analyze(request: AnalyzeRequest):
-    interactions = check_interactions(request.drugs)
-    dosages = [f"{drug}: {get_dosage(drug, request.age)}" for drug in request.drugs]
-    alternatives_list = [f"{drug}: {', '.join(get_alternatives(drug))}" for drug in request.drugs]
+# Number of NDJSON lines analyzed together by /analyze-batch
+BATCH_CHUNK_SIZE = 256
+# Longest accepted NDJSON request line; longer lines get an error result
+MAX_LINE_BYTES = 1 << 20
+
+def build_analysis(drugs, age, interactions=None):
+    """Assemble the standard analysis response for a list of drugs."""
+    if interactions is None:
+        interactions = check_interactions(drugs)
+    dosages = [f"{drug}: {get_dosage(drug, age)}" for drug in drugs]
+    alternatives_list = [f"{drug}: {', '.join(get_alternatives(drug))}" for drug in drugs]
     extracted_info = []  # Placeholder for NLP logic if implemented
     return {
         "interactions": interactions,
@@ -45,55 +62,138 @@ async def analyze(request: AnalyzeRequest):
         "extracted_info": extracted_info
     }
 
+# Interaction lines for repeated drug combinations, keyed by the normalized drug set.
+# Only the pairwise scan is shared: dosage and alternative lines echo each name
+# as sent and are cheap per-name lookups, so they are built per request.
+analyze_cache = ResultCache()
+
+# Existing endpoint for manual drug input
+@app.post("/analyze")
+async def analyze(request: AnalyzeRequest):
+    version = catalog_version()
+    key = drug_set_key(request.drugs)
+    interactions = analyze_cache.get(key, version)
+    if interactions is None:
+        interactions = check_interactions_for_set(key)
+        analyze_cache.put(key, interactions, version)
+    return build_analysis(request.drugs, request.age, interactions)
+
+async def _ndjson_lines(request: Request):
+    """
+    Yield non-empty lines of the request body as they arrive. Only newly received
+    bytes are scanned for newlines. A line longer than MAX_LINE_BYTES is not
+    buffered; it is yielded as None so the caller can report it.
+    """
+    pending = []  # pieces of the current, unfinished line
+    pending_size = 0
+    skipping = False  # inside an over-long line, discarding until its newline
+    async for chunk in request.stream():
+        *lines, tail = chunk.split(b"\n")
+        for line in lines:
+            if pending:
+                line = b"".join(pending) + line
+                pending, pending_size = [], 0
+            if skipping or len(line) > MAX_LINE_BYTES:
+                skipping = False
+                yield None
+            elif line.strip():
+                yield line
+        if skipping or not tail:
+            continue
+        pending.append(tail)
+        pending_size += len(tail)
+        if pending_size > MAX_LINE_BYTES:
+            pending, pending_size, skipping = [], 0, True
+    if skipping:
+        yield None
+    elif pending:
+        line = b"".join(pending)
+        if line.strip():
+            yield line
+
+def _analyze_chunk(chunk):
+    """Analyze one chunk of (index, raw line) pairs; returns NDJSON-encoded results."""
+    parsed = []
+    out = {}
+    for index, line in chunk:
+        if line is None:
+            out[index] = {"index": index, "error": f"Invalid request: line exceeds {MAX_LINE_BYTES} bytes"}
+            continue
+        try:
+            parsed.append((index, AnalyzeRequest(**json.loads(line))))
+        except Exception as e:
+            out[index] = {"index": index, "error": f"Invalid request: {str(e)}"}
+    interactions = check_interactions_batch([req.drugs for _, req in parsed])
+    for (index, req), found in zip(parsed, interactions):
+        out[index] = {"index": index, **build_analysis(req.drugs, req.age, found)}
+    return b"".join(json.dumps(out[index]).encode() + b"\n" for index, _ in chunk)
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose generator reads the request body itself.
+    Starlette's StreamingResponse also calls receive() to watch for a disconnect,
+    which would swallow request body messages meant for request.stream(). Here
+    the generator is the only reader; a client that goes away mid-upload
+    surfaces as ClientDisconnect from request.stream().
+    """
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+# Batch endpoint: newline-delimited AnalyzeRequest objects in, NDJSON results out
+@app.post("/analyze-batch")
+async def analyze_batch(request: Request):
+    async def results():
+        chunk = []
+        index = 0
+        async for line in _ndjson_lines(request):
+            chunk.append((index, line))
+            index += 1
+            if len(chunk) >= BATCH_CHUNK_SIZE:
+                # Parsing and analysis are CPU-bound; keep them off the event loop
+                yield await asyncio.to_thread(_analyze_chunk, chunk)
+                chunk = []
+        if chunk:
+            yield await asyncio.to_thread(_analyze_chunk, chunk)
+    return BodyStreamingResponse(results(), media_type="application/x-ndjson")
+
 # Endpoint for image upload and OCR
 @app.post("/upload-analyze")
 async def upload_analyze(file: UploadFile = File(...), age: int = 30):
     try:
-        # Save uploaded image temporarily
-        temp_path = os.path.join(os.getcwd(), "temp_image.png")
-        with open(temp_path, "wb") as buffer:
-            buffer.write(await file.read())
-        # Perform OCR
-        image = Image.open(temp_path)
-        text = pytesseract.image_to_string(image)
-        # Extract drug names (simple regex; improve as needed)
-        drug_pattern = r'\b(?:aspirin|ibuprofen|warfarin|acetaminophen|naproxen)\b'
-        drugs = re.findall(drug_pattern, text.lower())
+        # Decode the upload from memory and OCR it page by page in the worker pool
+        pages = await ocr_pool.image_bytes_to_pages(await file.read())
+        text = "\n".join(pages)
+        # Extract drug names (catalog names + synonyms, one pass over the text)
+        drugs = find_drugs(text)
+        # OCR near-misses ("warfar1n", "ibuprofcn") are only suggested, never analyzed
+        did_you_mean = [s for s in find_fuzzy_drugs(text) if s["drug"] not in drugs]
         if not drugs:
-            raise HTTPException(status_code=400, detail="No recognizable drugs found in the image.")
+            detail = "No recognizable drugs found in the image."
+            if did_you_mean:
+                names = ", ".join(dict.fromkeys(s["drug"] for s in did_you_mean))
+                detail += f" Did you mean: {names}?"
+            raise HTTPException(status_code=400, detail=detail)
         # Process the extracted drugs
-        interactions = check_interactions(drugs)
-        dosages = [f"{drug}: {get_dosage(drug, age)}" for drug in drugs]
-        alternatives_list = [f"{drug}: {', '.join(get_alternatives(drug))}" for drug in drugs]
-        extracted_info = []  # Placeholder
-        return {
-            "interactions": interactions,
-            "dosages": dosages,
-            "alternatives": alternatives_list,
-            "extracted_info": extracted_info,
-            "extracted_text": text
-        }
+        return {**build_analysis(drugs, age), "extracted_text": text, "did_you_mean": did_you_mean}
+    except OCRQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
-    finally:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
 
 # Endpoint for voice input
 @app.post("/voice-analyze")
 async def voice_analyze(request: VoiceAnalyzeRequest):
-    # Split transcript into potential drugs (simple split; improve parsing as needed)
-    drugs = [drug.strip() for drug in request.transcript.lower().split() if any(drug.lower() in ["aspirin", "ibuprofen", "warfarin", "acetaminophen", "naproxen"] for drug in drug.split())]
+    # Extract drug names mentioned anywhere in the transcript
+    drugs = find_drugs(request.transcript)
     if not drugs:
         raise HTTPException(status_code=400, detail="No recognizable drugs in voice input.")
-    interactions = check_interactions(drugs)
-    dosages = [f"{drug}: {get_dosage(drug, request.age)}" for drug in drugs]
-    alternatives_list = [f"{drug}: {', '.join(get_alternatives(drug))}" for drug in drugs]
-    extracted_info = []  # Placeholder
-    return {
-        "interactions": interactions,
-        "dosages": dosages,
-        "alternatives": alternatives_list,
-        "extracted_info": extracted_info,
-        "transcript": request.transcript
-    }
\ No newline at end of file
+    return {**build_analysis(drugs, request.age), "transcript": request.transcript}
+
+# OCR pool metrics (queue depth, in-flight jobs, per-page latency) and /analyze cache counters
+@app.get("/metrics")
+async def metrics():
+    return {"ocr": ocr_pool.metrics(), "analyze_cache": analyze_cache.stats()}
@@ -0,0 +1,183 @@
+# ocr_pool.py
+# ------------------------------------------------------------
+# Bounded pool of warm OCR worker processes for /upload-analyze.
+# OCR never runs on the event loop; callers await a result and get
+# rejected with OCRQueueFull when the backlog is at capacity. A worker
+# crash fails the requests it took down and the pool is rebuilt.
+# ------------------------------------------------------------
+
+import asyncio
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+TESSERACT_CMD = os.getenv("TESSERACT_CMD", r"C:\Program Files\Tesseract-OCR\tesseract.exe")
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 2)))
+OCR_QUEUE_SIZE = int(os.getenv("OCR_QUEUE_SIZE", str(OCR_WORKERS * 4)))
+
+# ------------------------------
+# Worker side (runs in the pool processes)
+# ------------------------------
+_engine = None  # tesserocr API kept loaded for the life of the worker, if available
+
+def _init_worker(tesseract_cmd):
+    """Import the OCR stack once per worker so requests hit a warm process."""
+    global _engine
+    import pytesseract
+    from PIL import Image  # noqa: F401  (warm import)
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    try:
+        # tesserocr keeps the engine and language model resident between calls;
+        # pytesseract has to spawn a tesseract process per page.
+        from tesserocr import PyTessBaseAPI
+        _engine = PyTessBaseAPI()
+    except Exception:
+        _engine = None
+
+def _ping():
+    return os.getpid()
+
+def _ocr_image(image):
+    import pytesseract
+    if _engine is not None:
+        _engine.SetImage(image)
+        return _engine.GetUTF8Text()
+    return pytesseract.image_to_string(image)
+
+def _iter_pages(data):
+    """Decode an upload from memory one page at a time (multi-page TIFF/GIF, PDF)."""
+    if data[:5] == b"%PDF-":
+        # Optional dependency: pypdfium2 renders PDF pages without touching disk
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(data)
+        try:
+            for index in range(len(pdf)):
+                page = pdf[index]
+                yield page.render(scale=300 / 72).to_pil()
+                page.close()
+        finally:
+            pdf.close()
+        return
+    from PIL import Image, ImageSequence
+    with Image.open(io.BytesIO(data)) as image:
+        for frame in ImageSequence.Iterator(image):
+            yield frame
+
+def _ocr_bytes(data):
+    """OCR every page of an in-memory upload; returns [(text, seconds), ...]."""
+    pages = []
+    for page in _iter_pages(data):
+        start = time.perf_counter()
+        text = _ocr_image(page)
+        pages.append((text, time.perf_counter() - start))
+    return pages
+
+# ------------------------------
+# Event-loop side
+# ------------------------------
+class OCRQueueFull(Exception):
+    """Raised when the OCR backlog is at capacity."""
+
+class OCRWorkerCrashed(Exception):
+    """Raised when an OCR worker process died (e.g. tesseract crashed or ran out of memory)."""
+
+class OCRPool:
+    def __init__(self, workers=OCR_WORKERS, queue_size=OCR_QUEUE_SIZE, tesseract_cmd=TESSERACT_CMD):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.tesseract_cmd = tesseract_cmd
+        self._executor = None
+        self._slots = None
+        self._restart_lock = None
+        self._restarts = 0
+        self._waiting = 0
+        self._in_flight = 0
+        self._pages = 0
+        self._rejected = 0
+        self._latencies = deque(maxlen=1024)  # recent per-page OCR seconds
+
+    async def start(self):
+        """Spawn the workers and wait until each one has imported the OCR stack."""
+        if self._executor is not None:
+            return
+        self._slots = asyncio.Semaphore(self.workers)
+        self._restart_lock = asyncio.Lock()
+        await self._spawn()
+
+    async def _spawn(self):
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.tesseract_cmd,),
+        )
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)))
+
+    async def _restart(self, broken):
+        """Replace a pool that lost a worker; the first caller to notice does the work."""
+        async with self._restart_lock:
+            if self._executor is not broken:
+                return
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._restarts += 1
+            await self._spawn()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        if self._executor is None:
+            await self.start()
+        if self._waiting >= self.queue_size:
+            self._rejected += 1
+            raise OCRQueueFull(f"OCR queue is full ({self.queue_size} waiting)")
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool as e:
+            # Work queued on the dead pool is lost with it; later requests get a fresh one
+            try:
+                await self._restart(executor)
+            except BrokenProcessPool:
+                pass  # the new pool failed its warm-up too; the next request retries
+            raise OCRWorkerCrashed("OCR worker process crashed") from e
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    async def image_bytes_to_pages(self, data):
+        """OCR an uploaded image or document held in memory; returns one text per page."""
+        pages = await self._run(_ocr_bytes, data)
+        self._pages += len(pages)
+        self._latencies.extend(seconds for _, seconds in pages)
+        return [text for text, _ in pages]
+
+    def metrics(self):
+        latencies = sorted(self._latencies)
+
+        def pct(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        return {
+            "workers": self.workers,
+            "queue_capacity": self.queue_size,
+            "queue_depth": self._waiting,
+            "in_flight": self._in_flight,
+            "pages_processed": self._pages,
+            "rejected": self._rejected,
+            "restarts": self._restarts,
+            "page_latency_ms": {"p50": pct(0.50), "p99": pct(0.99), "max": pct(1.0)},
+        }
@@ -0,0 +1,79 @@
+# result_cache.py
+# ------------------------------------------------------------
+# Bounded LRU + TTL cache for analysis responses.
+# Entries are tagged with the catalog version they were computed
+# against; a version change empties the cache.
+# ------------------------------------------------------------
+
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+
+ANALYZE_CACHE_SIZE = int(os.getenv("GROK_ANALYZE_CACHE_SIZE", "4096"))
+ANALYZE_CACHE_TTL = float(os.getenv("GROK_ANALYZE_CACHE_TTL", "3600"))  # seconds
+
+class ResultCache:
+    def __init__(self, maxsize=ANALYZE_CACHE_SIZE, ttl=ANALYZE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._version = None
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._data:
+                self.invalidations += 1
+            self._data.clear()
+            self._version = version
+
+    def get(self, key, version=None):
+        """Cached value for key, or None. A new version drops every entry first."""
+        with self._lock:
+            self._check_version(version)
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < time.monotonic():
+                del self._data[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value, version=None):
+        with self._lock:
+            self._check_version(version)
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "invalidations": self.invalidations,
+            "catalog_version": self._version,
+        }
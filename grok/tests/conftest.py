@@ -0,0 +1,18 @@
+# conftest.py
+# ------------------------------------------------------------
+# grok modules import each other by top-level name (they run from
+# this directory), so tests put the service directory on sys.path.
+# Compiled catalog files go to a scratch directory, never next to
+# the sources.
+# ------------------------------------------------------------
+
+import os
+import sys
+import tempfile
+
+GROK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GROK_DIR)
+
+_scratch = tempfile.mkdtemp(prefix="grok-tests-")
+os.environ.setdefault("GROK_CATALOG_SNAPSHOT", os.path.join(_scratch, "catalog.snapshot"))
+os.environ.setdefault("GROK_INTERACTION_MATRIX", os.path.join(_scratch, "interaction_matrix.bin"))
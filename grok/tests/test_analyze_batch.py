@@ -0,0 +1,59 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+pytest.importorskip("multipart")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from drug_data import DRUGS, check_interactions, check_interactions_batch  # noqa: E402
+
+class ChunkedRequest:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+def collect_lines(chunks):
+    async def run():
+        return [line async for line in main._ndjson_lines(ChunkedRequest(chunks))]
+    return asyncio.run(run())
+
+def test_lines_split_across_chunks():
+    body = b'{"a": 1}\n\n{"b": 22}\n   \n{"c": 333}'
+    expected = [b'{"a": 1}', b'{"b": 22}', b'{"c": 333}']
+    for size in (1, 2, 3, 7, len(body)):
+        chunks = [body[i:i + size] for i in range(0, len(body), size)]
+        assert collect_lines(chunks) == expected
+
+def test_trailing_newline_and_empty_chunks():
+    assert collect_lines([b"", b"x\n", b"", b"y\n"]) == [b"x", b"y"]
+
+def test_overlong_line_is_reported_not_buffered(monkeypatch):
+    monkeypatch.setattr(main, "MAX_LINE_BYTES", 8)
+    chunks = [b'{"ok": 1}\n'[:5], b'{"ok": 1}\n'[5:] + b"0123", b"456789", b"abcdef\nshort\n", b"0123456789abc"]
+    assert collect_lines(chunks) == [None, None, b"short", None]
+
+def test_batch_matches_single_calls():
+    rng = random.Random(2)
+    prescriptions = [rng.sample(DRUGS, rng.randint(0, 12)) for _ in range(50)]
+    assert check_interactions_batch(prescriptions) == [check_interactions(p) for p in prescriptions]
+
+def test_analyze_batch_endpoint_keeps_order_and_reports_bad_lines():
+    client = TestClient(main.app)
+    requests = [{"drugs": ["warfarin", "aspirin"], "age": 40}, "not json", {"drugs": ["ibuprofen"], "age": 8}]
+    body = b"\n".join(r.encode() if isinstance(r, str) else json.dumps(r).encode() for r in requests)
+    response = client.post("/analyze-batch", content=body)
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert results[0]["interactions"] == ["aspirin + warfarin: High risk of bleeding"]
+    assert results[1]["error"].startswith("Invalid request")
+    assert results[2]["dosages"] == ["ibuprofen: 5–10mg/kg every 6–8h"]
@@ -0,0 +1,93 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+pytest.importorskip("multipart")
+
+from fastapi.testclient import TestClient
+
+import drug_data
+import main
+
+@pytest.fixture
+def client():
+    main.analyze_cache.clear()
+    return TestClient(main.app)
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    snapshot = tmp_path / "catalog.snapshot.json"
+    monkeypatch.setattr(drug_data, "SNAPSHOT_PATH", str(snapshot))
+    monkeypatch.setattr(drug_data, "INTERACTION_MATRIX_PATH", str(tmp_path / "interaction_matrix.bin"))
+    monkeypatch.setattr(drug_data, "CATALOG_CHECK_INTERVAL", 0)
+    drug_data.reload_catalog()
+    yield snapshot
+    drug_data.reload_catalog()
+
+def test_analyze_echoes_names_as_sent(client):
+    body = client.post("/analyze", json={"drugs": ["Warfarin", "aspirin"], "age": 40}).json()
+    assert [line.split(":")[0] for line in body["dosages"]] == ["Warfarin", "aspirin"]
+    assert [line.split(":")[0] for line in body["alternatives"]] == ["Warfarin", "aspirin"]
+    assert body["interactions"] == ["aspirin + warfarin: High risk of bleeding"]
+
+def test_case_and_order_variants_share_the_interaction_scan(client):
+    hits = main.analyze_cache.hits
+    first = client.post("/analyze", json={"drugs": ["aspirin", "warfarin"], "age": 40}).json()
+    swapped = client.post("/analyze", json={"drugs": ["WARFARIN", "Aspirin", "aspirin"], "age": 10}).json()
+    assert main.analyze_cache.hits == hits + 1
+    assert swapped["interactions"] == first["interactions"]
+    assert [line.split(":")[0] for line in swapped["dosages"]] == ["WARFARIN", "Aspirin", "aspirin"]
+    # Dosages follow each request's age; only the interaction scan is shared
+    assert swapped["dosages"][0] == f"WARFARIN: {drug_data.get_dosage('warfarin', 10)}"
+    assert first["dosages"][1] == f"warfarin: {drug_data.get_dosage('warfarin', 40)}"
+
+def test_interactions_come_in_sorted_pair_order(client):
+    drugs = ["warfarin", "sertraline", "aspirin", "ibuprofen"]
+    interactions = client.post("/analyze", json={"drugs": drugs, "age": 40}).json()["interactions"]
+    assert interactions == sorted(interactions)
+    assert sorted(drug_data.check_interactions(drugs)) == interactions
+    unknown = client.post("/analyze", json={"drugs": ["notadrug"], "age": 40}).json()
+    assert unknown["interactions"] == ["No interactions found"]
+
+def test_replaced_snapshot_is_picked_up_and_drops_cached_results(client, paths):
+    drug_data.rebuild_snapshot()
+    before = client.post("/analyze", json={"drugs": ["warfarin"], "age": 40}).json()
+    assert before["alternatives"] == ["warfarin: apixaban"]
+    invalidations = main.analyze_cache.invalidations
+
+    stored = json.loads(paths.read_text())
+    stored["alternatives"]["warfarin"] = ["rivaroxaban"]
+    stored["version"] = "edited"
+    paths.write_text(json.dumps(stored))
+    st = os.stat(paths)
+    os.utime(paths, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    after = client.post("/analyze", json={"drugs": ["warfarin"], "age": 40}).json()
+    assert after["alternatives"] == ["warfarin: rivaroxaban"]
+    assert drug_data.catalog_version().endswith("-edited")
+    assert main.analyze_cache.invalidations == invalidations + 1
+
+def test_unchanged_snapshot_is_not_reloaded(paths):
+    drug_data.rebuild_snapshot()
+    loaded = drug_data.catalog()
+    drug_data.check_interactions(["aspirin", "warfarin"])
+    assert drug_data.catalog() is loaded
+
+def test_refresh_tolerates_a_concurrent_reload(paths, monkeypatch):
+    drug_data.rebuild_snapshot()
+    drug_data.catalog()
+
+    stamp = drug_data._snapshot_stamp
+
+    def stamp_after_reload():
+        # Another thread (e.g. an /analyze-batch worker) reloads mid-check
+        monkeypatch.setattr(drug_data, "_snapshot_stamp", stamp)
+        drug_data.reload_catalog()
+        return [0, 0]
+
+    monkeypatch.setattr(drug_data, "_snapshot_stamp", stamp_after_reload)
+    drug_data.refresh_catalog()
+    assert drug_data.catalog() is not None
@@ -0,0 +1,29 @@
+import benchmark
+from drug_data import DRUGS
+
+def test_prescriptions_are_reproducible():
+    assert benchmark.make_prescriptions(10, 5) == benchmark.make_prescriptions(10, 5)
+    assert benchmark.make_prescriptions(10, 5, seed=1) != benchmark.make_prescriptions(10, 5)
+
+def test_prescription_sizes():
+    small = benchmark.make_prescriptions(5, 3)
+    assert all(len(s) == 5 and len(set(s)) == 5 for s in small)
+    large = benchmark.make_prescriptions(len(DRUGS) + 10, 2)
+    assert all(len(s) == len(DRUGS) + 10 for s in large)
+
+def test_measure_reports_latency_throughput_and_allocations():
+    result = benchmark.measure(lambda n: list(range(n)), [1000] * 10, repeat=2)
+    assert result["calls"] == 20
+    assert 0 < result["p50_us"] <= result["p99_us"]
+    assert result["throughput_per_s"] > 0
+    assert result["alloc_bytes_per_call"] > 0
+
+def test_compare_flags_only_regressions_past_threshold(capsys):
+    baseline = {"a": {"p50_us": 10.0, "p99_us": 20.0}, "b": {"p50_us": 10.0, "p99_us": 20.0}}
+    results = {
+        "a": {"p50_us": 10.5, "p99_us": 21.0},
+        "b": {"p50_us": 12.0, "p99_us": 25.0},
+        "c": {"p50_us": 1.0, "p99_us": 2.0},
+    }
+    assert benchmark.compare(results, baseline, threshold=0.10) == ["b"]
+    assert "new" in capsys.readouterr().out
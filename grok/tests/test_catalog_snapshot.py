@@ -0,0 +1,86 @@
+import json
+import threading
+
+import pytest
+
+import drug_data
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    snapshot = tmp_path / "catalog.snapshot.json"
+    matrix = tmp_path / "interaction_matrix.bin"
+    monkeypatch.setattr(drug_data, "SNAPSHOT_PATH", str(snapshot))
+    monkeypatch.setattr(drug_data, "INTERACTION_MATRIX_PATH", str(matrix))
+    drug_data.reload_catalog()
+    yield snapshot, matrix
+    drug_data.reload_catalog()
+
+def test_snapshot_is_json_and_loads_the_compiled_tables(paths):
+    snapshot_path, _ = paths
+    built = drug_data.rebuild_snapshot()
+    stored = json.loads(snapshot_path.read_text())
+    assert stored["format"] == drug_data.SNAPSHOT_FORMAT
+    loaded = drug_data._load_catalog()
+    assert loaded.version == built.version
+    assert loaded.drug_interactions == built.drug_interactions
+    assert loaded.dosage_guidelines == built.dosage_guidelines
+    assert loaded.alternatives == built.alternatives
+    assert drug_data.check_interactions(["aspirin", "warfarin"]) == ["aspirin + warfarin: High risk of bleeding"]
+
+def test_stale_or_corrupt_snapshot_is_rebuilt(paths, monkeypatch):
+    snapshot_path, _ = paths
+    drug_data.rebuild_snapshot()
+    stored = json.loads(snapshot_path.read_text())
+    stored["source"] = [0, 0]
+    stored["alternatives"] = {}
+    snapshot_path.write_text(json.dumps(stored))
+    assert drug_data._load_catalog().alternatives["warfarin"] == ["apixaban"]
+    snapshot_path.write_bytes(b"\x80\x04 not json")
+    assert drug_data._load_catalog().alternatives["warfarin"] == ["apixaban"]
+    assert json.loads(snapshot_path.read_text())["source"] == drug_data._source_stamp()
+
+def test_unwritable_location_compiles_in_memory(tmp_path, monkeypatch):
+    missing = tmp_path / "missing" / "dir"
+    monkeypatch.setattr(drug_data, "SNAPSHOT_PATH", str(missing / "catalog.snapshot.json"))
+    monkeypatch.setattr(drug_data, "INTERACTION_MATRIX_PATH", str(missing / "interaction_matrix.bin"))
+    assert drug_data._load_catalog().dosage_guidelines["aspirin"]["adult"] == "81–325mg daily"
+    assert not missing.exists()
+
+def test_first_use_loads_once_across_threads(paths, monkeypatch):
+    loads = []
+    real_load = drug_data._load_catalog
+    barrier = threading.Barrier(8)
+
+    def counting_load():
+        loads.append(1)
+        return real_load()
+
+    monkeypatch.setattr(drug_data, "_load_catalog", counting_load)
+    seen = []
+
+    def use():
+        barrier.wait()
+        seen.append(drug_data.catalog())
+
+    threads = [threading.Thread(target=use) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(loads) == 1
+    assert all(c is seen[0] for c in seen)
+
+def test_concurrent_rebuilds_leave_one_valid_file_and_no_temp_files(paths):
+    snapshot_path, matrix_path = paths
+    threads = [threading.Thread(target=drug_data.rebuild_snapshot) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(p.name for p in snapshot_path.parent.iterdir()) == sorted([snapshot_path.name, matrix_path.name])
+    assert drug_data._read_snapshot() is not None
+
+def test_reload_catalog_picks_up_a_new_snapshot(paths, monkeypatch):
+    first = drug_data.catalog()
+    drug_data.reload_catalog()
+    assert drug_data.catalog() is not first
@@ -0,0 +1,45 @@
+import random
+from itertools import combinations
+
+import drug_data
+from drug_data import DRUGS, SYNONYMS, check_interactions
+
+def reference_interactions(drugs):
+    """check_interactions as it was before the adjacency index: every pair, in input order."""
+    names = [d.strip().lower() for d in drugs if d and d.strip()]
+    seen = set()
+    out = []
+    for a, b in combinations(names, 2):
+        key = tuple(sorted((a, b)))
+        if key in seen:
+            continue
+        seen.add(key)
+        msg = drug_data.drug_interactions.get(key)
+        if msg:
+            out.append(f"{key[0]} + {key[1]}: {msg}")
+    return out or ["No interactions found"]
+
+def test_known_pair_either_order():
+    expected = ["aspirin + warfarin: High risk of bleeding"]
+    assert check_interactions(["warfarin", "aspirin"]) == expected
+    assert check_interactions(["aspirin", "warfarin"]) == expected
+
+def test_case_and_whitespace_insensitive():
+    assert check_interactions(["  Warfarin ", "ASPIRIN"]) == ["aspirin + warfarin: High risk of bleeding"]
+
+def test_no_interactions():
+    assert check_interactions([]) == ["No interactions found"]
+    assert check_interactions(["aspirin"]) == ["No interactions found"]
+    assert check_interactions(["notadrug", "alsonotadrug"]) == ["No interactions found"]
+
+def test_duplicates_and_unknown_names_are_ignored():
+    assert check_interactions(["warfarin", "", "unknown", "warfarin", "aspirin", "aspirin"]) == \
+        ["aspirin + warfarin: High risk of bleeding"]
+
+def test_matches_pairwise_scan_on_random_prescriptions():
+    rng = random.Random(1)
+    names = DRUGS + list(SYNONYMS) + ["notadrug"]
+    for size in (2, 3, 5, 10, 20, 40, 80):
+        for _ in range(25):
+            drugs = [rng.choice(names).upper() if rng.random() < 0.2 else rng.choice(names) for _ in range(size)]
+            assert check_interactions(drugs) == reference_interactions(drugs)
@@ -0,0 +1,24 @@
+from drug_matcher import DrugMatcher, find_drugs
+
+def test_canonical_names_and_synonyms_in_mention_order():
+    text = "Rx: Coumadin 5mg daily. Also ZOLOFT 50mg; continue metformin."
+    assert find_drugs(text) == ["warfarin", "sertraline", "metformin"]
+
+def test_whole_words_only():
+    assert find_drugs("aspirinate insulinoma preaspirin") == []
+    assert find_drugs("aspirin-81, (insulin)") == ["aspirin", "insulin"]
+
+def test_multiword_synonym_spans_any_whitespace():
+    assert find_drugs("acetylsalicylic\n   acid 325mg") == ["aspirin"]
+    assert find_drugs("Toprol\tXL 50mg") == ["metoprolol"]
+
+def test_leftmost_longest_match_wins():
+    matcher = DrugMatcher({"insulin": "insulin", "insulin glargine": "insulin glargine", "glargine": "glargine"})
+    assert matcher.find_drugs("insulin glargine 10 units") == ["insulin glargine"]
+
+def test_repeated_mentions_reported_once():
+    assert find_drugs("aspirin, then Aspirin again, and warfarin") == ["aspirin", "warfarin"]
+
+def test_empty_text():
+    assert find_drugs("") == []
+    assert find_drugs(None) == []
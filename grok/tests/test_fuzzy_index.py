@@ -0,0 +1,57 @@
+import pytest
+
+import fuzzy_index
+from fuzzy_index import confusions, find_fuzzy_drugs, fuzzy_lookup
+
+@pytest.mark.parametrize("token, drug", [
+    ("warfar1n", "warfarin"),
+    ("ibuprofcn", "ibuprofen"),
+    ("metf0rmin", "metformin"),
+    ("a11opurinol", "allopurinol"),
+])
+def test_ocr_misreads_are_suggested(token, drug):
+    assert [s["drug"] for s in find_fuzzy_drugs(f"Take {token} 5mg daily")] == [drug]
+
+@pytest.mark.parametrize("word", ["alive", "acts", "actor", "ultra", "neural", "aleva", "aspirn", "warfain"])
+def test_ordinary_words_and_plain_typos_are_not_suggested(word):
+    assert find_fuzzy_drugs(word) == []
+
+def test_stop_and_dictionary_words_are_skipped(monkeypatch):
+    assert confusions("c0deine", "codeine") == 1
+    monkeypatch.setattr(fuzzy_index, "DICTIONARY_WORDS", frozenset({"c0deine"}))
+    assert find_fuzzy_drugs("c0deine") == []
+
+def test_short_tokens_and_exact_names_are_skipped():
+    assert find_fuzzy_drugs("1nsu") == []
+    assert find_fuzzy_drugs("warfarin aspirin") == []
+
+def test_at_most_two_confusions():
+    assert confusions("w4rfarin", "warfarin") is None
+    assert confusions("wa1far1n", "warfarin") is None  # r -> 1 is not an OCR confusion
+    assert find_fuzzy_drugs("1bupr0fcn") == []
+
+def test_fuzzy_lookup_still_ranks_candidates():
+    assert fuzzy_lookup("warfarn")[0][0] == "warfarin"
+
+def test_upload_analyze_reports_suggestions_separately(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    pytest.importorskip("multipart")
+    from fastapi.testclient import TestClient
+    import main
+
+    texts = iter(["Aspirin 81mg daily\nwarfar1n 5mg\nPatient alive, acts normal", "warfar1n 5mg"])
+
+    async def fake_ocr(data):
+        return [next(texts)]
+
+    monkeypatch.setattr(main.ocr_pool, "image_bytes_to_pages", fake_ocr)
+    client = TestClient(main.app)
+    body = client.post("/upload-analyze", files={"file": ("scan.png", b"x", "image/png")}).json()
+    assert body["interactions"] == ["No interactions found"]
+    assert body["dosages"] == ["aspirin: 81–325mg daily"]
+    assert [s["drug"] for s in body["did_you_mean"]] == ["warfarin"]
+
+    response = client.post("/upload-analyze", files={"file": ("scan.png", b"x", "image/png")})
+    assert response.status_code == 400
+    assert "Did you mean: warfarin?" in response.json()["detail"]
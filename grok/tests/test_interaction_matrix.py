@@ -0,0 +1,54 @@
+import pytest
+
+from interaction_matrix import InteractionMatrix, fingerprint
+
+PAIRS = {
+    ("aspirin", "warfarin"): "High risk of bleeding",
+    ("ibuprofen", "warfarin"): "High risk of bleeding",
+    ("aspirin", "ibuprofen"): "Increased gastrointestinal risk",
+    ("codeine", "bupropion"): "Reduced codeine efficacy",
+}
+
+@pytest.fixture(params=["dense", "sparse"])
+def matrix(request):
+    return InteractionMatrix.from_pairs(PAIRS, dense_limit=4096 if request.param == "dense" else 0)
+
+def test_lookups_are_symmetric(matrix):
+    for (a, b), msg in PAIRS.items():
+        assert matrix.message(a, b) == msg
+        assert matrix.message(b, a) == msg
+    assert matrix.message("codeine", "warfarin") is None
+    assert matrix.message("aspirin", "unknown") is None
+
+def test_messages_are_interned(matrix):
+    assert matrix.messages[0] is None
+    assert len(matrix.messages) == 1 + len(set(PAIRS.values()))
+
+def test_rows_list_neighbours_in_id_order(matrix):
+    i = matrix.ids["warfarin"]
+    neighbours = [(matrix.names[j], matrix.messages[code]) for j, code in matrix.row(i)]
+    assert neighbours == [("aspirin", "High risk of bleeding"), ("ibuprofen", "High risk of bleeding")]
+    assert matrix.degree(i) == 2
+
+def test_save_and_mmap_load_round_trip(matrix, tmp_path):
+    path = tmp_path / "matrix.bin"
+    matrix.save(str(path))
+    loaded = InteractionMatrix.load(str(path))
+    assert loaded.names == matrix.names
+    assert loaded.source == fingerprint(PAIRS)
+    assert (loaded.dense is None) == (matrix.dense is None)
+    for a in matrix.names:
+        for b in matrix.names:
+            assert loaded.message(a, b) == matrix.message(a, b)
+
+def test_load_rejects_foreign_files(tmp_path):
+    path = tmp_path / "matrix.bin"
+    path.write_bytes(b"not a matrix file at all")
+    with pytest.raises(ValueError):
+        InteractionMatrix.load(str(path))
+
+def test_fingerprint_tracks_content():
+    changed = dict(PAIRS)
+    changed[("aspirin", "warfarin")] = "Changed"
+    assert fingerprint(PAIRS) == fingerprint(dict(reversed(list(PAIRS.items()))))
+    assert fingerprint(PAIRS) != fingerprint(changed)
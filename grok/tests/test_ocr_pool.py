@@ -0,0 +1,84 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+import ocr_pool
+from ocr_pool import OCRPool, OCRQueueFull
+
+def _no_ocr_stack(tesseract_cmd):
+    """Worker initializer for tests: skip importing pytesseract / tesserocr."""
+
+def _slow_pid(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+def _fake_ocr_bytes(data):
+    return [(page, 0.01) for page in data.decode().split("|")]
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(ocr_pool, "_init_worker", _no_ocr_stack)
+    pools = []
+
+    def make(**kwargs):
+        p = OCRPool(tesseract_cmd="tesseract", **kwargs)
+        pools.append(p)
+        return p
+
+    yield make
+    for p in pools:
+        p.shutdown()
+
+def test_work_runs_in_warm_worker_processes(pool):
+    p = pool(workers=2, queue_size=4)
+
+    async def run():
+        await p.start()
+        return await asyncio.gather(*(p._run(_slow_pid, 0.05) for _ in range(4)))
+
+    pids = asyncio.run(run())
+    assert os.getpid() not in pids
+    assert len(set(pids)) <= 2
+
+def test_full_queue_rejects_instead_of_waiting(pool):
+    p = pool(workers=1, queue_size=1)
+
+    async def run():
+        await p.start()
+        return await asyncio.gather(*(p._run(_slow_pid, 0.3) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert sum(isinstance(r, OCRQueueFull) for r in results) == 1
+    assert sum(isinstance(r, int) for r in results) == 2
+    metrics = p.metrics()
+    assert metrics["rejected"] == 1
+    assert metrics["queue_depth"] == 0 and metrics["in_flight"] == 0
+
+def test_pages_and_latency_metrics(pool, monkeypatch):
+    monkeypatch.setattr(ocr_pool, "_ocr_bytes", _fake_ocr_bytes)
+    p = pool(workers=1, queue_size=2)
+    pages = asyncio.run(p.image_bytes_to_pages(b"page one|page two"))
+    assert pages == ["page one", "page two"]
+    metrics = p.metrics()
+    assert metrics["pages_processed"] == 2
+    assert metrics["page_latency_ms"]["p50"] == 10.0
+
+def _crash():
+    os._exit(1)
+
+def test_worker_crash_fails_that_request_and_rebuilds_the_pool(pool):
+    p = pool(workers=1, queue_size=4)
+
+    async def run():
+        await p.start()
+        with pytest.raises(ocr_pool.OCRWorkerCrashed):
+            await p._run(_crash)
+        return await asyncio.gather(*(p._run(_slow_pid, 0) for _ in range(2)))
+
+    pids = asyncio.run(run())
+    assert os.getpid() not in pids
+    metrics = p.metrics()
+    assert metrics["restarts"] == 1
+    assert metrics["in_flight"] == 0
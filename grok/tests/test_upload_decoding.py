@@ -0,0 +1,50 @@
+import io
+
+import pytest
+
+from ocr_pool import _iter_pages
+
+def test_multipage_tiff_is_decoded_page_by_page_from_memory():
+    Image = pytest.importorskip("PIL.Image")
+    pages = [Image.new("L", (40, 20), shade) for shade in (0, 128, 255)]
+    buffer = io.BytesIO()
+    pages[0].save(buffer, format="TIFF", save_all=True, append_images=pages[1:])
+    decoded = [page.getpixel((0, 0)) for page in _iter_pages(buffer.getvalue())]
+    assert decoded == [0, 128, 255]
+
+def test_single_png_is_one_page():
+    Image = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    Image.new("L", (40, 20), 255).save(buffer, format="PNG")
+    assert len(list(_iter_pages(buffer.getvalue()))) == 1
+
+def test_pdf_pages_are_rendered_from_memory():
+    pdfium = pytest.importorskip("pypdfium2")
+    pdf = pdfium.PdfDocument.new()
+    for _ in range(2):
+        pdf.new_page(200, 100)
+    buffer = io.BytesIO()
+    pdf.save(buffer)
+    pages = list(_iter_pages(buffer.getvalue()))
+    assert len(pages) == 2
+    width, height = pages[0].size
+    assert abs(width - 200 * 300 / 72) <= 1 and abs(height - 100 * 300 / 72) <= 1
+
+def test_upload_analyze_writes_no_temp_file(tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    pytest.importorskip("multipart")
+    from fastapi.testclient import TestClient
+    import main
+
+    async def fake_ocr(data):
+        return [data.decode()]
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main.ocr_pool, "image_bytes_to_pages", fake_ocr)
+    response = TestClient(main.app).post(
+        "/upload-analyze", files={"file": ("scan.png", b"Warfarin 5mg daily\nAspirin 81mg", "image/png")}
+    )
+    assert response.status_code == 200
+    assert response.json()["interactions"] == ["aspirin + warfarin: High risk of bleeding"]
+    assert list(tmp_path.iterdir()) == []